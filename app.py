@@ -1,7 +1,7 @@
 import dash
 import dash_bootstrap_components as dbc
 from dash import dcc, html, callback_context
-from dash.dependencies import Input, Output, State
+from dash.dependencies import ClientsideFunction, Input, Output, State
 import plotly.express as px
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
@@ -17,12 +17,28 @@ from layout.pages.settings import settings_content
 from layout.sidebar import create_sidebar
 from layout.header import create_header
 from layout.page_router import get_content_style, create_content
+from data_engine import ENROLLMENT_COLUMNS, grade_columns_for, load_region_geometry
+from figure_updates import base_figure, figure_update, group_traces, trace_templates
 from app_data import (
     get_school_metadata,
-    load_schools,
+    get_school_registry,
+    get_school_search_index,
+    get_school_history,
+    get_school_columns,
     load_data_for_year,
-    build_combined_shs_track_df,
-    get_available_school_years
+    read_year_rows,
+    save_schools,
+    save_year_rows,
+    get_shs_track_df,
+    get_enrollment_tensor,
+    get_filter_view,
+    get_totals_index,
+    get_transition_rates,
+    get_year_enrollment,
+    get_available_school_years,
+    dataset_key,
+    dataset_year,
+    correct_region_order
     )
 
 # Path to user info CSV file
@@ -67,21 +83,7 @@ login_page = dbc.Container([
 ], fluid=True)
 
 # Upload Format
-correct_columns = [
-    "School Year", "BEIS School ID", "K Male", "K Female", "G1 Male", "G1 Female",
-    "G2 Male", "G2 Female", "G3 Male", "G3 Female", "G4 Male", "G4 Female",
-    "G5 Male", "G5 Female", "G6 Male", "G6 Female", "Elem NG Male", "Elem NG Female",
-    "G7 Male", "G7 Female", "G8 Male", "G8 Female", "G9 Male", "G9 Female",
-    "G10 Male", "G10 Female", "JHS NG Male", "JHS NG Female",
-    "G11 ACAD - ABM Male", "G11 ACAD - ABM Female", "G11 ACAD - HUMSS Male", "G11 ACAD - HUMSS Female",
-    "G11 ACAD STEM Male", "G11 ACAD STEM Female", "G11 ACAD GAS Male", "G11 ACAD GAS Female",
-    "G11 ACAD PBM Male", "G11 ACAD PBM Female", "G11 TVL Male", "G11 TVL Female",
-    "G11 SPORTS Male", "G11 SPORTS Female", "G11 ARTS Male", "G11 ARTS Female",
-    "G12 ACAD - ABM Male", "G12 ACAD - ABM Female", "G12 ACAD - HUMSS Male", "G12 ACAD - HUMSS Female",
-    "G12 ACAD STEM Male", "G12 ACAD STEM Female", "G12 ACAD GAS Male", "G12 ACAD GAS Female",
-    "G12 ACAD PBM Male", "G12 ACAD PBM Female", "G12 TVL Male", "G12 TVL Female",
-    "G12 SPORTS Male", "G12 SPORTS Female", "G12 ARTS Male", "G12 ARTS Female"
-]
+correct_columns = list(ENROLLMENT_COLUMNS)
 
 # Dash App
 app = dash.Dash(
@@ -103,17 +105,16 @@ current_year = datetime.now().year
 school_year_options = [{'label': f"{y}-{y+1}", 'value': f"{y}-{y+1}"} for y in range(current_year - 20, current_year + 5)]
 # Default year to load initially
 default_school_year = "2023-2024"
-data, grade_columns, grade_options, region_options = load_data_for_year(default_school_year)
-combined_shs_track_df = build_combined_shs_track_df(data)
+_, grade_columns, grade_options, region_options = load_data_for_year(default_school_year)
 
 app.layout = html.Div([
     dcc.Location(id="url", refresh=False),
     dcc.Store(id="login-state", storage_type="session", data={"logged_in": False}),
-    dcc.Store(id="stored_data", data=data.to_dict("records")),
+    # Only a key for the selected year's dataset; its rows stay on the server
+    dcc.Store(id="stored_dataset", data=dataset_key(default_school_year)),
     dcc.Store(id="stored_grades", data=grade_columns),
     dcc.Store(id="stored_grade_options", data=grade_options),
     dcc.Store(id="stored_region_options", data=region_options),
-    dcc.Store(id="stored_school_year", data=default_school_year),
     dcc.Store(id='trigger_enrollment_table_reload'),
     dcc.Store(id='refresh_school_year_trigger', data='initial-load'),
     dcc.Store(id="update-status", data="John Doe"),  # Stores current user full name
@@ -153,13 +154,28 @@ def verify_login(n_clicks, first_name, last_name, email, password):
 
     return dash.no_update, "❌ Invalid credentials. Please try again."
 
+# Collapsing the sidebar only restyles it and the content margin, in the browser (see assets/clientside.js)
+app.clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='toggleSidebar'),
+    Output("sidebar-toggle-state", "data"),
+    Output("sidebar", "style"),
+    Output("content", "style"),
+    Output("sidebar-toggle-icon", "icon"),
+    Output("sidebar-title", "style"),
+    Output("sidebar-rule", "style"),
+    Input("sidebar-toggle", "n_clicks"),
+    State("sidebar-toggle-state", "data"),
+    State("sidebar", "style"),
+    State("content", "style"),
+    State("sidebar-title", "style"),
+    State("sidebar-rule", "style"),
+    prevent_initial_call=True
+)
+
 @app.callback(
     Output("sidebar-container", "children"),
     Output("content", "children"),
-    Output("content", "style"),
-    Output("sidebar-toggle-state", "data"),
     Output("current-page", "data"),
-    Input("sidebar-toggle", "n_clicks"),
     Input("btn-1", "n_clicks"),
     Input("btn-2", "n_clicks"),
     Input("btn-3", "n_clicks"),
@@ -168,18 +184,14 @@ def verify_login(n_clicks, first_name, last_name, email, password):
     State("current-page", "data"),
     State("login-state", "data")
 )
-def handle_interaction(toggle_clicks, b1, b2, b3, b4, is_collapsed, current_page, login_state):
+def handle_interaction(b1, b2, b3, b4, is_collapsed, current_page, login_state):
     ctx = callback_context
 
-    new_collapsed = is_collapsed
     new_page = current_page
 
     if ctx.triggered:
         triggered_id = ctx.triggered[0]["prop_id"].split(".")[0]
 
-        if triggered_id == "sidebar-toggle":
-            new_collapsed = not is_collapsed
-
         button_to_page = {
             "btn-1": PAGE_CONSTANTS[1],
             "btn-2": PAGE_CONSTANTS[2],
@@ -189,17 +201,15 @@ def handle_interaction(toggle_clicks, b1, b2, b3, b4, is_collapsed, current_page
         if triggered_id in button_to_page:
             new_page = button_to_page[triggered_id]
 
-    sidebar = create_sidebar(is_collapsed=new_collapsed, current_page=new_page)
+    sidebar = create_sidebar(is_collapsed=is_collapsed, current_page=new_page)
 
     if new_page == "settings":
         current_user = login_state["user"] if login_state and "user" in login_state else ""
         content = settings_content(current_user)
     else:
-        content = create_content(new_page, data, grade_options, region_options, school_year_options)
-
-    content_style = get_content_style(new_collapsed)
+        content = create_content(new_page, grade_options, region_options, school_year_options)
 
-    return sidebar, content, content_style, new_collapsed, new_page
+    return sidebar, content, new_page
 
 # Call back for same profile pic
 @app.callback(
@@ -411,7 +421,7 @@ def route_pages(pathname, login_data):
                     create_sidebar(is_collapsed=False, current_page="dashboard")
                 ]),
                 html.Div(id="content", style=get_content_style(False), children=create_content(
-                    "dashboard", data, grade_options, region_options, school_year_options
+                    "dashboard", grade_options, region_options, school_year_options
                 ))
             ]
         )
@@ -419,7 +429,8 @@ def route_pages(pathname, login_data):
 )
 
 
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='toggleWelcomeModal'),
     Output("welcome-modal", "is_open"),
     Output("welcome-modal-body", "children"),
     Input("login-state", "data"),
@@ -427,31 +438,16 @@ def route_pages(pathname, login_data):
     State("welcome-modal", "is_open"),
     prevent_initial_call=True
 )
-def toggle_welcome_modal(login_data, close_clicks, is_open):
-    ctx = callback_context
-    if not ctx.triggered:
-        raise dash.exceptions.PreventUpdate
-
-    trigger = ctx.triggered[0]["prop_id"].split(".")[0]
-    if trigger == "login-state" and login_data.get("logged_in"):
-        return True, f"Welcome, {login_data.get('user', 'User')}! 🎉"
-    elif trigger == "close-welcome-modal":
-        return False, dash.no_update
 
-    return is_open, dash.no_update
 
-
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='togglePasswordVisibility'),
     Output({'type': 'password-field', 'index': MATCH}, 'type'),
     Output({'type': 'password-toggle', 'index': MATCH}, 'className'),
     Input({'type': 'password-toggle', 'index': MATCH}, 'n_clicks'),
     State({'type': 'password-field', 'index': MATCH}, 'type'),
     prevent_initial_call=True
 )
-def toggle_password_visibility(n_clicks, current_type):
-    if current_type == 'password':
-        return 'text', 'fas fa-eye-slash'
-    return 'password', 'fas fa-eye'
 
 
 # Store user first name (login callback)
@@ -517,62 +513,11 @@ def update_school_year_dropdown(upload_contents, manual_year):
 
 
 
-@app.callback(
-    [Output('gender_pie_chart', 'figure'),
-     Output('enrollment_vs_schools_chart', 'figure'),
-     Output('kpi_card_row', 'children'),
-     Output('most_enrolled_division_card', 'children')],
-    [Input('region_filter', 'value'),
-     Input('grade_filter', 'value'),
-     Input('school_year_filter', 'value'),
-     Input('gender_filter', 'value')]
-)
-
-def update_charts(selected_regions, selected_grades, selected_school_year, selected_gender):
-    if not selected_school_year:
-        raise dash.exceptions.PreventUpdate
-    try:
-        data, grade_columns, _, _ = load_data_for_year(selected_school_year)
-    except FileNotFoundError:
-        raise dash.exceptions.PreventUpdate
-     
-    filtered_data = data.copy()
-
-    if selected_regions:
-        filtered_data = filtered_data[filtered_data['Region'].isin(selected_regions)]
-
-    selected_cols_male = []
-    selected_cols_female = []
-
-    if selected_grades:
-        for grade in selected_grades:
-            if grade in ['G11', 'G12']:
-                selected_cols_male += [col for col in data.columns if col.startswith(grade) and 'Male' in col]
-                selected_cols_female += [col for col in data.columns if col.startswith(grade) and 'Female' in col]
-            else:
-                selected_cols_male += [f"{grade} Male"]
-                selected_cols_female += [f"{grade} Female"]
-    else:
-        selected_cols_male = [col for col in grade_columns if 'Male' in col]
-        selected_cols_female = [col for col in grade_columns if 'Female' in col]
-
-    # Apply gender filtering to the DataFrame
-    filtered_data = data.copy()
-    if selected_gender == 'Male':
-        filtered_data['Selected Grades Total'] = filtered_data[selected_cols_male].sum(axis=1)
-    elif selected_gender == 'Female':
-        filtered_data['Selected Grades Total'] = filtered_data[selected_cols_female].sum(axis=1)
-    else:
-        filtered_data['Selected Grades Total'] = filtered_data[selected_cols_male + selected_cols_female].sum(axis=1)
-
-    # Pie Chart
-    if selected_regions:
-        filtered_data = filtered_data[filtered_data['Region'].isin(selected_regions)]
-    total_male = filtered_data[selected_cols_male].sum().sum()
-    total_female = filtered_data[selected_cols_female].sum().sum()
+def gender_pie_base():
+    """The gender pie's static part: labels, colours, hole and title."""
     pie_chart = px.pie(
         names=['Male', 'Female'],
-        values=[total_male, total_female],
+        values=[0, 0],
         title='Gender Distribution',
         hole=0.6,
         color_discrete_sequence=['#0a4485', '#DE082C']
@@ -588,41 +533,24 @@ def update_charts(selected_regions, selected_grades, selected_school_year, selec
         height=296,  # or adjust for your visual preference
         showlegend=True  # set to False if pie labels suffice
     )
+    return base_figure(pie_chart)
 
-    # Filter by selected regions
-    if selected_regions:
-        filtered_data = filtered_data[filtered_data['Region'].isin(selected_regions)]
-    
-    if selected_gender == 'Male':
-        filtered_data['Selected Grades Total'] = filtered_data[selected_cols_male].sum(axis=1)
-    elif selected_gender == 'Female':
-        filtered_data['Selected Grades Total'] = filtered_data[selected_cols_female].sum(axis=1)
-    else:
-        filtered_data['Selected Grades Total'] = filtered_data[selected_cols_male + selected_cols_female].sum(axis=1)
-
-    # Group by Division and Region
-    agg_division = filtered_data.groupby(['Division', 'Region']).agg({
-        'BEIS School ID': 'count',
-        'Selected Grades Total': 'sum'
-    }).rename(columns={'BEIS School ID': 'Number of Schools'}).reset_index()
-
-    # Sort and select top 15 divisions
-    agg_division = agg_division.sort_values(by='Selected Grades Total', ascending=False).head(15)
 
-    # Create the figure
+def division_combo_base():
+    """The top-divisions chart's static part: the enrollment bars, the schools line and both axes."""
     fig_combo = make_subplots(specs=[[{"secondary_y": True}]])
 
     fig_combo.add_trace(go.Bar(
-        x=agg_division['Division'],
-        y=agg_division['Selected Grades Total'],
+        x=[],
+        y=[],
         name='Total Enrollment',
         marker_color='#0a4485',  # Blue
         hovertemplate='<b>%{x}</b><br>Students: %{y:,}<extra></extra>',
     ), secondary_y=False)
 
     fig_combo.add_trace(go.Scatter(
-        x=agg_division['Division'],
-        y=agg_division['Number of Schools'],
+        x=[],
+        y=[],
         name='Number of Schools',
         line=dict(color='#DE082C'),  # Red
         hovertemplate='<b>%{x}</b><br>Schools: %{y:,}<extra></extra>',
@@ -635,41 +563,78 @@ def update_charts(selected_regions, selected_grades, selected_school_year, selec
         xaxis_title='Division',
         yaxis_title='Total Enrollment'
     )
+    return base_figure(fig_combo)
+
+GENDER_PIE_BASE = gender_pie_base()
+DIVISION_COMBO_BASE = division_combo_base()
+
+@app.callback(
+    [Output('gender_pie_chart', 'figure'),
+     Output('gender_pie_chart-drawn', 'data'),
+     Output('enrollment_vs_schools_chart', 'figure'),
+     Output('enrollment_vs_schools_chart-drawn', 'data'),
+     Output('kpi_card_row', 'children'),
+     Output('most_enrolled_division_card', 'children')],
+    [Input('region_filter', 'value'),
+     Input('grade_filter', 'value'),
+     Input('stored_dataset', 'data'),
+     Input('gender_filter', 'value')],
+    [State('gender_pie_chart-drawn', 'data'),
+     State('enrollment_vs_schools_chart-drawn', 'data')]
+)
+
+def update_charts(selected_regions, selected_grades, stored_key, selected_gender, pie_drawn, combo_drawn):
+    selected_school_year = dataset_year(stored_key)
+    if not selected_school_year:
+        raise dash.exceptions.PreventUpdate
+    try:
+        view = get_filter_view(selected_school_year, selected_regions, selected_grades, selected_gender)
+    except FileNotFoundError:
+        raise dash.exceptions.PreventUpdate
+    cube = view.cube
+
+    # Cube cells in the selected regions, with the grade/gender selection totalled
+    filtered_data = view.cells
+
+    # Pie Chart
+    total_male = filtered_data[cube.value_columns(selected_grades, 'Male')].sum().sum()
+    total_female = filtered_data[cube.value_columns(selected_grades, 'Female')].sum().sum()
+    pie_chart = figure_update(GENDER_PIE_BASE, {
+        ('data', 0, 'values'): [total_male, total_female],
+    }, pie_drawn)
+
+    # Group by Division and Region
+    agg_division = filtered_data.groupby(['Division', 'Region'], observed=True).agg({
+        'Schools': 'sum',
+        'Selected Grades Total': 'sum'
+    }).rename(columns={'Schools': 'Number of Schools'}).reset_index()
+
+    # Sort and select top 15 divisions
+    agg_division = agg_division.sort_values(by='Selected Grades Total', ascending=False).head(15)
+
+    # Fill in both traces
+    fig_combo = figure_update(DIVISION_COMBO_BASE, {
+        ('data', 0, 'x'): agg_division['Division'].tolist(),
+        ('data', 0, 'y'): agg_division['Selected Grades Total'].tolist(),
+        ('data', 1, 'x'): agg_division['Division'].tolist(),
+        ('data', 1, 'y'): agg_division['Number of Schools'].tolist(),
+    }, combo_drawn)
 
     # KPI Cards Layout
     # Aggregate stats
     total_students = int(filtered_data['Selected Grades Total'].sum())
-    total_schools = filtered_data['BEIS School ID'].nunique()
-    region_total = filtered_data.groupby('Region')['Selected Grades Total'].sum().max()
+    total_schools = int(filtered_data['Schools'].sum())
 
     # 🔓 Use full dataset to get the true most enrolled region (before filtering by selected_regions)
-    full_region_data = data.copy()
-
-    # Optional: filter by gender and grades, but NOT by region
-    selected_cols = []
-    if selected_grades:
-        for grade in selected_grades:
-            if grade in ['G11', 'G12']:
-                selected_cols += [col for col in full_region_data.columns if col.startswith(grade)]
-            else:
-                selected_cols += [f"{grade} Male", f"{grade} Female"]
-    else:
-        selected_cols = grade_columns
-
-    if selected_gender == 'Male':
-        full_region_data['Selected Grades Total'] = full_region_data[[col for col in selected_cols if 'Male' in col]].sum(axis=1)
-    elif selected_gender == 'Female':
-        full_region_data['Selected Grades Total'] = full_region_data[[col for col in selected_cols if 'Female' in col]].sum(axis=1)
-    else:
-        full_region_data['Selected Grades Total'] = full_region_data[[col for col in selected_cols]].sum(axis=1)
+    full_region_data = get_filter_view(selected_school_year, None, selected_grades, selected_gender).cells
 
     # 🔍 Calculate most enrolled region regardless of region filter
-    region_enrollment = full_region_data.groupby('Region')['Selected Grades Total'].sum()
+    region_enrollment = full_region_data.groupby('Region', observed=True)['Selected Grades Total'].sum()
     most_enrolled_region = region_enrollment.idxmax()
     region_total = region_enrollment.max()
 
     # Calculate the sector counts and percentages
-    sector_counts = data['Sector'].value_counts()
+    sector_counts = cube.cells.groupby('Sector', observed=True)['Schools'].sum()
     sector_total_schools = sector_counts.sum()
     sector_percentage = (sector_counts / sector_total_schools) * 100
 
@@ -799,7 +764,7 @@ def update_charts(selected_regions, selected_grades, selected_school_year, selec
     
 
     # Standalone Most Enrolled Division Card
-    most_enrolled_division_text = filtered_data.groupby('Division')['Selected Grades Total'].sum().idxmax()
+    most_enrolled_division_text = filtered_data.groupby('Division', observed=True)['Selected Grades Total'].sum().idxmax()
     most_enrolled_division_card = html.Div([
         dbc.Card(
             dbc.CardBody([
@@ -813,7 +778,7 @@ def update_charts(selected_regions, selected_grades, selected_school_year, selec
         )
     ])
 
-    return pie_chart, fig_combo, kpi_cards, most_enrolled_division_card
+    return pie_chart, True, fig_combo, True, kpi_cards, most_enrolled_division_card
 
 @app.callback(
     Output('school_search', 'options'),
@@ -821,96 +786,154 @@ def update_charts(selected_regions, selected_grades, selected_school_year, selec
     State('school_search', 'value')
 )
 def update_school_options(search_value, current_value):
-    options = []
-
-    # Convert BEIS IDs to string for safety
-    data['BEIS School ID'] = data['BEIS School ID'].astype(str)
-
-    if not search_value:
-        sample = data[['BEIS School ID', 'School Name']].dropna().head(10)
-    else:
-        sample = data[
-            data['School Name'].str.contains(search_value, case=False, na=False) |
-            data['BEIS School ID'].astype(str).str.contains(search_value)
-        ].head(20)
+    try:
+        index = get_school_search_index(default_school_year)
+    except FileNotFoundError:
+        return []
 
+    # First 10 schools when the box is empty, otherwise the 20 best matches
+    matches = index.search(search_value, limit=20 if search_value else 10)
     options = [
-        {'label': f"{row['BEIS School ID']} - {row['School Name']}", 'value': row['BEIS School ID']}
-        for _, row in sample.iterrows()
+        {'label': f"{school_id} - {school_name}", 'value': school_id}
+        for school_id, school_name in matches
     ]
 
     if current_value and all(opt['value'] != current_value for opt in options):
-        match = data[data['BEIS School ID'] == current_value]
-        if not match.empty:
-            row = match.iloc[0]
-            top_option = {'label': f"{row['BEIS School ID']} - {row['School Name']}", 'value': row['BEIS School ID']}
-            options.insert(0, top_option)
+        current = index.get(current_value)
+        if current is not None:
+            options.insert(0, {'label': f"{current[0]} - {current[1]}", 'value': current[0]})
     return options
 
+def school_profile(school_id):
+    """schools.csv fields for a school, or an empty dict if it is not registered."""
+    try:
+        return get_school_registry().by_id(school_id)
+    except KeyError:
+        return {}
+
+def school_history_sparkline(school_id):
+    """Small line chart of a school's total enrollment in every available year."""
+    history = get_school_history(school_id)
+    fig = go.Figure(go.Scatter(
+        x=history['School Year'],
+        y=history['Total Enrollment'],
+        mode='lines+markers',
+        line=dict(color='#0a4485', width=2),
+        marker=dict(size=5, color='#0a4485'),
+        hovertemplate='%{x}: %{y:,}<extra></extra>'
+    ))
+    fig.update_layout(
+        title=dict(text='Enrollment history', font=dict(size=13)),
+        margin=dict(l=10, r=10, t=30, b=10),
+        height=140,
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        xaxis=dict(showgrid=False, tickfont=dict(size=10)),
+        yaxis=dict(showgrid=False, visible=False)
+    )
+    return fig
+
+# Opening needs the school's profile from the server; closing happens in the browser
 @app.callback(
     Output('school_modal', 'is_open'),
     Output('modal_school_name', 'children'),
     Output('modal_school_body', 'children'),
     Input('school_search', 'value'),
-    Input('modal_close_btn', 'n_clicks'),
     State('school_modal', 'is_open')
 )
-def toggle_modal(school_id, close_click, is_open):
-    ctx = callback_context
-    if not ctx.triggered:
-        return is_open, "", ""
-
-    trigger_id = ctx.triggered[0]['prop_id'].split('.')[0]
-
-    if trigger_id == 'modal_close_btn':
-        return False, "", ""
-
+def toggle_modal(school_id, is_open):
     if school_id:
-        # Convert both to string for consistent comparison
-        school_id_str = str(school_id)
-        data['BEIS School ID'] = data['BEIS School ID'].astype(str)
+        totals = get_totals_index(default_school_year).school_totals(school_id)
 
-        match = data[data['BEIS School ID'] == school_id_str]
-
-        if not match.empty:
-            school = match.iloc[0]
-            return True, school['School Name'], html.Div([
+        if totals is not None:
+            school = school_profile(school_id)
+            male, female = totals
+            return True, school.get('School Name', 'N/A'), html.Div([
                 html.P(f"Region: {school.get('Region', 'N/A')}"),
                 html.P(f"Division: {school.get('Division', 'N/A')}"),
                 html.P(f"Barangay: {school.get('Barangay', 'N/A')}"),
-                html.P(f"Total Enrollment: {school.get('Total Enrollment', 'N/A'):,}"),
-                html.P(f"Male: {school.get('Total Male', 'N/A'):,}"),
-                html.P(f"Female: {school.get('Total Female', 'N/A'):,}")
+                html.P(f"Total Enrollment: {male + female:,}"),
+                html.P(f"Male: {male:,}"),
+                html.P(f"Female: {female:,}"),
+                dcc.Graph(
+                    figure=school_history_sparkline(school_id),
+                    config={'displayModeBar': False},
+                    style={'height': '140px'}
+                )
             ])
         else:
             return False, "", html.Div("⚠ School not found.")
     
     return is_open, "", ""
 
+app.clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='closeSchoolModal'),
+    Output('school_modal', 'is_open', allow_duplicate=True),
+    Input('modal_close_btn', 'n_clicks'),
+    prevent_initial_call=True
+)
+
+
+
+
+def shs_track_base():
+    """The SHS track chart's static layout and one styled trace template per grade level."""
+    fig = px.bar(
+        pd.DataFrame({'Display Enrollment': [0, 0], 'Track': ['', ''], 'Grade Level': ['G11', 'G12'],
+                      'Total Enrollment': [0, 0]}),
+        x='Display Enrollment',
+        y='Track',
+        color='Grade Level',
+        orientation='h',
+        text='Total Enrollment',
+        title='Senior High Track Enrollment Overview',
+        custom_data=['Grade Level', 'Total Enrollment'],  # ✅ Pass Grade Level for hovertemplate
+        color_discrete_map={
+            'G12': '#0a4485',   # Blue
+            'G11': '#DE082C'    # Red
+        }
+    )
+
+    fig.update_traces(
+        hovertemplate=(
+            "Grade Level: %{customdata[0]}<br>" +
+            "Track: %{y}<br>" +
+            "Enrollment: %{customdata[1]:,} students<extra></extra>"
+        ),
+        texttemplate='%{customdata[1]:,}',
+        textposition='none'
+    )
 
+    fig.update_layout(
+        title='Senior High Track Enrollment Overview',
+        font=dict(size=13),
+        height=350,
+        xaxis_title='Enrollment',
+        yaxis_title='Track',
+        title_font=PLOT_TITLE,
+    )
+    templates = trace_templates(fig, ['G11', 'G12'])
+    return base_figure(fig.update(data=[])), templates
 
+SHS_TRACK_BASE, SHS_TRACK_TRACES = shs_track_base()
 
 @app.callback(
     Output('shs_track_bar_chart', 'figure'),
-    Input('school_year_filter', 'value'),
+    Output('shs_track_bar_chart-drawn', 'data'),
+    Input('stored_dataset', 'data'),
     Input('region_filter', 'value'),
-    Input('gender_filter', 'value')
+    Input('gender_filter', 'value'),
+    State('shs_track_bar_chart-drawn', 'data')
 )
-def update_shs_track_chart(selected_school_year, selected_regions, selected_gender):
+def update_shs_track_chart(stored_key, selected_regions, selected_gender, drawn):
+    selected_school_year = dataset_year(stored_key)
     if not selected_school_year:
         raise dash.exceptions.PreventUpdate
     try:
-        data, grade_columns, _, _ = load_data_for_year(selected_school_year)
+        # Only the selected regions' partitions and gender's strand columns are loaded
+        df_filtered = get_shs_track_df(selected_school_year, selected_regions, selected_gender)
     except FileNotFoundError:
         raise dash.exceptions.PreventUpdate
-    df_filtered = combined_shs_track_df.copy()
-    # 🧠 Filter by region
-    if selected_regions:
-        df_filtered = df_filtered[df_filtered['Region'].isin(selected_regions)]
-
-    # 🧠 Filter by gender
-    if selected_gender != 'All':
-        df_filtered = df_filtered[df_filtered['Gender'] == selected_gender]
 
     # ✅ Final protection: prevent plotly from erroring on empty or malformed data
     if df_filtered.empty:
@@ -918,110 +941,34 @@ def update_shs_track_chart(selected_school_year, selected_regions, selected_gend
             title="No data available for the selected filters",
             xaxis_title='Total Enrollment',
             yaxis_title='Track'
-        )
+        ), None
 
     # 🧾 Group the data
     grouped = df_filtered.groupby(['Track', 'Grade Level'], as_index=False)['Total Enrollment'].sum()
 
     # 🔐 Defensive: check again if grouped is empty
     if grouped.empty:
-        return px.bar(title="No data to display")
+        return px.bar(title="No data to display"), None
     
     # Sort the grouped data by 'Total Enrollment' in ascending order
     grouped = grouped.sort_values(by='Total Enrollment', ascending=True)
 
     grouped['Display Enrollment'] = grouped['Total Enrollment'] + 30000
 
-    # 📊 Plot the chart safely
-    try:
-        fig = px.bar(
-            grouped,
-            x='Display Enrollment',
-            y='Track',
-            color='Grade Level',
-            orientation='h',
-            text='Total Enrollment',
-            title='Senior High Track Enrollment Overview',
-            custom_data=['Grade Level', 'Total Enrollment'],  # ✅ Pass Grade Level for hovertemplate
-            color_discrete_map={
-                'G12': '#0a4485',   # Blue
-                'G11': '#DE082C'    # Red
-            }
-        )
-
-        fig.update_traces(
-            hovertemplate=(
-                "Grade Level: %{customdata[0]}<br>" +
-                "Track: %{y}<br>" +
-                "Enrollment: %{customdata[1]:,} students<extra></extra>"
-            ),
-            texttemplate='%{customdata[1]:,}',
-            textposition='none'
-        )
-
-        fig.update_layout(
-            title='Senior High Track Enrollment Overview',
-            font=dict(size=13),
-            height=350,
-            xaxis_title='Enrollment',
-            yaxis_title='Track',
-            title_font=PLOT_TITLE,
-        )
-        return fig
-    except Exception as e:
-        print("SHS Chart Rendering Error:", e)
-        return px.bar(title="Error rendering SHS Track chart")
+    # 📊 One bar trace per grade level, in order of first appearance
+    traces = group_traces(SHS_TRACK_TRACES, [
+        (grade, {
+            'x': rows['Display Enrollment'].tolist(),
+            'y': rows['Track'].tolist(),
+            'text': rows['Total Enrollment'].tolist(),
+            'customdata': rows[['Grade Level', 'Total Enrollment']].values.tolist(),
+        })
+        for grade, rows in grouped.groupby('Grade Level', sort=False)
+    ])
+    return figure_update(SHS_TRACK_BASE, {('data',): traces}, drawn), True
     
-@app.callback(
-    Output('top_schools_chart', 'figure'),
-    Input('region_filter', 'value'),
-    Input('grade_filter', 'value'),
-    Input('gender_filter', 'value'),
-    Input('school_year_filter', 'value')
-)
-def update_top_schools_chart(selected_regions, selected_grades, selected_gender, selected_school_year):
-    if not selected_school_year:
-        raise dash.exceptions.PreventUpdate
-    try:
-        data, grade_columns, _, _ = load_data_for_year(selected_school_year)
-    except FileNotFoundError:
-        raise dash.exceptions.PreventUpdate
-     
-    filtered_data = data.copy()
-    if selected_regions:
-        filtered_data = filtered_data[filtered_data['Region'].isin(selected_regions)]
-
-    selected_cols_male = []
-    selected_cols_female = []
-
-    if selected_grades:
-        for grade in selected_grades:
-            if grade in ['G11', 'G12']:
-                selected_cols_male += [col for col in data.columns if col.startswith(grade) and 'Male' in col]
-                selected_cols_female += [col for col in data.columns if col.startswith(grade) and 'Female' in col]
-            else:
-                selected_cols_male += [f"{grade} Male"]
-                selected_cols_female += [f"{grade} Female"]
-    else:
-        selected_cols_male = [col for col in grade_columns if 'Male' in col]
-        selected_cols_female = [col for col in grade_columns if 'Female' in col]
-
-    # Apply gender filtering to the DataFrame
-    if selected_gender == 'Male':
-        filtered_data['Filtered Enrollment'] = filtered_data[selected_cols_male].sum(axis=1)
-    elif selected_gender == 'Female':
-        filtered_data['Filtered Enrollment'] = filtered_data[selected_cols_female].sum(axis=1)
-    else:
-        filtered_data['Filtered Enrollment'] = filtered_data[selected_cols_male + selected_cols_female].sum(axis=1)
-
-    # Top 5 schools by enrollment (regardless of sector)
-    top_schools_df = (
-        filtered_data.groupby(['School Name', 'Sector'], as_index=False)['Filtered Enrollment']
-        .sum()
-        .sort_values(by='Filtered Enrollment', ascending=False)
-        .head(5)
-    )
-
+def top_schools_base():
+    """The top-schools chart's static layout and one styled bar template per sector."""
     # Color scheme
     colors = {
         'Public': '#0a4485',
@@ -1029,32 +976,18 @@ def update_top_schools_chart(selected_regions, selected_grades, selected_gender,
         'SUCsLUCs': '#007BFF'
     }
 
-    # Create sector-based traces
     fig = go.Figure()
     for sector in ['Public', 'Private', 'SUCsLUCs']:
-        sector_data = top_schools_df[top_schools_df['Sector'] == sector]
-        if not sector_data.empty:
-            fig.add_trace(go.Bar(
-                y=sector_data['School Name'],
-                x=sector_data['Filtered Enrollment'],
-                name=sector,
-                orientation='h',
-                marker=dict(color=colors.get(sector, '#7f8c8d')),
-                text=sector_data['Filtered Enrollment'].map('{:,.0f}'.format),
-                textposition='inside',
-                hovertemplate='<b>%{y}</b><br>Enrollment: %{x:,}<extra></extra>'
-            ))
-
-    # Wrap the school names by inserting a line break between the first and second parts
-    wrapped_labels = []
-    for name in top_schools_df['School Name']:
-        parts = name.split(' ', 2)  # Split into the first two parts
-        if len(parts) > 2:
-            # Join the first two words and the rest with <br> between them
-            wrapped_labels.append(parts[0] + ' ' + parts[1] + '<br>' + parts[2])
-        else:
-            # If there are only two parts, simply join them
-            wrapped_labels.append(parts[0] + ' ' + parts[1])
+        fig.add_trace(go.Bar(
+            y=[],
+            x=[],
+            name=sector,
+            orientation='h',
+            marker=dict(color=colors.get(sector, '#7f8c8d')),
+            text=[],
+            textposition='inside',
+            hovertemplate='<b>%{y}</b><br>Enrollment: %{x:,}<extra></extra>'
+        ))
 
     fig.update_layout(
         title='Top 5 Most Enrolled Schools',
@@ -1068,77 +1001,89 @@ def update_top_schools_chart(selected_regions, selected_grades, selected_gender,
         xaxis=dict(title='Enrollment', gridcolor='rgba(0,0,0,0.05)'),
         yaxis=dict(
             categoryorder='array',
-            categoryarray=top_schools_df['School Name'].tolist()[::-1],
+            categoryarray=[],
             title='',
             showgrid=False,
             automargin=True,
             ticklabelposition="outside left",
             tickfont=dict(size=13, family="Arial"),
             ticksuffix='  ',
-            ticktext=wrapped_labels,  # Use wrapped labels with <br> breaks
+            ticktext=[],  # Use wrapped labels with <br> breaks
             tickmode='array',  # Ensure ticktext is an array
-            tickvals=top_schools_df['School Name'].tolist()[::-1]  # Ensure tickvals correspond to wrapped labels
+            tickvals=[]  # Ensure tickvals correspond to wrapped labels
         ),
 
         font=dict(size=13),
         legend=dict(orientation='h', y=-0.25, x=0.5, xanchor='center'),
         title_font=PLOT_TITLE,
     )
-    return fig
+    templates = trace_templates(fig, ['Public', 'Private', 'SUCsLUCs'])
+    return base_figure(fig.update(data=[])), templates
+
+TOP_SCHOOLS_BASE, TOP_SCHOOLS_TRACES = top_schools_base()
 
 @app.callback(
-    Output('sned_sector_chart', 'figure'),
-    Input('school_year_filter', 'value'),
+    Output('top_schools_chart', 'figure'),
+    Output('top_schools_chart-drawn', 'data'),
     Input('region_filter', 'value'),
-    Input('gender_filter', 'value')
+    Input('grade_filter', 'value'),
+    Input('gender_filter', 'value'),
+    Input('stored_dataset', 'data'),
+    State('top_schools_chart-drawn', 'data')
 )
-def update_sned_sector_chart(selected_school_year, selected_regions, selected_gender):
+def update_top_schools_chart(selected_regions, selected_grades, selected_gender, stored_key, drawn):
+    selected_school_year = dataset_year(stored_key)
     if not selected_school_year:
         raise dash.exceptions.PreventUpdate
     try:
-        data, grade_columns, _, _ = load_data_for_year(selected_school_year)
+        view = get_filter_view(selected_school_year, selected_regions, selected_grades, selected_gender)
     except FileNotFoundError:
         raise dash.exceptions.PreventUpdate
-    filtered_df = data.copy()
-    if selected_regions:
-        filtered_df = filtered_df[filtered_df['Region'].isin(selected_regions)]
-
-    # Select relevant columns for NG enrollment
-    male_ng_cols = [col for col in filtered_df.columns if 'NG' in col and 'Male' in col]
-    female_ng_cols = [col for col in filtered_df.columns if 'NG' in col and 'Female' in col]
-
-    if selected_gender == 'Male':
-        filtered_df['SNed'] = filtered_df[male_ng_cols].sum(axis=1)
-        gender_cols = ['SNed']
-        stack_name_map = {'SNed': 'Male'}
-    elif selected_gender == 'Female':
-        filtered_df['SNed'] = filtered_df[female_ng_cols].sum(axis=1)
-        gender_cols = ['SNed']
-        stack_name_map = {'SNed': 'Female'}
-    else:
-        filtered_df['SNed_Male'] = filtered_df[male_ng_cols].sum(axis=1)
-        filtered_df['SNed_Female'] = filtered_df[female_ng_cols].sum(axis=1)
-        gender_cols = ['SNed_Male', 'SNed_Female']
-        stack_name_map = {'SNed_Male': 'Male', 'SNed_Female': 'Female'}
 
-    # Group by sector and sum
-    grouped = filtered_df.groupby('Sector')[gender_cols].sum().reset_index()
-    melted = pd.melt(grouped, id_vars='Sector', var_name='Gender', value_name='Enrollment')
-    melted['Gender'] = melted['Gender'].map(stack_name_map)
+    # Top 5 schools by enrollment (regardless of sector)
+    top_schools_df = view.top_schools(5)
 
-    melted['Enrollment_boosted'] = melted['Enrollment'].apply(lambda x: x + 1000 if x > 0 else x)
+    # Sector-based traces, for the sectors present
+    filled = []
+    for sector in ['Public', 'Private', 'SUCsLUCs']:
+        sector_data = top_schools_df[top_schools_df['Sector'] == sector]
+        if not sector_data.empty:
+            filled.append((sector, {
+                'y': sector_data['School Name'].tolist(),
+                'x': sector_data['Filtered Enrollment'].tolist(),
+                'text': sector_data['Filtered Enrollment'].map('{:,.0f}'.format).tolist(),
+            }))
 
+    # Wrap the school names by inserting a line break between the first and second parts
+    wrapped_labels = []
+    for name in top_schools_df['School Name']:
+        parts = name.split(' ', 2)  # Split into the first two parts
+        if len(parts) > 2:
+            # Join the first two words and the rest with <br> between them
+            wrapped_labels.append(parts[0] + ' ' + parts[1] + '<br>' + parts[2])
+        else:
+            # If there are only two parts, simply join them
+            wrapped_labels.append(parts[0] + ' ' + parts[1])
+
+    return figure_update(TOP_SCHOOLS_BASE, {
+        ('data',): group_traces(TOP_SCHOOLS_TRACES, filled),
+        ('layout', 'yaxis', 'categoryarray'): top_schools_df['School Name'].tolist()[::-1],
+        ('layout', 'yaxis', 'ticktext'): wrapped_labels,
+        ('layout', 'yaxis', 'tickvals'): top_schools_df['School Name'].tolist()[::-1],
+    }, drawn), True
+
+def sned_sector_base():
+    """The SNEd sector chart's static part: one styled bar trace per gender and the layout."""
     fig = go.Figure()
 
     # Create a bar trace for each gender
     for gender in ['Male', 'Female']:
-        gender_df = melted[melted['Gender'] == gender]
         fig.add_trace(go.Bar(
-            x=gender_df['Sector'],
-            y=gender_df['Enrollment_boosted'],
+            x=[],
+            y=[],
             name=gender,
             marker_color='#0a4485' if gender == 'Male' else '#DE082C',
-            customdata=gender_df[['Sector', 'Gender', 'Enrollment']],
+            customdata=[],
             hovertemplate=(
                 "Sector: %{customdata[0]}<br>" +
                 "Gender: %{customdata[1]}<br>" +
@@ -1160,59 +1105,58 @@ def update_sned_sector_chart(selected_school_year, selected_regions, selected_ge
         title_font=PLOT_TITLE,
     )
 
-    return fig
+    return base_figure(fig)
+
+SNED_SECTOR_BASE = sned_sector_base()
 
 @app.callback(
-    Output('transition_rate_chart', 'figure'),
-    Input('school_year_filter', 'value'),
+    Output('sned_sector_chart', 'figure'),
+    Output('sned_sector_chart-drawn', 'data'),
+    Input('stored_dataset', 'data'),
     Input('region_filter', 'value'),
-    Input('gender_filter', 'value')
+    Input('gender_filter', 'value'),
+    State('sned_sector_chart-drawn', 'data')
 )
-def update_transition_rate_chart(selected_sy, selected_regions, selected_gender):
-    try:
-        data_curr, _, _, _ = load_data_for_year(selected_sy)
-    except Exception:
-        return go.Figure().update_layout(title="No data available", title_font=PLOT_TITLE)
-
-    previous_sy = f"{int(selected_sy.split('-')[0]) - 1}-{int(selected_sy.split('-')[1]) - 1}"
+def update_sned_sector_chart(stored_key, selected_regions, selected_gender, drawn):
+    selected_school_year = dataset_year(stored_key)
+    if not selected_school_year:
+        raise dash.exceptions.PreventUpdate
     try:
-        data_prev, _, _, _ = load_data_for_year(previous_sy)
-    except Exception:
-        data_prev = None
+        tensor = get_enrollment_tensor(selected_school_year)
+    except FileNotFoundError:
+        raise dash.exceptions.PreventUpdate
 
-    df_sy_n = data_curr.copy()
-    df_sy_n1 = data_prev.copy() if data_prev is not None else pd.DataFrame()
+    # Non-graded (SNEd) enrollment by sector
+    ng_levels = ['Elem NG', 'JHS NG']
+    if selected_gender in ['Male', 'Female']:
+        sned = {'SNed': tensor.select(selected_regions, ng_levels, selected_gender).sum_by('Sector')}
+        stack_name_map = {'SNed': selected_gender}
+    else:
+        sned = {
+            'SNed_Male': tensor.select(selected_regions, ng_levels, 'Male').sum_by('Sector'),
+            'SNed_Female': tensor.select(selected_regions, ng_levels, 'Female').sum_by('Sector'),
+        }
+        stack_name_map = {'SNed_Male': 'Male', 'SNed_Female': 'Female'}
 
-    if selected_regions:
-        df_sy_n = df_sy_n[df_sy_n['Region'].isin(selected_regions)]
-        df_sy_n1 = df_sy_n1[df_sy_n1['Region'].isin(selected_regions)]
-
-    def gender_filter(df, grade_base):
-        if selected_gender == 'Male':
-            cols = [f"{grade_base} Male"]
-        elif selected_gender == 'Female':
-            cols = [f"{grade_base} Female"]
-        else:
-            cols = [f"{grade_base} Male", f"{grade_base} Female"]
-        return df[cols].sum().sum() if all(col in df.columns for col in cols) else 0
+    # Group by sector and sum
+    grouped = pd.DataFrame(sned).rename_axis('Sector').reset_index()
+    melted = pd.melt(grouped, id_vars='Sector', var_name='Gender', value_name='Enrollment')
+    melted['Gender'] = melted['Gender'].map(stack_name_map)
 
-    if df_sy_n1.empty:
-        tr_elem_jhs = 0
-        tr_jhs_shs = 0
-        no_prev = True
-    else:
-        g6 = gender_filter(df_sy_n1, "G6")
-        g7 = gender_filter(df_sy_n, "G7")
-        tr_elem_jhs = (g7 / g6) * 100 if g6 else 0
+    melted['Enrollment_boosted'] = melted['Enrollment'].apply(lambda x: x + 1000 if x > 0 else x)
 
-        g10 = gender_filter(df_sy_n1, "G10")
-        g11_cols = [col for col in df_sy_n.columns if "G11" in col and (selected_gender in col or selected_gender == 'All')]
-        g11 = df_sy_n[g11_cols].sum().sum() if g11_cols else 0
-        tr_jhs_shs = (g11 / g10) * 100 if g10 else 0
-        no_prev = False
+    # Fill in the bar trace of each gender
+    updates = {}
+    for i, gender in enumerate(['Male', 'Female']):
+        gender_df = melted[melted['Gender'] == gender]
+        updates[('data', i, 'x')] = gender_df['Sector'].tolist()
+        updates[('data', i, 'y')] = gender_df['Enrollment_boosted'].tolist()
+        updates[('data', i, 'customdata')] = gender_df[['Sector', 'Gender', 'Enrollment']].values.tolist()
 
-    fig = go.Figure()
+    return figure_update(SNED_SECTOR_BASE, updates, drawn), True
 
+def transition_rate_base():
+    """The transition gauges' static part: both indicators, their captions and the title."""
     fig = make_subplots(
         rows=1, cols=2,
         specs=[[{"type":"indicator"}, {"type":"indicator"}]],
@@ -1222,7 +1166,7 @@ def update_transition_rate_chart(selected_sy, selected_regions, selected_gender)
     fig.add_trace(
         go.Indicator(
             mode="gauge+number+delta",
-            value=tr_elem_jhs,
+            value=0,
             number={"suffix": "%"},           
             gauge={"axis": {"range": [0, 110]}, "bar": {"color": "#0a4485"} },
         ),
@@ -1232,7 +1176,7 @@ def update_transition_rate_chart(selected_sy, selected_regions, selected_gender)
     fig.add_trace(
         go.Indicator(
             mode="gauge+number+delta",
-            value=tr_jhs_shs,
+            value=0,
             number={"suffix": "%"},          
             gauge={"axis": {"range": [0, 110]}, "bar": {"color": "#DE082C"}},
         ),
@@ -1257,7 +1201,7 @@ def update_transition_rate_chart(selected_sy, selected_regions, selected_gender)
             ),
         ],
         title={
-            "text": "Transition Rate" if not no_prev else "Transition Rate - No previous year available",
+            "text": "Transition Rate",
             "x": 0.5,
             "xanchor": "center",
             "y": 0.98,
@@ -1269,88 +1213,80 @@ def update_transition_rate_chart(selected_sy, selected_regions, selected_gender)
         title_font=PLOT_TITLE
     )
 
-    return fig
+    return base_figure(fig)
+
+TRANSITION_RATE_BASE = transition_rate_base()
 
 @app.callback(
-    Output('k_to_12_distribution_chart', 'figure'),
+    Output('transition_rate_chart', 'figure'),
+    Output('transition_rate_chart-drawn', 'data'),
+    Input('stored_dataset', 'data'),
     Input('region_filter', 'value'),
     Input('gender_filter', 'value'),
-    Input('school_year_filter', 'value')
+    State('transition_rate_chart-drawn', 'data')
 )
-
-def update_k_to_12_distribution(selected_regions, selected_gender, selected_school_year):
-    if not selected_school_year:
-        raise dash.exceptions.PreventUpdate
+def update_transition_rate_chart(stored_key, selected_regions, selected_gender, drawn):
+    selected_sy = dataset_year(stored_key)
     try:
-        data, grade_columns, _, _ = load_data_for_year(selected_school_year)
+        get_totals_index(selected_sy)
+        rates = get_transition_rates()
     except FileNotFoundError:
-        raise dash.exceptions.PreventUpdate
-     
-    filtered = data.copy()
+        # The selected year's file is gone; a missing previous year is handled below
+        return go.Figure().update_layout(title="No data available", title_font=PLOT_TITLE), None
+
+    # Rates use the previous school year's G6/G10 against this year's G7/G11
+    tr_elem_jhs = rates.rate(selected_sy, 'elem_jhs', selected_regions, selected_gender)
+    tr_jhs_shs = rates.rate(selected_sy, 'jhs_shs', selected_regions, selected_gender)
+    no_prev = tr_elem_jhs is None
+    if no_prev:
+        tr_elem_jhs = 0
+        tr_jhs_shs = 0
 
-    if selected_regions:
-        filtered = filtered[filtered['Region'].isin(selected_regions)]
+    return figure_update(TRANSITION_RATE_BASE, {
+        ('data', 0, 'value'): tr_elem_jhs,
+        ('data', 1, 'value'): tr_jhs_shs,
+        ('layout', 'title', 'text'): "Transition Rate" if not no_prev else "Transition Rate - No previous year available",
+    }, drawn), True
 
-    # Define grade groupings
-    level_order = ['K', 'G1', 'G2', 'G3', 'G4', 'G5', 'G6', 'Elem NG',
+# Grade groupings of the K-12 distribution chart
+K12_LEVEL_ORDER = ['K', 'G1', 'G2', 'G3', 'G4', 'G5', 'G6', 'Elem NG',
                    'G7', 'G8', 'G9', 'G10', 'JHS NG', 'G11', 'G12']
-    level_labels = {
-        'K': 'Kinder', 'G1': 'Grade 1', 'G2': 'Grade 2', 'G3': 'Grade 3', 'G4': 'Grade 4',
-        'G5': 'Grade 5', 'G6': 'Grade 6', 'Elem NG': 'NG-ES', 'G7': 'Grade 7',
-        'G8': 'Grade 8', 'G9': 'Grade 9', 'G10': 'Grade 10', 'JHS NG': 'NG-JHS',
-        'G11': 'Grade 11', 'G12': 'Grade 12'
-    }
-
-    level_group = {
-        'K': 'ES', 'G1': 'ES', 'G2': 'ES', 'G3': 'ES', 'G4': 'ES', 'G5': 'ES', 'G6': 'ES', 'Elem NG': 'ES',
-        'G7': 'JHS', 'G8': 'JHS', 'G9': 'JHS', 'G10': 'JHS', 'JHS NG': 'JHS',
-        'G11': 'SHS', 'G12': 'SHS'
-    }
-
-    records = []
-    for level in level_order:
-        if level in ['G11', 'G12']:
-            male_cols = [col for col in data.columns if col.startswith(level) and 'Male' in col]
-            female_cols = [col for col in data.columns if col.startswith(level) and 'Female' in col]
-        else:
-            male_cols = [col for col in data.columns if col == f"{level} Male"]
-            female_cols = [col for col in data.columns if col == f"{level} Female"]
+K12_LEVEL_LABELS = {
+    'K': 'Kinder', 'G1': 'Grade 1', 'G2': 'Grade 2', 'G3': 'Grade 3', 'G4': 'Grade 4',
+    'G5': 'Grade 5', 'G6': 'Grade 6', 'Elem NG': 'NG-ES', 'G7': 'Grade 7',
+    'G8': 'Grade 8', 'G9': 'Grade 9', 'G10': 'Grade 10', 'JHS NG': 'NG-JHS',
+    'G11': 'Grade 11', 'G12': 'Grade 12'
+}
 
+K12_LEVEL_GROUP = {
+    'K': 'ES', 'G1': 'ES', 'G2': 'ES', 'G3': 'ES', 'G4': 'ES', 'G5': 'ES', 'G6': 'ES', 'Elem NG': 'ES',
+    'G7': 'JHS', 'G8': 'JHS', 'G9': 'JHS', 'G10': 'JHS', 'JHS NG': 'JHS',
+    'G11': 'SHS', 'G12': 'SHS'
+}
 
+K12_GROUP_NAMES = {
+    'ES': 'Elementary School',
+    'JHS': 'Junior High School',
+    'SHS': 'Senior High School'
+}
 
-        if selected_gender == 'Male':
-            total = filtered[male_cols].sum().sum()
-        elif selected_gender == 'Female':
-            total = filtered[female_cols].sum().sum()
-        else:
-            total = filtered[male_cols + female_cols].sum().sum()
 
-        records.append({
-            'Level': level_labels[level],
-            'Enrollment': total,
-            'Group': level_group[level]
-        })
-
-    dist_df = pd.DataFrame(records)
-
-    group_map = {
-        'ES': 'Elementary School',
-        'JHS': 'Junior High School',
-        'SHS': 'Senior High School'
-    }
-
-    dist_df['Group Label'] = dist_df['Group'].map(group_map)
-
-    dist_df['Display Enrollment'] = dist_df['Enrollment'].apply(
-    lambda x: x + 30000 if x < 100000 else x
-    )
+def k_to_12_base():
+    """The grade-level chart's static part: one styled trace per school level, bars in grade order."""
+    dist_df = pd.DataFrame({
+        'Level': [K12_LEVEL_LABELS[level] for level in K12_LEVEL_ORDER],
+        'Group': [K12_LEVEL_GROUP[level] for level in K12_LEVEL_ORDER],
+        'Display Enrollment': 0,
+        'Enrollment': 0,
+    })
+    dist_df['Group Label'] = dist_df['Group'].map(K12_GROUP_NAMES)
 
     fig = px.bar(
         dist_df,
         x='Level',
         y='Display Enrollment',
         color='Group',
-        category_orders={'Level': list(level_labels.values())},
+        category_orders={'Level': list(K12_LEVEL_LABELS.values())},
         color_discrete_map={'ES': '#0a4485', 'JHS': '#BFDBFE', 'SHS': '#DE082C'},
         custom_data=['Group Label', 'Level', 'Enrollment'],  
         title='Enrollment Across Grade and Non Grade Levels',
@@ -1380,10 +1316,70 @@ def update_k_to_12_distribution(selected_regions, selected_gender, selected_scho
         title_font=PLOT_TITLE,
     )
 
-    return fig
+    return base_figure(fig)
+
+K12_DISTRIBUTION_BASE = k_to_12_base()
+
+@app.callback(
+    Output('k_to_12_distribution_chart', 'figure'),
+    Output('k_to_12_distribution_chart-drawn', 'data'),
+    Input('region_filter', 'value'),
+    Input('gender_filter', 'value'),
+    Input('stored_dataset', 'data'),
+    State('k_to_12_distribution_chart-drawn', 'data')
+)
+
+def update_k_to_12_distribution(selected_regions, selected_gender, stored_key, drawn):
+    selected_school_year = dataset_year(stored_key)
+    if not selected_school_year:
+        raise dash.exceptions.PreventUpdate
+    try:
+        view = get_filter_view(selected_school_year, selected_regions, None, selected_gender)
+    except FileNotFoundError:
+        raise dash.exceptions.PreventUpdate
+    cube = view.cube
 
-with open('ph.json', 'r', encoding='utf-8') as file:
-    geojson_data = json.load(file)
+    filtered = view.cells
+
+    records = []
+    for level in K12_LEVEL_ORDER:
+        total = filtered[cube.value_columns([level], selected_gender)].sum().sum()
+
+        records.append({
+            'Level': K12_LEVEL_LABELS[level],
+            'Enrollment': total,
+            'Group': K12_LEVEL_GROUP[level]
+        })
+
+    dist_df = pd.DataFrame(records)
+
+    dist_df['Group Label'] = dist_df['Group'].map(K12_GROUP_NAMES)
+
+    dist_df['Display Enrollment'] = dist_df['Enrollment'].apply(
+    lambda x: x + 30000 if x < 100000 else x
+    )
+
+    # Fill in the bars of each school level; the levels themselves never change
+    updates = {}
+    for i, (group, rows) in enumerate(dist_df.groupby('Group', sort=False)):
+        updates[('data', i, 'y')] = rows['Display Enrollment'].tolist()
+        updates[('data', i, 'text')] = rows['Enrollment'].tolist()
+        updates[('data', i, 'customdata')] = rows[['Group Label', 'Level', 'Enrollment']].values.tolist()
+
+    return figure_update(K12_DISTRIBUTION_BASE, updates, drawn), True
+
+# Region outlines, simplified offline into a static asset (see data_engine.geometry): figures
+# reference it by URL, so the browser fetches it once instead of with every map update
+REGION_GEOMETRY_ASSET = 'ph.simplified.json'
+region_geometry = load_region_geometry('ph.json', os.path.join('assets', REGION_GEOMETRY_ASSET))
+region_geometry_url = app.get_asset_url(REGION_GEOMETRY_ASSET)
+# Map extent from the precomputed bounds, with a small margin, instead of fitbounds on every draw
+lon_min, lat_min, lon_max, lat_max = region_geometry['bbox']
+region_map_geo = dict(
+    visible=False,
+    lonaxis_range=[lon_min - 0.5, lon_max + 0.5],
+    lataxis_range=[lat_min - 0.5, lat_max + 0.5],
+)
 
 # Mapping of DataFrame regions to GeoJSON regions
 region_mapping = {
@@ -1410,99 +1406,15 @@ import plotly.graph_objects as go
 
 from dash import Input, Output
 
-# Precompute all grade‑gender columns once
-grade_columns = [
-    col for col in data.columns
-    if any(col.startswith(prefix) for prefix in
-           ['K', 'G1','G2','G3','G4','G5','G6','Elem','JHS','G7','G8','G9','G10','G11','G12'])
-    and ('Male' in col or 'Female' in col)
-]
-
-@app.callback(
-    Output('enrollment_choropleth_map', 'figure'),
-    [
-        Input('school_year_filter', 'value'),
-        Input('region_filter',       'value'),
-        Input('grade_filter',        'value'),
-        Input('gender_filter',       'value'),
-    ]
-)
-def update_enrollment_choropleth(selected_school_year, selected_regions, selected_grades, selected_gender):
-    # 1) Copy + filter by School Year
-    if not selected_school_year:
-        raise dash.exceptions.PreventUpdate
-    try:
-        data, grade_columns, _, _ = load_data_for_year(selected_school_year)
-    except FileNotFoundError:
-        raise dash.exceptions.PreventUpdate
-    
-    df = data.copy()
-    # 3) Build lists of grade‑gender columns
-    selected_cols_male   = []
-    selected_cols_female = []
-
-    if selected_grades:
-        for grade in selected_grades:
-            if grade in ['G11', 'G12']:
-                # include all subject‑specific columns for those grades
-                selected_cols_male   += [c for c in grade_columns if c.startswith(grade) and 'Male' in c]
-                selected_cols_female += [c for c in grade_columns if c.startswith(grade) and 'Female' in c]
-            else:
-                selected_cols_male.append(f"{grade} Male")
-                selected_cols_female.append(f"{grade} Female")
-    else:
-        # no grade selected → default to all
-        selected_cols_male   = [c for c in grade_columns if 'Male'   in c]
-        selected_cols_female = [c for c in grade_columns if 'Female' in c]
-
-    # 4) Sum up based on gender filter
-    if selected_gender == 'Male':
-        df['Selected Grades Total'] = df[selected_cols_male].sum(axis=1)
-    elif selected_gender == 'Female':
-        df['Selected Grades Total'] = df[selected_cols_female].sum(axis=1)
-    else:  # 'All'
-        df['Selected Grades Total'] = df[selected_cols_male + selected_cols_female].sum(axis=1)
-
-    # 5) Drop schools with zero enrollment in selection
-    df = df[df['Selected Grades Total'] > 0]
-
-    # 6) Aggregate by Region
-    #    (and remap region names if you need)
-    df['Region'] = df['Region'].apply(lambda x: region_mapping.get(x, x))
-    full_enrollment = (
-        df
-        .groupby('Region', as_index=False)['Selected Grades Total']
-        .sum()
-        .rename(columns={'Selected Grades Total': 'Total Enrollment'})
-    )
-
-    # 7) Apply region filter for the overlay
-    if selected_regions:
-        mapped = [region_mapping.get(r, r) for r in selected_regions]
-        region_enrollment = full_enrollment[full_enrollment['Region'].isin(mapped)]
-    else:
-        region_enrollment = full_enrollment.copy()
-
-    # First, get the original region codes from your dataset
-    region_enrollment['Region Code'] = region_enrollment['Region'].map(
-        {v: k for k, v in region_mapping.items()}
-    )
-
-    # Then build the hover label
-    region_enrollment['Region Hover Label'] = region_enrollment.apply(
-        lambda row: f"{row['Region Code']} ({row['Region']})" 
-        if pd.notnull(row['Region Code']) else row['Region'],
-        axis=1
-    )
-
-    # 8) Build layered choropleth
+def enrollment_map_base():
+    """The choropleth's static part: both layers' styling, colour axis, title and map extent."""
     fig = go.Figure()
 
     # base layer (grey)
     fig.add_choropleth(
-        geojson=geojson_data,
-        locations=full_enrollment['Region'],
-        z=[0]*len(full_enrollment),
+        geojson=region_geometry_url,
+        locations=[],
+        z=[],
         featureidkey='properties.name',
         colorscale=[[0,'lightgrey'],[1,'lightgrey']],
         showscale=False,
@@ -1514,25 +1426,25 @@ def update_enrollment_choropleth(selected_school_year, selected_regions, selecte
 
     # overlay with actual totals
     fig.add_choropleth(
-        geojson=geojson_data,
-        locations=region_enrollment['Region'],
-        z=region_enrollment['Total Enrollment'],
+        geojson=region_geometry_url,
+        locations=[],
+        z=[],
         featureidkey='properties.name',
         colorbar_title="Total Enrollment",
         coloraxis="coloraxis",
-        customdata=region_enrollment[['Region Hover Label']].values,
+        customdata=[],
         hovertemplate = "%{customdata[0]}<br>Students: %{z:,} <extra></extra>"
     )
 
     fig.update_layout(
         coloraxis=dict(
             colorscale="Viridis",
-            cmin=full_enrollment['Total Enrollment'].min(),
-            cmax=full_enrollment['Total Enrollment'].max()
+            cmin=0,
+            cmax=1
         ),
         title="Regional Enrollment",
         height=500,
-        geo=dict(fitbounds="locations", visible=False),
+        geo=region_map_geo,
         margin={"r":0,"t":50,"l":0,"b":0},
         dragmode=False,
         autosize=True,
@@ -1554,93 +1466,83 @@ def update_enrollment_choropleth(selected_school_year, selected_regions, selecte
     ]
     )
 
-    return fig
+    return base_figure(fig)
+
+ENROLLMENT_MAP_BASE = enrollment_map_base()
 
-# Callback for updating Stacked bar chart of school offerings by COC
 @app.callback(
-    Output('coc_sector_chart', 'figure'),
-    Input('school_year_filter', 'value'),
-    Input('region_filter', 'value'),
-    Input('grade_filter', 'value'),
-    Input('gender_filter', 'value')
+    Output('enrollment_choropleth_map', 'figure'),
+    Output('enrollment_choropleth_map-drawn', 'data'),
+    [
+        Input('stored_dataset', 'data'),
+        Input('region_filter',       'value'),
+        Input('grade_filter',        'value'),
+        Input('gender_filter',       'value'),
+    ],
+    State('enrollment_choropleth_map-drawn', 'data')
 )
-def update_coc_sector_chart(selected_school_year, selected_regions, selected_grades, selected_gender):
+def update_enrollment_choropleth(stored_key, selected_regions, selected_grades, selected_gender, drawn):
+    selected_school_year = dataset_year(stored_key)
+    # 1) Load the year's enrollment tensor
     if not selected_school_year:
         raise dash.exceptions.PreventUpdate
     try:
-        data, grade_columns, _, _ = load_data_for_year(selected_school_year)
+        tensor = get_enrollment_tensor(selected_school_year)
     except FileNotFoundError:
         raise dash.exceptions.PreventUpdate
-    
-    # Make a copy of the full dataset
-    df = data.copy()
-    # Filter Dataset to inlcude only those regions
+
+    # 2) Total the selected grades and gender per region
+    region_totals = tensor.region_totals(selected_grades, selected_gender)
+
+    # 3) Drop regions with no enrollment in the selection, remap names for the GeoJSON
+    region_totals = region_totals[region_totals > 0]
+    full_enrollment = pd.DataFrame({
+        'Region': [region_mapping.get(r, r) for r in region_totals.index],
+        'Total Enrollment': region_totals.to_numpy()
+    }).sort_values('Region', ignore_index=True)
+
+    # 4) Apply region filter for the overlay
     if selected_regions:
-        df = df[df['Region'].isin(selected_regions)]
-
-    # Initialize empty lists 
-    selected_cols_male = []
-    selected_cols_female = []
-
-    # Dynamically determine which columns to sum based on selected grades
-    if selected_grades:
-        for grade in selected_grades:
-            if grade in ['G11', 'G12']:
-                # For G11 and G12, match all subject-specific Male/Female columns
-                selected_cols_male += [col for col in data.columns if col.startswith(grade) and 'Male' in col]
-                selected_cols_female += [col for col in data.columns if col.startswith(grade) and 'Female' in col]
-            else:
-                # For lower grades, columns are named like "G1 Male", "G1 Female", etc.
-                selected_cols_male += [f"{grade} Male"]
-                selected_cols_female += [f"{grade} Female"]
-    else:
-        # If no grades are selected, default to all available grade columns
-        selected_cols_male = [col for col in grade_columns if 'Male' in col]
-        selected_cols_female = [col for col in grade_columns if 'Female' in col]
-    
-    # Compute total enrollment based on selected gender
-    if selected_gender == 'Male':
-        df['Selected Grades Total'] = df[selected_cols_male].sum(axis=1)
-    elif selected_gender == 'Female':
-        df['Selected Grades Total'] = df[selected_cols_female].sum(axis=1)
+        mapped = [region_mapping.get(r, r) for r in selected_regions]
+        region_enrollment = full_enrollment[full_enrollment['Region'].isin(mapped)]
     else:
-        # If gender is "All", sum both male and female selected columns
-        df['Selected Grades Total'] = df[selected_cols_male + selected_cols_female].sum(axis=1)
-
-    # Filter out schools that have no enrollment in the selected grades and gender
-    df = df[df['Selected Grades Total'] > 0]
-
-    # Count schools by COC category and sector
-    df_counts = (
-        df
-        .groupby(['Modified COC', 'Sector'])
-        .size()
-        .reset_index(name='Count')
-    )
-    # Ensure categories order
-    coc_order = ['Purely ES', 'Purely JHS', 'Purely SHS', 'ES and JHS', 'JHS with SHS', 'All Offering']
-    df_counts['Modified COC'] = pd.Categorical(df_counts['Modified COC'], categories=coc_order, ordered=True)
-    df_counts = df_counts.sort_values('Modified COC')
+        region_enrollment = full_enrollment
 
-    # Create Visual Count for boosted visibility
-    df_counts['Visual Count'] = df_counts['Count'].apply(lambda x: x + 2000 if x < 10000 else x)
+    # Hover label: the original region code with the GeoJSON name
+    region_codes = region_enrollment['Region'].map({v: k for k, v in region_mapping.items()})
+    hover_labels = [
+        f"{code} ({name})" if pd.notnull(code) else name
+        for code, name in zip(region_codes, region_enrollment['Region'])
+    ]
 
+    # 5) Fill in both layers and the colour range; once drawn, only these are sent
+    figure = figure_update(ENROLLMENT_MAP_BASE, {
+        ('data', 0, 'locations'): full_enrollment['Region'].tolist(),
+        ('data', 0, 'z'): [0] * len(full_enrollment),
+        ('data', 1, 'locations'): region_enrollment['Region'].tolist(),
+        ('data', 1, 'z'): region_enrollment['Total Enrollment'].tolist(),
+        ('data', 1, 'customdata'): [[label] for label in hover_labels],
+        ('layout', 'coloraxis', 'cmin'): full_enrollment['Total Enrollment'].min(),
+        ('layout', 'coloraxis', 'cmax'): full_enrollment['Total Enrollment'].max(),
+    }, drawn)
+    return figure, True
+
+# Callback for updating Stacked bar chart of school offerings by COC
+def coc_sector_base():
+    """The COC offerings chart's static part: one styled bar trace per sector and the layout."""
     # Define sector order and color mapping
-    sector_order = ['Public', 'Private', 'SUCsLUCs']
     colors = {'Public': '#0a4485', 'Private': '#BFDBFE', 'SUCsLUCs': '#DE082C'}
 
-    # Create figure manually
     fig = go.Figure()
 
     # Add one trace per sector
-    for sector in sector_order:
-        df_sector = df_counts[df_counts['Sector'] == sector].copy()
+    for sector in COC_SECTOR_ORDER:
         fig.add_trace(go.Bar(
-            x=df_sector['Modified COC'],
-            y=df_sector['Visual Count'],
+            x=[],
+            y=[],
             name=sector,
             marker_color=colors[sector],
-            customdata=df_sector[['Sector', 'Modified COC', 'Count']],
+            customdata=[],
             hovertemplate=(
                 "Sector: %{customdata[0]}<br>" +
                 "COC Offering: %{customdata[1]}<br>" +
@@ -1665,67 +1567,134 @@ def update_coc_sector_chart(selected_school_year, selected_regions, selected_gra
         title_font=PLOT_TITLE,
     )
 
-    return fig
+    return base_figure(fig)
+
+COC_SECTOR_ORDER = ['Public', 'Private', 'SUCsLUCs']
+COC_SECTOR_BASE = coc_sector_base()
 
 @app.callback(
-    Output('enrollment_trend_line_chart', 'figure'),
+    Output('coc_sector_chart', 'figure'),
+    Output('coc_sector_chart-drawn', 'data'),
+    Input('stored_dataset', 'data'),
+    Input('region_filter', 'value'),
+    Input('grade_filter', 'value'),
+    Input('gender_filter', 'value'),
+    State('coc_sector_chart-drawn', 'data')
+)
+def update_coc_sector_chart(stored_key, selected_regions, selected_grades, selected_gender, drawn):
+    selected_school_year = dataset_year(stored_key)
+    if not selected_school_year:
+        raise dash.exceptions.PreventUpdate
+    try:
+        view = get_filter_view(selected_school_year, selected_regions, selected_grades, selected_gender)
+    except FileNotFoundError:
+        raise dash.exceptions.PreventUpdate
+
+    # Count schools (in the selected regions) with enrollment in the selected grades and gender,
+    # by COC category and sector
+    df_counts = view.school_counts(['Modified COC', 'Sector']).reset_index(name='Count')
+    # Ensure categories order
+    coc_order = ['Purely ES', 'Purely JHS', 'Purely SHS', 'ES and JHS', 'JHS with SHS', 'All Offering']
+    df_counts['Modified COC'] = pd.Categorical(df_counts['Modified COC'], categories=coc_order, ordered=True)
+    df_counts = df_counts.sort_values('Modified COC')
+
+    # Create Visual Count for boosted visibility
+    df_counts['Visual Count'] = df_counts['Count'].apply(lambda x: x + 2000 if x < 10000 else x)
+
+    # Fill in the bar trace of each sector
+    updates = {}
+    for i, sector in enumerate(COC_SECTOR_ORDER):
+        df_sector = df_counts[df_counts['Sector'] == sector]
+        updates[('data', i, 'x')] = df_sector['Modified COC'].tolist()
+        updates[('data', i, 'y')] = df_sector['Visual Count'].tolist()
+        updates[('data', i, 'customdata')] = df_sector[['Sector', 'Modified COC', 'Count']].values.tolist()
+
+    return figure_update(COC_SECTOR_BASE, updates, drawn), True
+
+@app.callback(
+    Output('stored_dataset', 'data'),
     Input('school_year_filter', 'value'),
-    Input('stored_school_year', 'data'),
+    Input('refresh_school_year_trigger', 'data'),
+    State('stored_dataset', 'data')
+)
+def update_dataset_key(selected_year, refreshed_year, current_key):
+    # A new key, and so a redraw of every chart, when the year changes or its files are rewritten
+    school_year = selected_year or (current_key or {}).get('school_year') or default_school_year
+    try:
+        key = dataset_key(school_year)
+    except FileNotFoundError:
+        raise dash.exceptions.PreventUpdate
+    if key == current_key:
+        raise dash.exceptions.PreventUpdate
+    return key
+
+def enrollment_trend_base():
+    """The trend line's static part: line and marker styling, axes and title."""
+    fig = px.line(
+        pd.DataFrame({'School Year': [''], 'Total Enrollment': [0]}),
+        x='School Year',
+        y='Total Enrollment',
+        title='Total Enrollment Trend<br>Over the Years',
+        markers=True
+    )
+
+    fig.update_layout(
+        title='Total Enrollment Trend<br>Over the Years',
+        font=dict(size=13),
+        plot_bgcolor='white',
+        height=350,
+        paper_bgcolor='white',
+        title_font=PLOT_TITLE,
+        xaxis_title='School Year',
+        yaxis_title='Total Enrollment',
+        xaxis=dict(tickmode='linear'),
+        yaxis=dict(title='Total Enrollment')
+    )
+
+    fig.update_traces(
+        line=dict(color="#0a4485", width=3),
+        marker=dict(
+            color="#0a4485",
+            size=[]
+        ),
+        hovertemplate='School Year: %{x}<br>Total Enrollment: %{y:,.0f}'
+    )
+
+    return base_figure(fig)
+
+ENROLLMENT_TREND_BASE = enrollment_trend_base()
+
+@app.callback(
+    Output('enrollment_trend_line_chart', 'figure'),
+    Output('enrollment_trend_line_chart-drawn', 'data'),
+    Input('stored_dataset', 'data'),
     Input('region_filter', 'value'),
     Input('grade_filter', 'value'),
-    Input('gender_filter', 'value')
+    Input('gender_filter', 'value'),
+    State('enrollment_trend_line_chart-drawn', 'data')
 )
-def update_enrollment_trend_chart(selected_year, stored_year, selected_regions, selected_grades, selected_gender):
-    if not selected_year:
-        selected_year = stored_year
+def update_enrollment_trend_chart(stored_key, selected_regions, selected_grades, selected_gender, drawn):
+    selected_year = dataset_year(stored_key)
 
     available_years = get_available_school_years()
     if not available_years:
-        return go.Figure().update_layout(title="No data available", title_font=PLOT_TITLE)
+        return go.Figure().update_layout(title="No data available", title_font=PLOT_TITLE), None
 
     if not selected_year:
         selected_year = "2023-2024" if "2023-2024" in available_years else available_years[-1]
 
-    idx = available_years.index(selected_year)
-    start = max(idx - 2, 0)
-    end = min(idx + 3, len(available_years))
-    years_to_load = available_years[start:end]
-
+    # Every available year is drawn from its totals index, or from a projection
+    # of the selected columns when the index is stale; no year is loaded for this
     data_points = []
 
-    for year in years_to_load:
+    for year in available_years:
         try:
-            df, grade_columns, _, _ = load_data_for_year(year)
-
-            if selected_regions:
-                df = df[df['Region'].isin(selected_regions)]
-
-            selected_cols_male = []
-            selected_cols_female = []
-
-            if selected_grades:
-                for grade in selected_grades:
-                    base_grade = grade.split('_')[0]
-                    if base_grade in ['G11', 'G12']:
-                        selected_cols_male += [col for col in df.columns if col.startswith(base_grade) and 'Male' in col]
-                        selected_cols_female += [col for col in df.columns if col.startswith(base_grade) and 'Female' in col]
-                    else:
-                        selected_cols_male += [f"{base_grade} Male"]
-                        selected_cols_female += [f"{base_grade} Female"]
-            else:
-                selected_cols_male = [col for col in grade_columns if 'Male' in col]
-                selected_cols_female = [col for col in grade_columns if 'Female' in col]
-
-            if selected_gender == 'Male':
-                enrollment = df[selected_cols_male].sum().sum()
-            elif selected_gender == 'Female':
-                enrollment = df[selected_cols_female].sum().sum()
-            else:
-                enrollment = df[selected_cols_male + selected_cols_female].sum().sum()
+            enrollment = get_year_enrollment(year, selected_regions, selected_grades, selected_gender)
 
             data_points.append({'School Year': year, 'Total Enrollment': enrollment})
 
-        except Exception:
+        except FileNotFoundError:
+            # Removed since the years were listed
             continue
 
     if not data_points:
@@ -1733,119 +1702,23 @@ def update_enrollment_trend_chart(selected_year, stored_year, selected_regions,
             title="No data available for selected range",
             xaxis_title='School Year',
             yaxis_title='Total Enrollment'
-        )
+        ), None
 
     grouped = pd.DataFrame(data_points).sort_values(by='School Year')
 
     if grouped.empty:
-        return px.line(title="No data to display")
+        return px.line(title="No data to display"), None
 
-    try:
-        fig = px.line(
-            grouped,
-            x='School Year',
-            y='Total Enrollment',
-            title='Total Enrollment Trend<br>Over the Years',
-            markers=True
-        )
+    # Fill in the line; the selected year's marker is drawn larger
+    return figure_update(ENROLLMENT_TREND_BASE, {
+        ('data', 0, 'x'): grouped['School Year'].tolist(),
+        ('data', 0, 'y'): grouped['Total Enrollment'].tolist(),
+        ('data', 0, 'marker', 'size'): [12 if year == selected_year else 6 for year in grouped['School Year']],
+    }, drawn), True
 
-        fig.update_layout(
-            title='Total Enrollment Trend<br>Over the Years',
-            font=dict(size=13),
-            plot_bgcolor='white',
-            height=350,
-            paper_bgcolor='white',
-            title_font=PLOT_TITLE,
-            xaxis_title='School Year',
-            yaxis_title='Total Enrollment',
-            xaxis=dict(tickmode='linear'),
-            yaxis=dict(title='Total Enrollment')
-        )
-
-        fig.update_traces(
-            line=dict(color="#0a4485", width=3),
-            marker=dict(color="#0a4485"),
-            hovertemplate='School Year: %{x}<br>Total Enrollment: %{y:,.0f}'
-        )
-
-        return fig
-    except Exception as e:
-        print("Error rendering Enrollment Trend chart:", e)
-        return px.line(title="Error rendering Enrollment Trend chart")
-
-@app.callback(
-    Output('up_sned_sector_chart', 'figure'),
-    Input('school_year_filter', 'value'),
-    Input('region_filter', 'value'),
-    Input('grade_filter', 'value'),
-    Input('gender_filter', 'value')
-)
-def update_sned_sector_chart(selected_school_year, selected_regions, selected_grades, selected_gender):
-    if not selected_school_year:
-        raise dash.exceptions.PreventUpdate
-
-    try:
-        data, grade_columns, _, _ = load_data_for_year(selected_school_year)
-    except FileNotFoundError:
-        raise dash.exceptions.PreventUpdate
-
-    filtered_df = data.copy()
-
-    if selected_regions:
-        filtered_df = filtered_df[filtered_df['Region'].isin(selected_regions)]
-
-    # Apply grade and gender filters
-    selected_cols_male = []
-    selected_cols_female = []
-
-    if selected_grades:
-        for grade in selected_grades:
-            base_grade = grade.split('_')[0]
-            if base_grade in ['G11', 'G12']:
-                selected_cols_male += [col for col in data.columns if col.startswith(base_grade) and 'Male' in col]
-                selected_cols_female += [col for col in data.columns if col.startswith(base_grade) and 'Female' in col]
-            else:
-                selected_cols_male += [f"{base_grade} Male"]
-                selected_cols_female += [f"{base_grade} Female"]
-    else:
-        selected_cols_male = [col for col in grade_columns if 'Male' in col]
-        selected_cols_female = [col for col in grade_columns if 'Female' in col]
-
-    if selected_gender == 'Male':
-        filtered_df['Filtered Enrollment'] = filtered_df[selected_cols_male].sum(axis=1)
-    elif selected_gender == 'Female':
-        filtered_df['Filtered Enrollment'] = filtered_df[selected_cols_female].sum(axis=1)
-    else:
-        filtered_df['Filtered Enrollment'] = filtered_df[selected_cols_male + selected_cols_female].sum(axis=1)
-
-    # Ensure 'School Name' column does not contain NaN before applying string methods
-    filtered_df = filtered_df.dropna(subset=['School Name'])
-
-    # Filter for SPED Centers
-    sped_centers = filtered_df[filtered_df['School Name'].str.lower().str.contains('sped center')]
-
-    # Calculate total enrollment by school
-    sped_centers['Total_Enrollment'] = sped_centers['Filtered Enrollment']
-
-    # Group by region and school name and get top 5 per region
-    top_5_sped_centers = sped_centers.groupby(['Region', 'School Name'])['Total_Enrollment'].sum().reset_index()
-    top_5_sped_centers = top_5_sped_centers.groupby('Region').apply(lambda x: x.nlargest(5, 'Total_Enrollment')).reset_index(drop=True)
-
-    top_5_sped_centers['Display_Enrollment'] = top_5_sped_centers['Total_Enrollment'].apply(
-        lambda x: x + 300 if x < 1000 else x
-    )
-
-    from app_data import correct_region_order
-    top_5_sped_centers['Region'] = pd.Categorical(
-        top_5_sped_centers['Region'],
-        categories=correct_region_order,
-        ordered=True
-    )
-    top_5_sped_centers = top_5_sped_centers.sort_values('Region')
-
-    fig = go.Figure()
+def sped_centers_base():
+    """The SPED centers chart's static layout, its bar template and the region colours."""
     from plotly.colors import sequential, sample_colorscale
-    from app_data import correct_region_order
 
     num_regions = len(correct_region_order)
     viridis_colors = sample_colorscale(
@@ -1855,22 +1728,20 @@ def update_sned_sector_chart(selected_school_year, selected_regions, selected_gr
 
     region_color_map = dict(zip(correct_region_order, viridis_colors))
 
-
-    for i, row in top_5_sped_centers.iterrows():
-        fig.add_trace(go.Bar(
-            x=[row['Region']],
-            y=[row['Display_Enrollment']],
-            name=row['School Name'],
-            marker_color=region_color_map[row['Region']],
-            text=row['School Name'],
-            textposition='none',
-            customdata=[[row['Region'], row['School Name'], row['Total_Enrollment']]],
-            hovertemplate=(
-                "Region: %{customdata[0]}<br>" +
-                "School Name: %{customdata[1]}<br>" +
-                "Total Enrollment: %{customdata[2]:,} students<extra></extra>"
-            )
-        ))
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=[],
+        y=[],
+        marker_color=[],
+        text=[],
+        textposition='none',
+        customdata=[],
+        hovertemplate=(
+            "Region: %{customdata[0]}<br>" +
+            "School Name: %{customdata[1]}<br>" +
+            "Total Enrollment: %{customdata[2]:,} students<extra></extra>"
+        )
+    ))
 
     fig.update_layout(
         barmode='stack',
@@ -1886,7 +1757,61 @@ def update_sned_sector_chart(selected_school_year, selected_regions, selected_gr
         showlegend=False
     )
 
-    return fig
+    templates = {'rank': fig.to_dict()['data'][0]}
+    return base_figure(fig.update(data=[])), templates, region_color_map
+
+SPED_CENTERS_BASE, SPED_CENTERS_TRACES, SPED_REGION_COLORS = sped_centers_base()
+
+@app.callback(
+    Output('up_sned_sector_chart', 'figure'),
+    Output('up_sned_sector_chart-drawn', 'data'),
+    Input('stored_dataset', 'data'),
+    Input('region_filter', 'value'),
+    Input('grade_filter', 'value'),
+    Input('gender_filter', 'value'),
+    State('up_sned_sector_chart-drawn', 'data')
+)
+def update_sned_sector_chart(stored_key, selected_regions, selected_grades, selected_gender, drawn):
+    selected_school_year = dataset_year(stored_key)
+    if not selected_school_year:
+        raise dash.exceptions.PreventUpdate
+
+    try:
+        # Ranked over every region once per grade/gender selection, then narrowed to the selected regions
+        view = get_filter_view(selected_school_year, None, selected_grades, selected_gender)
+    except FileNotFoundError:
+        raise dash.exceptions.PreventUpdate
+
+    # Top 5 SPED centers per region (tagged at ingest)
+    top_5_sped_centers = view.top_tagged_per_region('sped_center', 5)
+    if selected_regions:
+        top_5_sped_centers = top_5_sped_centers[top_5_sped_centers['Region'].isin(selected_regions)]
+
+    top_5_sped_centers = top_5_sped_centers.assign(
+        Display_Enrollment=top_5_sped_centers['Total_Enrollment'].where(
+            top_5_sped_centers['Total_Enrollment'] >= 1000, top_5_sped_centers['Total_Enrollment'] + 300
+        )
+    )
+
+    top_5_sped_centers['Region'] = pd.Categorical(
+        top_5_sped_centers['Region'],
+        categories=correct_region_order,
+        ordered=True
+    )
+    top_5_sped_centers = top_5_sped_centers.sort_values(['Region', 'Rank'])
+
+    # One trace per rank: the n-th school of every region stacks at the same level
+    traces = group_traces(SPED_CENTERS_TRACES, [
+        ('rank', {
+            'x': ranked['Region'].astype(str).tolist(),
+            'y': ranked['Display_Enrollment'].tolist(),
+            'marker': {'color': ranked['Region'].astype(str).map(SPED_REGION_COLORS).tolist()},
+            'text': ranked['School Name'].tolist(),
+            'customdata': ranked[['Region', 'School Name', 'Total_Enrollment']].astype(object).to_numpy().tolist(),
+        })
+        for rank, ranked in top_5_sped_centers.groupby('Rank')
+    ])
+    return figure_update(SPED_CENTERS_BASE, {('data',): traces}, drawn), True
 
 # Manual Data Page
 
@@ -1898,9 +1823,8 @@ def update_sned_sector_chart(selected_school_year, selected_regions, selected_gr
 def update_divisions(region):
     if not region:
         return [], True
-    schools_df = load_schools()
-    filtered = schools_df[schools_df['Region'] == region]
-    return [{'label': d, 'value': d} for d in sorted(filtered['Division'].dropna().unique())], False
+    divisions = get_school_registry().divisions(region)
+    return [{'label': d, 'value': d} for d in divisions], False
 
 @app.callback(
     Output('input_school_name', 'options'),
@@ -1910,9 +1834,8 @@ def update_divisions(region):
 def update_schools(division):
     if not division:
         return [], True
-    schools_df = load_schools()
-    filtered = schools_df[schools_df['Division'] == division]
-    return [{'label': s, 'value': s} for s in sorted(filtered['School Name'].dropna().unique())], False
+    schools = get_school_registry().schools(division)
+    return [{'label': s, 'value': s} for s in schools], False
 
 
 @app.callback(
@@ -1927,8 +1850,7 @@ def update_schools(division):
 def autofill_fields(school_name):
     if not school_name:
         return [""] * 6
-    schools_df = load_schools()
-    school = schools_df[schools_df['School Name'] == school_name].iloc[0]
+    school = get_school_metadata(school_name)
     return (
         school["BEIS School ID"],
         school["Barangay"],
@@ -1975,11 +1897,7 @@ def finalize_submission(
             df = df[correct_columns]
             df = df.fillna("N/A").replace(0, "N/A")
 
-            output_filename = f"data_{upload_year}.csv"
-            output_path = os.path.join("data_files", output_filename)
-            df.to_csv(output_path, index=False, na_rep="N/A")
-
-            # Handle new schools
+            # Register new schools first, so the year's join and indexes are built against them
             schools_path = os.path.join("data_files", "schools.csv")
             existing_schools_df = pd.read_csv(schools_path)
             existing_ids = set(existing_schools_df["BEIS School ID"].astype(str))
@@ -1994,7 +1912,9 @@ def finalize_submission(
                         new_school_rows[col] = "N/A"
                 new_school_rows = new_school_rows[school_cols].fillna("N/A").replace(0, "N/A")
                 updated_schools_df = pd.concat([existing_schools_df, new_school_rows], ignore_index=True)
-                updated_schools_df.to_csv(schools_path, index=False, na_rep="N/A")
+                save_schools(updated_schools_df)
+
+            save_year_rows(upload_year, df)
 
             return "", f"✅ Upload finalized for {upload_year}.", upload_year
 
@@ -2042,7 +1962,7 @@ def finalize_submission(
                 existing = 0 if pd.isna(existing) or existing == "N/A" else int(existing)
                 df.at[row_idx, column_name] = existing + female_count
 
-            df.to_csv(file_path, index=False, na_rep="N/A")
+            save_year_rows(manual_year, df)
 
             return f"✅ Enrollment saved for {manual_year}.", "", manual_year
 
@@ -2056,7 +1976,8 @@ def finalize_submission(
 
 
 # === CALLBACK: Check Missing Fields ===
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='checkMissingFields'),
     Output("missing-fields-modal", "is_open", allow_duplicate=True),
     Output("missing-fields-message", "children", allow_duplicate=True),
     Input("submit_button", "n_clicks"),
@@ -2067,42 +1988,17 @@ def finalize_submission(
     State("input_enrollment_female", "value"),  # Female enrollment
     prevent_initial_call=True
 )
-def check_missing_fields(n_clicks, name, year, grade, male_count, female_count):
-    if n_clicks:
-        # Check if any required fields are missing
-        missing_fields = []
-        if not name:
-            missing_fields.append("School Name")
-        if not year:
-            missing_fields.append("School Year")
-        if not grade:
-            missing_fields.append("Grade Level")
-        
-        # Check if both male and female enrollment counts are missing
-        if not male_count and not female_count:
-            missing_fields.append("Male and/or Female Enrollment Count")
-
-        if missing_fields:
-            missing_message = "⚠️ The following fields are missing: " + ", ".join(missing_fields) + ".<br><br>Please fill them in."
-            return True, dcc.Markdown(missing_message, dangerously_allow_html=True)  # Show in Missing Fields Modal
-        else:
-            return False, ""  # No missing fields, modal remains closed
-    return False, ""
-
 
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='closeMissingFieldsModal'),
     Output("missing-fields-modal", "is_open"),
     Input("close-missing-fields-modal", "n_clicks"),
     prevent_initial_call=True
 )
-def close_missing_fields_modal(n_clicks):
-    if n_clicks:
-        return False  # Close the modal
-    return True  # Keep it open if the button isn't clicked
-
 
 # === CALLBACK: Open Confirm Modal on Submit ===
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='openConfirmModalManual'),
     Output("confirm-modal", "is_open", allow_duplicate=True),
     Output("confirm-message", "children", allow_duplicate=True),
     Output("confirm-checkbox", "value", allow_duplicate=True),
@@ -2114,22 +2010,10 @@ def close_missing_fields_modal(n_clicks):
     State("input_enrollment_female", "value"),  # Female enrollment
     prevent_initial_call=True
 )
-def open_modal_manual_submit(n_clicks, name, year, grade, male_count, female_count):
-    if n_clicks:
-        # Check if all fields are filled and that one of the gender counts is entered
-        if not all([name, year, grade]):
-            return False, "⚠️ Please fill in all fields before submitting.", False  # Don't open the confirmation modal
-
-        # If neither male nor female enrollment count is filled
-        if not male_count and not female_count:
-            return False, "⚠️ Please fill in the Male or Female enrollment count.", False  # Don't open the confirmation modal
-
-        return True, f"Are you sure you want to submit data for {year}?", False  # Open the confirmation modal
-    return False, "", False
-
 
 # === CALLBACK: Handle File Upload Modal ===
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='openUploadModal'),
     Output("upload-modal", "is_open", allow_duplicate=True),
     Output("upload-feedback", "children", allow_duplicate=True),
     Output("finalize-submit", "disabled", allow_duplicate=True),  # Re-enable Finalize button
@@ -2137,15 +2021,10 @@ def open_modal_manual_submit(n_clicks, name, year, grade, male_count, female_cou
     State("upload-school-year-dropdown", "value"),
     prevent_initial_call=True
 )
-def open_modal_upload(contents, upload_year):
-    if contents and upload_year:
-        # You can simply remove the filename from being returned in the feedback
-        return True, "File uploaded successfully", False  # Enable Finalize button
-    return False, "", False  # Keep Finalize button disabled initially
-
 
 # === CALLBACK: Handle Submit Button in Upload Modal ===
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='openConfirmModalUpload'),
     Output("confirm-modal", "is_open", allow_duplicate=True),
     Output("confirm-message", "children", allow_duplicate=True),
     Output("confirm-checkbox", "value", allow_duplicate=True),
@@ -2153,14 +2032,10 @@ def open_modal_upload(contents, upload_year):
     State("upload-filename", "children"),
     prevent_initial_call=True
 )
-def handle_upload_submit(n_clicks, filename):
-    if n_clicks:
-        return True, f"Are you sure you want to upload the CSV file?", False
-    return False, "", False
-
 
 # === CALLBACK: Close Modal from Cancel in Confirm Modal ===
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='closeConfirmModal'),
     Output("confirm-modal", "is_open", allow_duplicate=True),
     Output("confirm-message", "children", allow_duplicate=True),
     Output("confirm-checkbox", "value", allow_duplicate=True),
@@ -2168,14 +2043,10 @@ def handle_upload_submit(n_clicks, filename):
     State("confirm-modal", "is_open"),
     prevent_initial_call=True
 )
-def close_modal(n_clicks, is_open):
-    if n_clicks:
-        return False, "", False  # Close modal when cancel is clicked
-    return is_open, "", False  # Keep modal open if cancel is not clicked
-
 
 # === CALLBACK: Close Modal from Cancel (including file reset) ===
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='closeConfirmModalUpload'),
     Output("confirm-modal", "is_open", allow_duplicate=True),
     Output("confirm-message", "children", allow_duplicate=True),
     Output("confirm-checkbox", "value", allow_duplicate=True),
@@ -2183,33 +2054,24 @@ def close_modal(n_clicks, is_open):
     Input("close-upload-modal", "n_clicks"),
     prevent_initial_call=True
 )
-def close_upload_modal(n_clicks):
-    if n_clicks:
-        return False, "", False, None  # Close the modal and reset the file input
-    return True, "", False, None  # Keep the modal open if the button isn't clicked
-
 
 # === CALLBACK: Enable/disable Finalize button ===
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='toggleFinalizeButton'),
     Output("finalize-submit", "disabled", allow_duplicate=True),
     Input("confirm-checkbox", "value"),
     prevent_initial_call=True
 )
-def toggle_finalize_button(checked):
-    return not checked
 
 # === CALLBACK: Finalize Button to Close Modals ===
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='closeModalsOnFinalize'),
     Output("confirm-modal", "is_open", allow_duplicate=True),
     Output("upload-modal", "is_open", allow_duplicate=True),
     Output("finalize-submit", "disabled", allow_duplicate=True),
     Input("finalize-submit", "n_clicks"),
     prevent_initial_call=True
 )
-def finalize_submission(n_clicks):
-    if n_clicks:
-        return False, False, True  # Close both modals and disable finalize button
-    return True, True, False  # Keep modals open if finalize hasn't been clicked
 
 @app.callback(
     Output('table_school_year', 'options'),
@@ -2237,45 +2099,37 @@ def refresh_school_year_options(trigger_data):
     Input('table_school_year', 'value')  # <- ONLY input needed
 )
 def update_enrollment_table(school_year):
-    file_path = f"data_files/data_{school_year}.csv"
-    if not os.path.exists(file_path):
+    try:
+        df = read_year_rows(school_year)
+    except FileNotFoundError:
         return [], []
 
-    df = pd.read_csv(file_path)
-
-    from app_data import load_schools
-    schools_df = load_schools()
-
-    numeric_df = df.copy()
-    if "BEIS School ID" in numeric_df.columns and "BEIS School ID" in schools_df.columns:
-        numeric_df = numeric_df.merge(schools_df[["BEIS School ID", "Region", "Division"]], on="BEIS School ID", how="left")
-    else:
+    if "BEIS School ID" not in df.columns:
         raise KeyError("The 'BEIS School ID' column is missing in one of the DataFrames.")
 
-    numeric_df = numeric_df.apply(pd.to_numeric, errors='ignore')
+    # Region and Division come from the year's join index into schools.csv
+    numeric_df = df.join(get_school_columns(school_year, df, ["Region", "Division"]))
 
-    male_cols = [col for col in df.columns if "Male" in col]
-    female_cols = [col for col in df.columns if "Female" in col]
+    columns = grade_columns_for(df.columns)
+    male_cols = columns.columns(gender='Male')
+    female_cols = columns.columns(gender='Female')
 
-    numeric_df["Total Male"] = numeric_df[male_cols].replace("N/A", 0).apply(pd.to_numeric, errors='coerce').sum(axis=1)
-    numeric_df["Total Female"] = numeric_df[female_cols].replace("N/A", 0).apply(pd.to_numeric, errors='coerce').sum(axis=1)
+    numeric_df["Total Male"] = numeric_df[male_cols].sum(axis=1)
+    numeric_df["Total Female"] = numeric_df[female_cols].sum(axis=1)
     numeric_df["Total Enrollment"] = numeric_df["Total Male"] + numeric_df["Total Female"]
 
-    summary = numeric_df.groupby(["Region", "Division"], as_index=False)[["Total Male", "Total Female", "Total Enrollment"]].sum()
+    summary = numeric_df.groupby(["Region", "Division"], as_index=False, observed=True)[["Total Male", "Total Female", "Total Enrollment"]].sum()
 
     return summary.to_dict("records"), [{"name": col, "id": col} for col in summary.columns]
 
 
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='toggleUploadModal'),
     Output("upload-modal", "is_open"),
     [Input("open-upload-modal", "n_clicks"),
      Input("close-upload-modal", "n_clicks")],
     [State("upload-modal", "is_open")]
 )
-def toggle_upload_modal(open_click, close_click, is_open):
-    if open_click or close_click:
-        return not is_open
-    return is_open
 
 if __name__ == "__main__":
     app.run(debug=True)
@@ -4,49 +4,343 @@ import numpy as np
 import re
 import os
 
+from data_engine import (
+    DatasetCache,
+    FilterView,
+    SchoolRegistry,
+    SHS_TRACKS,
+    YearDataset,
+    apply_schema,
+    build_enrollment_cube,
+    build_enrollment_tensor,
+    build_school_rankings,
+    build_school_search_index,
+    build_tags,
+    build_totals_index,
+    build_transition_rates,
+    count_sums,
+    file_signature,
+    filter_key,
+    is_sparse,
+    grade_columns_for,
+    join_path_for,
+    load_year_frame,
+    read_join_index,
+    read_partitions,
+    read_tags,
+    read_totals_index,
+    save_year_frame,
+    snapshot_view,
+    tags_path_for,
+    totals_path_for,
+    write_join_index,
+    write_partitions,
+    write_tags,
+    write_totals_index,
+    year_frame_columns,
+)
+
 SCHOOLS_PATH = 'data_files/schools.csv'
 
+# Loaded years are shared by every callback; bound how many stay resident
+DATA_CACHE_MAX_ENTRIES = 6
+DATA_CACHE_MAX_BYTES = 512 * 1024 * 1024
+_year_cache = DatasetCache(max_entries=DATA_CACHE_MAX_ENTRIES, max_bytes=DATA_CACHE_MAX_BYTES)
+
+# schools.csv, parsed once per version of the file
+_schools_cache = DatasetCache(max_entries=1)
+
+# Per-year totals indexes are tiny; keep every year's in memory
+_totals_cache = DatasetCache(max_entries=64)
+
+# Transition rates over every available year, rebuilt when any year's data changes
+_transition_cache = DatasetCache(max_entries=1)
+
+# Hold mostly-zero G11/G12 strand columns of loaded years as sparse arrays
+SPARSE_SHS_STRANDS = True
+
+# Column projections of recently used years (see load_year_columns)
+PROJECTION_CACHE_MAX_ENTRIES = 16
+_projection_cache = DatasetCache(max_entries=PROJECTION_CACHE_MAX_ENTRIES, max_bytes=DATA_CACHE_MAX_BYTES // 4)
+
+# Per-year school search indexes
+_search_cache = DatasetCache(max_entries=DATA_CACHE_MAX_ENTRIES)
+
+# Filter states recently drawn by the dashboard (one per year/regions/grades/gender)
+VIEW_CACHE_MAX_ENTRIES = 32
+_view_cache = DatasetCache(max_entries=VIEW_CACHE_MAX_ENTRIES)
+
 correct_region_order = [
     'CAR', 'NCR', 'Region I', 'Region II', 'Region III', 'Region IV-A',
     'MIMAROPA', 'Region V', 'Region VI', 'Region VII', 'Region VIII',
     'Region IX', 'Region X', 'Region XI', 'Region XII', 'CARAGA', 'BARMM'
 ]
 
+def data_path_for_year(school_year):
+    return f"data_files/data_{school_year}.csv"
+
 def load_data_for_year(school_year):
-    path = f"data_files/data_{school_year}.csv"
+    """Return (data, grade_columns, grade_options, region_options) for a school year.
+
+    Results are memoized per year and reloaded whenever data_{year}.csv or
+    schools.csv changes on disk; a reload swaps in a new snapshot instead of
+    editing the cached one. `data` is a copy-on-write view of that snapshot;
+    the option lists are shared between callbacks and must not be modified.
+    """
+    path = data_path_for_year(school_year)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Dataset for year {school_year} not found at {path}")
+
+    return get_year_dataset(school_year).as_tuple()
+
+def get_year_dataset(school_year):
+    """Return the cached YearDataset for a school year (see load_data_for_year)."""
+    path = data_path_for_year(school_year)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Dataset for year {school_year} not found at {path}")
+
+    signature = _source_signature(path)
+    return _year_cache.get_or_load(
+        school_year, signature,
+        lambda: _load_year(school_year, path, signature),
+        sizeof=YearDataset.memory_usage
+    )
+
+def dataset_key(school_year):
+    """A small, JSON-safe handle on a year's dataset: the school year and a version of its files.
+
+    The dashboard's stored_dataset store carries this instead of the year's
+    rows, and every chart callback takes it as its data input, resolving the
+    year through dataset_year. The version changes whenever data_{year}.csv or
+    schools.csv is rewritten, so saving the displayed year redraws the charts.
+    """
+    path = data_path_for_year(school_year)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Dataset for year {school_year} not found at {path}")
+    return {'school_year': school_year, 'version': '-'.join(str(part) for part in _source_signature(path))}
+
+def dataset_year(key):
+    """The school year a dataset key refers to (None for an empty store), for the cached accessors here."""
+    return key['school_year'] if key else None
+
+def _source_signature(path):
+    return file_signature(path) + file_signature(SCHOOLS_PATH)
+
+def _load_year(school_year, path, signature):
+    dataset = _read_data_for_year(school_year, path, signature)
+    # Index the year's totals on first load so the trend chart never has to load it
+    if read_totals_index(totals_path_for(path), signature) is None:
+        _write_totals(dataset, path, signature)
+    _tags_of(dataset)
+    _rankings_of(dataset)
+    return dataset
+
+def _write_totals(dataset, path, signature):
+    index = dataset.derived('totals', lambda dataset: build_totals_index(_tensor_of(dataset), dataset.data, signature))
+    try:
+        write_totals_index(index, totals_path_for(path))
+    except OSError as e:
+        print(f"Could not write totals index for {path}: {e}")
+    return index
+
+def get_totals_index(school_year):
+    """Division x grade level x gender totals for a school year.
+
+    Read from data_files/store without loading the year itself; a missing or
+    stale index is rebuilt from the year's dataset.
+    """
+    path = data_path_for_year(school_year)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Dataset for year {school_year} not found at {path}")
+
+    signature = _source_signature(path)
+
+    def load():
+        index = read_totals_index(totals_path_for(path), signature)
+        if index is None:
+            index = _write_totals(get_year_dataset(school_year), path, signature)
+        return index
+
+    return _totals_cache.get_or_load(school_year, signature, load)
+
+def get_year_enrollment(school_year, regions=None, grades=None, gender='All'):
+    """Enrollment of a school year under one filter state, for the trend chart.
+
+    Answered from the year's totals index when it is current. A year whose
+    index is missing or stale is not loaded for this: only its selected count
+    columns, from the selected regions' partitions, are read (see
+    load_year_columns).
+    """
+    path = data_path_for_year(school_year)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Dataset for year {school_year} not found at {path}")
+
+    signature = _source_signature(path)
+    index = _totals_cache.get(school_year, signature)
+    if index is None:
+        index = read_totals_index(totals_path_for(path), signature)
+        if index is not None:
+            _totals_cache.get_or_load(school_year, signature, lambda: index)
+    if index is not None:
+        return index.total(regions, grades, gender)
+
+    projected = load_year_columns(school_year, grades, gender, regions=regions)
+    return int(count_sums(projected, grade_columns_for(projected.columns).columns(grades, gender)).sum())
+
+def data_cache_stats():
+    return _year_cache.stats()
+
+def clear_data_cache():
+    _year_cache.clear()
+    _schools_cache.clear()
+    _totals_cache.clear()
+    _transition_cache.clear()
+    _projection_cache.clear()
+    _search_cache.clear()
+    _view_cache.clear()
+
+def read_year_rows(school_year):
+    """Raw data_{year} rows (no school metadata), read from the columnar store when fresh."""
+    path = data_path_for_year(school_year)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Dataset for year {school_year} not found at {path}")
+    rows, missing = load_year_frame(path)
+    return apply_schema(rows, missing)[0]
+
+def load_year_columns(school_year, grades=None, gender='All', metadata=(), counts=True, regions=None):
+    """A year's rows projected onto the count columns for a grade/gender selection plus `metadata`.
+
+    Only those count columns (none when `counts` is False), BEIS School ID
+    for the join and the `metadata` columns the year's file holds (School
+    Year) are read from the columnar store; the other `metadata` columns are
+    taken from schools.csv. With `regions`, only those regions' partitions
+    are read (see _region_rows) and rows come region by region. Each
+    projection is cached on its own and reloaded whenever either file
+    changes; the frame is returned as a copy-on-write view.
+    """
+    path = data_path_for_year(school_year)
     if not os.path.exists(path):
         raise FileNotFoundError(f"Dataset for year {school_year} not found at {path}")
 
-    data = pd.read_csv(path)
+    signature = _source_signature(path)
+    regions, grades, gender = filter_key(regions, grades, gender)
+    key = (school_year, regions, grades if counts else None, gender, tuple(metadata))
+
+    def load():
+        stored = year_frame_columns(path)
+        count_columns = grade_columns_for(stored).columns(grades, gender) if counts else []
+        own = [col for col in metadata if col in stored]
+        read_columns = ['BEIS School ID', *own, *count_columns]
+        registry = get_school_registry()
+        if regions:
+            rows, missing = _region_rows(path, signature, regions, read_columns)
+            positions = registry.join_positions(rows['BEIS School ID'])
+        else:
+            rows, missing = load_year_frame(path, columns=read_columns)
+            positions = None
+        from_registry = [col for col in metadata if col not in stored]
+        if from_registry:
+            if positions is None:
+                positions = _join_positions(path, signature, rows, registry)
+            rows = rows.assign(**registry.take(positions, from_registry))
+        projected, _ = apply_schema(rows, missing, sparse=SPARSE_SHS_STRANDS)
+        return projected[list(dict.fromkeys([*metadata, *count_columns]))]
+
+    return snapshot_view(_projection_cache.get_or_load(
+        key, signature, load, sizeof=lambda frame: int(frame.memory_usage(deep=True).sum())
+    ))
+
+def _write_region_partitions(path, signature):
+    """Re-partition a year's rows by region; only partitions whose rows changed are rewritten."""
+    rows, missing = load_year_frame(path)
+    registry = get_school_registry()
+    regions = registry.take(_join_positions(path, signature, rows, registry), ['Region'])['Region']
+    try:
+        write_partitions(rows, missing, regions, path, signature)
+    except OSError as e:
+        print(f"Could not write region partitions for {path}: {e}")
+        return False
+    return True
+
+def _region_rows(path, signature, regions, columns=None):
+    """Raw rows of `regions` only (in correct_region_order), from the year's region partitions."""
+    rank = {region: i for i, region in enumerate(correct_region_order)}
+    ordered = sorted(regions, key=lambda region: rank.get(region, len(rank)))
+    loaded = read_partitions(path, signature, ordered, columns)
+    if loaded is None and _write_region_partitions(path, signature):
+        loaded = read_partitions(path, signature, ordered, columns)
+    if loaded is None:
+        # Partitions could not be written: filter the whole year instead
+        rows, missing = load_year_frame(path, columns=columns)
+        registry = get_school_registry()
+        regions_of = registry.take(_join_positions(path, signature, rows, registry), ['Region'])['Region']
+        keep = np.flatnonzero(pd.Series(regions_of).isin(ordered).to_numpy())
+        loaded = rows.iloc[keep].reset_index(drop=True), {col: mask[keep] for col, mask in missing.items()}
+    return loaded
+
+def get_school_columns(school_year, rows, columns):
+    """School metadata `columns` for a year's rows (as read by read_year_rows), via the join index."""
+    path = data_path_for_year(school_year)
+    registry = get_school_registry()
+    return pd.DataFrame(registry.take(_join_positions(path, _source_signature(path), rows, registry), columns),
+                        index=rows.index)
+
+def save_year_rows(school_year, df):
+    """Write a year's rows to data_{year}.csv and regenerate its columnar store, indexes and partitions."""
+    path = data_path_for_year(school_year)
+    save_year_frame(df, path)
+    get_totals_index(school_year)
+    _write_region_partitions(path, _source_signature(path))
 
-    # Merge with schools.csv
-    schools_df = pd.read_csv(SCHOOLS_PATH)
-    data = data.merge(schools_df, on='BEIS School ID', how='left')
+def _join_positions(path, signature, rows, registry):
+    """Registry row of each year row, from the persisted join index (rebuilt when stale)."""
+    join_path = join_path_for(path)
+    positions = read_join_index(join_path, signature, len(rows))
+    if positions is None:
+        positions = registry.join_positions(rows['BEIS School ID'])
+        try:
+            write_join_index(positions, join_path, signature)
+        except OSError as e:
+            print(f"Could not write join index {join_path}: {e}")
+    return positions
 
-    # Extract grade columns
-    grade_columns = [col for col in data.columns if re.match(r'^(K|G1(?!\d)|G2|G3|G4|G5|G6|G7|G8|G9|G10|G11|G12|Elem NG|JHS NG)', col)]
+def _read_data_for_year(school_year, path, signature=None):
+    signature = signature or _source_signature(path)
+    rows, missing = load_year_frame(path)
 
-    data['Total Male'] = data[[col for col in grade_columns if 'Male' in col]].replace("N/A", 0).apply(pd.to_numeric, errors='coerce').sum(axis=1)
-    data['Total Female'] = data[[col for col in grade_columns if 'Female' in col]].replace("N/A", 0).apply(pd.to_numeric, errors='coerce').sum(axis=1)
-    data['Total Enrollment'] = data['Total Male'] + data['Total Female']
+    # Attach school metadata by registry position (rows keep their order)
+    registry = get_school_registry()
+    positions = _join_positions(path, signature, rows, registry)
+    data, missing = apply_schema(rows.assign(**registry.take(positions)), missing, sparse=SPARSE_SHS_STRANDS)
 
-    # Build grade options
-    grade_keys = sorted(set(re.match(r'^(K|G\d{1,2}|Elem NG|JHS NG)', col).group(1) for col in grade_columns if re.match(r'^(K|G\d{1,2}|Elem NG|JHS NG)', col)))
-    grade_sort_order = {'K': 0, 'G1': 1, 'G2': 2, 'G3': 3, 'G4': 4, 'G5': 5, 'G6': 6, 'Elem NG': 7,
-                        'G7': 8, 'G8': 9, 'G9': 10, 'G10': 11, 'JHS NG': 12, 'G11': 13, 'G12': 14}
-    grade_keys.sort(key=lambda g: grade_sort_order.get(g, 100))
+    # Totals are appended after the count columns, so the resolver's positions stay valid
+    columns = grade_columns_for(data.columns)
+    male = count_sums(data, columns.columns(gender='Male'))
+    female = count_sums(data, columns.columns(gender='Female'))
+    data = data.assign(**{'Total Male': male, 'Total Female': female, 'Total Enrollment': male + female})
 
-    grade_options = [{'label': 'Kinder', 'value': 'K'}] +         [{'label': f'Grade {g[1:]}', 'value': g} if g.startswith('G') else {'label': g, 'value': g} for g in grade_keys if g != 'K']
+    present_regions = set(data['Region'].dropna())
+    region_options = [{'label': r, 'value': r} for r in correct_region_order if r in present_regions]
+    return YearDataset(school_year, data, missing, columns, region_options)
 
-    region_options = [{'label': r, 'value': r} for r in correct_region_order if r in data['Region'].unique()]
-    return data, grade_columns, grade_options, region_options
+def get_school_registry():
+    """The SchoolRegistry for schools.csv, reloaded whenever the file changes."""
+    return _schools_cache.get_or_load(
+        'schools', file_signature(SCHOOLS_PATH),
+        lambda: SchoolRegistry(pd.read_csv(SCHOOLS_PATH))
+    )
 
 def load_schools():
-    return pd.read_csv(SCHOOLS_PATH)
+    """schools.csv as a DataFrame (shared; do not modify in place)."""
+    return get_school_registry().frame
+
+def save_schools(df):
+    """Write schools.csv and drop the parsed copy, so every later lookup sees the new schools."""
+    df.to_csv(SCHOOLS_PATH, index=False, na_rep="N/A")
+    _schools_cache.clear()
 
 def get_school_metadata(school_name):
-    schools_df = load_schools()
-    return schools_df[schools_df['School Name'] == school_name].iloc[0]
+    return get_school_registry().by_name(school_name)
 
 def sanitize_enrollment_data(df, row_index):
     for col in df.columns[2:]:
@@ -56,33 +350,171 @@ def sanitize_enrollment_data(df, row_index):
     return df
 
 def build_combined_shs_track_df(data):
-    shs_track_records = []
-
-    strands = ['ABM', 'HUMSS', 'STEM', 'GAS', 'PBM', 'TVL', 'SPORTS', 'ARTS & DESIGN']
-    grades = ['G11', 'G12']
-    genders = ['Male', 'Female']
-
-    for _, row in data.iterrows():
-        for grade in grades:
-            for strand in strands:
-                for gender in genders:
-                    if strand in ['TVL', 'SPORTS', 'ARTS & DESIGN']:
-                        col_name = f"{grade} {strand.split()[0]} {gender}"
-                    else:
-                        col_name = f"{grade} ACAD - {strand} {gender}"
-                    if col_name in data.columns:
-                        value = row[col_name]
-                        if pd.notna(value) and value != "N/A" and float(value) > 0:
-                            shs_track_records.append({
-                                'Region': row['Region'],
-                                'School Year': row['School Year'],
-                                'Gender': gender,
-                                'Grade Level': grade,
-                                'Track': strand,
-                                'Total Enrollment': float(value)
-                            })
-
-    return pd.DataFrame(shs_track_records)
+    """Long-format senior-high enrollment: one row per school, grade, track and gender with a non-zero count."""
+    columns, grade_levels, tracks, genders = [], [], [], []
+    for grade in ['G11', 'G12']:
+        for code, track in SHS_TRACKS.items():
+            for gender in ['Male', 'Female']:
+                col_name = f"{grade} {code} {gender}"
+                if col_name in data.columns:
+                    columns.append(col_name)
+                    grade_levels.append(grade)
+                    tracks.append(track)
+                    genders.append(gender)
+
+    # Non-zero cells column by column (sparse columns hold nothing else), then in row order
+    rows, cells, counts = [], [], []
+    for cell, col in enumerate(columns):
+        values = data[col].array
+        if is_sparse(values):
+            positions, values = values.sp_index.indices, values.sp_values
+        else:
+            values = values.to_numpy()
+            positions = np.flatnonzero(values)
+            values = values[positions]
+        keep = values > 0
+        rows.append(positions[keep])
+        cells.append(np.full(np.count_nonzero(keep), cell))
+        counts.append(values[keep])
+    rows, cells, counts = (np.concatenate(parts) if parts else np.array([], dtype=np.int64)
+                           for parts in (rows, cells, counts))
+    order = np.lexsort((cells, rows))
+    rows, cells = rows[order], cells[order]
+
+    return pd.DataFrame({
+        'Region': data['Region'].to_numpy()[rows],
+        'School Year': data['School Year'].to_numpy()[rows],
+        'Gender': np.array(genders, dtype=object)[cells],
+        'Grade Level': np.array(grade_levels, dtype=object)[cells],
+        'Track': np.array(tracks, dtype=object)[cells],
+        'Total Enrollment': counts[order].astype(np.float64)
+    })
+
+def get_shs_track_df(school_year, regions=None, gender='All'):
+    """Senior-high track table for a school year, its selected regions and a gender ('All' for both).
+
+    Built from a projection of the year's G11/G12 strand columns for that
+    gender, read from the selected regions' partitions only (see
+    load_year_columns), and cached alongside the projections.
+    """
+    path = data_path_for_year(school_year)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Dataset for year {school_year} not found at {path}")
+
+    regions, _, gender = filter_key(regions, None, gender)
+    return snapshot_view(_projection_cache.get_or_load(
+        ('shs_tracks', school_year, regions, gender), _source_signature(path),
+        lambda: build_combined_shs_track_df(load_year_columns(
+            school_year, ['G11', 'G12'], gender, metadata=['Region', 'School Year'], regions=regions
+        )),
+        sizeof=lambda frame: int(frame.memory_usage(deep=True).sum())
+    ))
+
+def _tensor_of(dataset):
+    return dataset.derived('tensor', lambda dataset: build_enrollment_tensor(dataset.data, dataset.columns))
+
+def get_enrollment_tensor(school_year):
+    """Schools x grade level x gender counts for a school year, cached with the loaded dataset."""
+    return _tensor_of(get_year_dataset(school_year))
+
+def _load_tags(dataset):
+    path = data_path_for_year(dataset.school_year)
+    signature = _source_signature(path)
+    tags = read_tags(tags_path_for(path), signature)
+    if tags is None or any(len(mask) != len(dataset.data) for mask in tags.values()):
+        tags = build_tags(dataset.data, dataset.columns)
+        try:
+            write_tags(tags, tags_path_for(path), signature)
+        except OSError as e:
+            print(f"Could not write tags for {path}: {e}")
+    # Masks are shared by every callback; combine them into new arrays, never in place
+    for mask in tags.values():
+        mask.flags.writeable = False
+    return tags
+
+def _tags_of(dataset):
+    return dataset.derived('tags', _load_tags)
+
+def get_school_tags(school_year):
+    """Boolean tag masks (SPED centers, non-graded offerings, ...) over a year's rows."""
+    return _tags_of(get_year_dataset(school_year))
+
+def get_school_search_index(school_year):
+    """Name/ID search index over a year's schools, built from its ID and name columns only."""
+    path = data_path_for_year(school_year)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Dataset for year {school_year} not found at {path}")
+
+    return _search_cache.get_or_load(
+        school_year, _source_signature(path),
+        lambda: build_school_search_index(
+            load_year_columns(school_year, metadata=['BEIS School ID', 'School Name'], counts=False)
+        )
+    )
+
+def _rankings_of(dataset):
+    return dataset.derived('rankings', lambda dataset: build_school_rankings(_tensor_of(dataset)))
+
+def _cube_of(dataset):
+    return dataset.derived('cube', lambda dataset: build_enrollment_cube(_tensor_of(dataset)))
+
+def get_enrollment_cube(school_year):
+    """Region x division x sector x COC aggregates for a school year, cached with the loaded dataset."""
+    return _cube_of(get_year_dataset(school_year))
+
+def get_filter_view(school_year, regions=None, grades=None, gender='All'):
+    """The FilterView for one dashboard filter state, shared by every chart callback.
+
+    Views are kept in a small LRU keyed on the year's file signature, so a
+    reloaded year never serves views computed from its old files. They reach
+    the dataset through get_year_dataset, so the LRU holds no dataset itself
+    and the year cache's byte budget stays the only thing keeping years loaded.
+    """
+    path = data_path_for_year(school_year)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Dataset for year {school_year} not found at {path}")
+
+    key = (school_year,) + filter_key(regions, grades, gender)
+    return _view_cache.get_or_load(
+        key, _source_signature(path),
+        lambda: FilterView(lambda: _view_sources(get_year_dataset(school_year)), regions, grades, gender)
+    )
+
+def _view_sources(dataset):
+    return {
+        'dataset': dataset,
+        'tensor': _tensor_of(dataset),
+        'cube': _cube_of(dataset),
+        'tags': _tags_of(dataset),
+        'rankings': _rankings_of(dataset),
+    }
+
+def get_school_history(school_id):
+    """A school's (School Year, Total Male, Total Female, Total Enrollment) rows across every year.
+
+    Each year is one lookup in its totals index; no year is loaded.
+    """
+    history = []
+    for year in get_available_school_years():
+        totals = get_totals_index(year).school_totals(school_id)
+        if totals is not None:
+            history.append({
+                'School Year': year,
+                'Total Male': totals[0],
+                'Total Female': totals[1],
+                'Total Enrollment': totals[0] + totals[1],
+            })
+    return pd.DataFrame(history, columns=['School Year', 'Total Male', 'Total Female', 'Total Enrollment'])
+
+def get_transition_rates():
+    """Elementary -> JHS and JHS -> SHS rates per division for every year with a previous year.
+
+    Computed from the totals indexes in one pass and cached on the data
+    versions of all years it covers.
+    """
+    indexes = {year: get_totals_index(year) for year in get_available_school_years()}
+    signature = tuple((year, index.source_signature) for year, index in indexes.items())
+    return _transition_cache.get_or_load('all', signature, lambda: build_transition_rates(indexes))
 
 def get_available_school_years():
     folder = "data_files"
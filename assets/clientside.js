@@ -0,0 +1,157 @@
+// assets/clientside.js
+// Clientside callbacks for purely UI interactions (sidebar collapse, modals,
+// password visibility, the finalize button). They only move state that is
+// already in the browser, so they run without a server round-trip and never
+// queue behind chart callbacks. Registered from app.py with
+// ClientsideFunction(namespace='ui', function_name=...).
+
+// Sidebar widths; keep in step with layout/sidebar.py and get_content_style
+const SIDEBAR_WIDTH = '180px';
+const SIDEBAR_COLLAPSED_WIDTH = '60px';
+
+function withDisplay(style, hidden) {
+    const next = Object.assign({}, style);
+    if (hidden) {
+        next.display = 'none';
+    } else {
+        delete next.display;
+    }
+    return next;
+}
+
+function triggeredId() {
+    const triggered = dash_clientside.callback_context.triggered;
+    return triggered.length ? triggered[0].prop_id.split('.')[0] : null;
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    ui: {
+        toggleSidebar: function (n_clicks, isCollapsed, sidebarStyle, contentStyle, titleStyle, ruleStyle) {
+            const collapsed = !isCollapsed;
+            const width = collapsed ? SIDEBAR_COLLAPSED_WIDTH : SIDEBAR_WIDTH;
+            return [
+                collapsed,
+                Object.assign({}, sidebarStyle, {width: width, textAlign: collapsed ? 'center' : 'left'}),
+                Object.assign({}, contentStyle, {marginLeft: width}),
+                collapsed ? 'mdi:menu-open' : 'mdi:menu-close',
+                withDisplay(titleStyle, collapsed),
+                withDisplay(ruleStyle, collapsed)
+            ];
+        },
+
+        togglePasswordVisibility: function (n_clicks, currentType) {
+            if (currentType === 'password') {
+                return ['text', 'fas fa-eye-slash'];
+            }
+            return ['password', 'fas fa-eye'];
+        },
+
+        toggleWelcomeModal: function (loginData, closeClicks, isOpen) {
+            const trigger = triggeredId();
+            if (trigger === null) {
+                throw dash_clientside.PreventUpdate;
+            }
+            if (trigger === 'login-state' && loginData && loginData.logged_in) {
+                return [true, 'Welcome, ' + (loginData.user || 'User') + '! 🎉'];
+            } else if (trigger === 'close-welcome-modal') {
+                return [false, dash_clientside.no_update];
+            }
+            return [isOpen, dash_clientside.no_update];
+        },
+
+        closeSchoolModal: function (n_clicks) {
+            return false;
+        },
+
+        checkMissingFields: function (n_clicks, name, year, grade, maleCount, femaleCount) {
+            if (!n_clicks) {
+                return [false, ''];
+            }
+            const missingFields = [];
+            if (!name) {
+                missingFields.push('School Name');
+            }
+            if (!year) {
+                missingFields.push('School Year');
+            }
+            if (!grade) {
+                missingFields.push('Grade Level');
+            }
+            // Either enrollment count will do
+            if (!maleCount && !femaleCount) {
+                missingFields.push('Male and/or Female Enrollment Count');
+            }
+            if (!missingFields.length) {
+                return [false, ''];
+            }
+            const message = '⚠️ The following fields are missing: ' + missingFields.join(', ') +
+                '.<br><br>Please fill them in.';
+            return [true, {
+                namespace: 'dash_core_components',
+                type: 'Markdown',
+                props: {children: message, dangerously_allow_html: true}
+            }];
+        },
+
+        closeMissingFieldsModal: function (n_clicks) {
+            return !n_clicks;
+        },
+
+        openConfirmModalManual: function (n_clicks, name, year, grade, maleCount, femaleCount) {
+            if (!n_clicks) {
+                return [false, '', false];
+            }
+            if (!(name && year && grade)) {
+                return [false, '⚠️ Please fill in all fields before submitting.', false];
+            }
+            if (!maleCount && !femaleCount) {
+                return [false, '⚠️ Please fill in the Male or Female enrollment count.', false];
+            }
+            return [true, 'Are you sure you want to submit data for ' + year + '?', false];
+        },
+
+        openUploadModal: function (contents, uploadYear) {
+            if (contents && uploadYear) {
+                return [true, 'File uploaded successfully', false];
+            }
+            return [false, '', false];
+        },
+
+        openConfirmModalUpload: function (n_clicks, filename) {
+            if (n_clicks) {
+                return [true, 'Are you sure you want to upload the CSV file?', false];
+            }
+            return [false, '', false];
+        },
+
+        closeConfirmModal: function (n_clicks, isOpen) {
+            if (n_clicks) {
+                return [false, '', false];
+            }
+            return [isOpen, '', false];
+        },
+
+        closeConfirmModalUpload: function (n_clicks) {
+            // Also clears the file input
+            return [!n_clicks, '', false, null];
+        },
+
+        toggleFinalizeButton: function (checked) {
+            return !checked;
+        },
+
+        closeModalsOnFinalize: function (n_clicks) {
+            if (n_clicks) {
+                return [false, false, true];
+            }
+            return [true, true, false];
+        },
+
+        toggleUploadModal: function (openClick, closeClick, isOpen) {
+            if (openClick || closeClick) {
+                return !isOpen;
+            }
+            return isOpen;
+        }
+    }
+});
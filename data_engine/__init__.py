@@ -0,0 +1,21 @@
+# Data engine package: caching and storage helpers used by app_data
+from .cache import DatasetCache, file_signature
+from .columns import GradeColumns, grade_columns_for
+from .cube import EnrollmentCube, build_enrollment_cube
+from .dataset import YearDataset, snapshot_view
+from .tensor import EnrollmentTensor, build_enrollment_tensor
+from .geometry import build_region_geometry, load_region_geometry, write_region_geometry
+from .join import join_path_for, read_join_index, write_join_index
+from .partitions import partitions_dir_for, read_partitions, write_partitions
+from .rankings import SchoolRankings, build_school_rankings
+from .registry import SchoolRegistry
+from .search import SchoolSearchIndex, build_school_search_index
+from .schema import (
+    ENROLLMENT_COLUMNS, COUNT_COLUMNS, SHS_STRAND_COLUMNS, SHS_TRACKS, apply_schema, count_sums, is_sparse,
+    to_export_frame,
+)
+from .storage import load_year_frame, save_year_frame, store_path_for, year_frame_columns
+from .tags import TAGGERS, build_tags, read_tags, tags_path_for, top_per_region, write_tags
+from .totals import TotalsIndex, build_totals_index, read_totals_index, totals_path_for, write_totals_index
+from .transitions import TRANSITIONS, TransitionRates, build_transition_rates, previous_school_year
+from .view import FilterView, filter_key
@@ -0,0 +1,110 @@
+# data_engine/cache.py
+# Process-wide, bounded caches for loaded school-year datasets.
+import os
+import threading
+from collections import OrderedDict
+
+
+def file_signature(path):
+    """Return (mtime_ns, size) for `path`, used to detect a rewritten file."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class DatasetCache:
+    """LRU cache whose entries are tied to the signature of their source files.
+
+    An entry is only returned while the signature it was loaded with still
+    matches; otherwise it is dropped and reloaded. The cache is bounded both by
+    entry count and by an approximate byte budget (the most recently loaded
+    entry is always kept, even if it alone exceeds the budget).
+    """
+
+    def __init__(self, max_entries=8, max_bytes=512 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (signature, value, nbytes)
+        self._lock = threading.Lock()
+        self._loading = {}  # key -> lock held while that key is being loaded
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _lookup(self, key, signature):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] != signature:
+            del self._entries[key]
+            self.invalidations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get_or_load(self, key, signature, loader, sizeof=None):
+        """Return the cached value for `key`, calling `loader()` on a miss.
+
+        Concurrent callers asking for the same key wait for a single load
+        instead of each parsing the source files themselves.
+        """
+        with self._lock:
+            entry = self._lookup(key, signature)
+            if entry is not None:
+                self.hits += 1
+                return entry[1]
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                entry = self._lookup(key, signature)
+                if entry is not None:
+                    self.hits += 1
+                    return entry[1]
+                self.misses += 1
+
+            value = loader()
+            nbytes = sizeof(value) if sizeof else 0
+
+            with self._lock:
+                self._entries[key] = (signature, value, nbytes)
+                self._entries.move_to_end(key)
+                self._evict()
+                self._loading.pop(key, None)
+            return value
+
+    def get(self, key, signature):
+        """The cached value for `key` while its signature still matches, else None; never loads."""
+        with self._lock:
+            entry = self._lookup(key, signature)
+            if entry is None:
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def _evict(self):
+        total = sum(entry[2] for entry in self._entries.values())
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or total > self.max_bytes):
+            _, (_, _, nbytes) = self._entries.popitem(last=False)
+            total -= nbytes
+            self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'bytes': sum(entry[2] for entry in self._entries.values()),
+            }
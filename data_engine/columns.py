@@ -0,0 +1,82 @@
+# data_engine/columns.py
+# Grade/gender column resolution for a year's schema.
+#
+# Count columns are named "<grade> <gender>", except senior high where each
+# strand has its own column ("G11 ACAD STEM Male"). The resolver maps every
+# (grade, gender) pair to its columns once, so callbacks never scan the
+# column list to answer "which columns hold grades X for gender Y".
+from functools import lru_cache
+
+GRADE_LEVELS = ['K', 'G1', 'G2', 'G3', 'G4', 'G5', 'G6', 'Elem NG',
+                'G7', 'G8', 'G9', 'G10', 'JHS NG', 'G11', 'G12']
+GENDERS = ['Male', 'Female']
+
+
+def _grade_key(col):
+    """Grade level a count column belongs to, or None for non-grade columns."""
+    head, _, rest = col.partition(' ')
+    if head in ('Elem', 'JHS') and rest.startswith('NG '):
+        return f"{head} NG"
+    return head if head in GRADE_LEVELS and rest else None
+
+
+def _gender_of(col):
+    # "Female" contains "Male", so test the longer name first
+    if col.endswith('Female'):
+        return 'Female'
+    return 'Male' if col.endswith('Male') else None
+
+
+def gender_values(gender):
+    """Genders covered by a gender filter value ('Male', 'Female' or 'All')."""
+    return [gender] if gender in GENDERS else GENDERS
+
+
+def grade_label(grade):
+    if grade == 'K':
+        return 'Kinder'
+    return f"Grade {grade[1:]}" if grade.startswith('G') else grade
+
+
+class GradeColumns:
+    """Column names and positions per grade level and gender for one column layout."""
+
+    def __init__(self, columns):
+        self._by_key = {}
+        for position, col in enumerate(columns):
+            grade, gender = _grade_key(col), _gender_of(col)
+            if grade and gender:
+                self._by_key.setdefault((grade, gender), []).append((position, col))
+
+        self.levels = [grade for grade in GRADE_LEVELS
+                       if any((grade, gender) in self._by_key for gender in GENDERS)]
+        self.grade_columns = [col for _, col in sorted(
+            entry for entries in self._by_key.values() for entry in entries)]
+
+    def _entries(self, grades, gender):
+        grades = [grade.split('_')[0] for grade in grades] if grades else self.levels
+        return [entry for g in gender_values(gender) for grade in grades
+                for entry in self._by_key.get((grade, g), ())]
+
+    def columns(self, grades=None, gender='All'):
+        """Columns for the selected grades (every level when empty) and gender, Male first."""
+        return [col for _, col in self._entries(grades, gender)]
+
+    def positions(self, grades=None, gender='All'):
+        """Positions of columns(grades, gender) within the column layout."""
+        return [position for position, _ in self._entries(grades, gender)]
+
+    @property
+    def grade_options(self):
+        options = [{'label': grade_label('K'), 'value': 'K'}]
+        return options + [{'label': grade_label(grade), 'value': grade} for grade in self.levels if grade != 'K']
+
+
+@lru_cache(maxsize=16)
+def _resolver_for(columns):
+    return GradeColumns(columns)
+
+
+def grade_columns_for(columns):
+    """Shared GradeColumns for a column layout; years with the same schema reuse one resolver."""
+    return _resolver_for(tuple(columns))
@@ -0,0 +1,100 @@
+# data_engine/cube.py
+# Pre-aggregated enrollment cube: one row per Region x Division x Sector x
+# Modified COC cell with counts per grade level and gender, built once per year
+# from the year's EnrollmentTensor.
+import numpy as np
+import pandas as pd
+
+from .columns import GENDERS, GRADE_LEVELS
+
+CUBE_DIMENSIONS = ['Region', 'Division', 'Sector', 'Modified COC']
+
+
+class EnrollmentCube:
+    """Counts by region, division, sector and COC for one school year.
+
+    `cells` has the CUBE_DIMENSIONS, one "<grade> <gender>" column per grade
+    level present, and 'Schools'. `patterns` counts schools per cell and per
+    bitmask of the grade/gender columns in which they have any enrollment,
+    which is what "schools with enrollment in the selected grades" needs.
+    """
+
+    def __init__(self, cells, patterns, value_columns):
+        self.cells = cells
+        self.patterns = patterns
+        self._value_columns = value_columns
+        self._bits = {col: 1 << i for i, col in enumerate(value_columns)}
+
+    def value_columns(self, grades=None, gender='All'):
+        """Cube columns for the selected grades (all when empty) and gender ('All' for both)."""
+        grades = grades or GRADE_LEVELS
+        genders = [gender] if gender in GENDERS else GENDERS
+        return [
+            f"{grade} {g}" for g in genders for grade in grades
+            if f"{grade} {g}" in self._bits
+        ]
+
+    def scope(self, regions=None, grades=None, gender='All', total_name='Selected Grades Total'):
+        """Cells within `regions` (all when empty) with the selected total added as a column."""
+        cells = self.cells
+        if regions:
+            cells = cells[cells['Region'].isin(regions)]
+        return cells.assign(**{total_name: cells[self.value_columns(grades, gender)].sum(axis=1)})
+
+    def school_counts(self, by, regions=None, grades=None, gender='All'):
+        """Number of schools per `by` group with enrollment in the selected grades and gender."""
+        patterns = self.patterns
+        if regions:
+            patterns = patterns[patterns['Region'].isin(regions)]
+        mask = sum(self._bits[col] for col in self.value_columns(grades, gender))
+        enrolled = patterns[(patterns['Pattern'].to_numpy() & mask) != 0]
+        return enrolled.groupby(by, observed=True)['Schools'].sum()
+
+
+def _group_rows(keys):
+    """Sort order, group start offsets and unique keys for an integer key per row."""
+    order = np.argsort(keys, kind='stable')
+    unique_keys, starts = np.unique(keys[order], return_index=True)
+    return order, starts, unique_keys
+
+
+def _dimension_frame(tensor, cell_keys, shape):
+    columns = {}
+    for dim, codes in zip(CUBE_DIMENSIONS, np.unravel_index(cell_keys, shape)):
+        columns[dim] = pd.Categorical.from_codes(codes - 1, categories=tensor.categories[dim])
+    return pd.DataFrame(columns)
+
+
+def build_enrollment_cube(tensor):
+    n_schools = len(tensor)
+    # Value columns are ordered gender-major: all Male levels, then all Female levels
+    value_columns, flat_positions = [], []
+    for g, gender in enumerate(GENDERS):
+        for i, grade in enumerate(tensor.levels):
+            value_columns.append(f"{grade} {gender}")
+            flat_positions.append(i * len(GENDERS) + g)
+    values = tensor.counts.reshape(n_schools, -1)[:, flat_positions]
+
+    # One integer key per school for its (region, division, sector, COC) cell; 0 = missing
+    shape = tuple(len(tensor.categories[dim]) + 1 for dim in CUBE_DIMENSIONS)
+    cell_keys = np.ravel_multi_index([tensor.codes[dim] + 1 for dim in CUBE_DIMENSIONS], shape)
+
+    order, starts, unique_cells = _group_rows(cell_keys)
+    if n_schools:
+        sums = np.add.reduceat(values[order], starts, axis=0, dtype=np.int64)
+    else:
+        sums = np.zeros((0, len(value_columns)), dtype=np.int64)
+    cells = _dimension_frame(tensor, unique_cells, shape)
+    for i, col in enumerate(value_columns):
+        cells[col] = sums[:, i]
+    cells['Schools'] = np.diff(np.append(starts, n_schools))
+
+    pattern = ((values > 0).astype(np.int64) << np.arange(len(value_columns), dtype=np.int64)).sum(axis=1)
+    pattern_keys = cell_keys * (1 << len(value_columns)) + pattern
+    _, pattern_starts, unique_patterns = _group_rows(pattern_keys)
+    pattern_cells, pattern_bits = np.divmod(unique_patterns, 1 << len(value_columns))
+    patterns = _dimension_frame(tensor, pattern_cells, shape)
+    patterns['Pattern'] = pattern_bits
+    patterns['Schools'] = np.diff(np.append(pattern_starts, n_schools))
+
+    return EnrollmentCube(cells, patterns, value_columns)
@@ -0,0 +1,73 @@
+# data_engine/dataset.py
+# One loaded school year, as held in the year cache.
+#
+# A YearDataset is an immutable snapshot: it is built once by the loader and
+# replaced as a whole (never edited) when the year's files change. Callers get
+# copy-on-write views of its frames, so writing to what they were handed
+# never reaches the snapshot other callbacks are reading. This relies on
+# pandas >= 3 (see requirements.txt), where every shallow copy is
+# copy-on-write; on pandas 2 a shallow copy shares its buffers.
+import threading
+
+import pandas as pd
+
+
+def snapshot_view(value):
+    """A copy-on-write view of a shared frame or series; other values as they are."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    return value
+
+
+class YearDataset:
+    """A school year's merged frame together with what the loader derived from it.
+
+    `data` follows data_engine.schema (uint32 counts, categorical metadata) and
+    `missing` flags which count cells were empty in the source file, and
+    `columns` resolves grade/gender selections to `data` columns. Both frames
+    are handed out as views (see snapshot_view); the snapshot itself is never
+    modified after construction.
+    """
+
+    def __init__(self, school_year, data, missing, columns, region_options):
+        self.school_year = school_year
+        self._data = data
+        self._missing = missing
+        self.columns = columns
+        self.region_options = region_options
+        self._derived = {}
+        self._derived_lock = threading.RLock()
+
+    def derived(self, name, builder):
+        """Return `builder(self)`, computed once and kept for the life of this dataset.
+
+        Structures derived from a year (track tables, aggregates, indexes) are
+        cached here so they are dropped together with the year when its files
+        change. Frames are returned as views, like `data`.
+        """
+        with self._derived_lock:
+            if name not in self._derived:
+                self._derived[name] = builder(self)
+            return snapshot_view(self._derived[name])
+
+    @property
+    def data(self):
+        return snapshot_view(self._data)
+
+    @property
+    def missing(self):
+        return snapshot_view(self._missing)
+
+    @property
+    def grade_columns(self):
+        return self.columns.grade_columns
+
+    @property
+    def grade_options(self):
+        return self.columns.grade_options
+
+    def as_tuple(self):
+        return self.data, self.grade_columns, self.grade_options, self.region_options
+
+    def memory_usage(self):
+        return int(self._data.memory_usage(deep=True).sum() + self._missing.memory_usage(deep=True).sum())
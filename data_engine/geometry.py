@@ -0,0 +1,162 @@
+# data_engine/geometry.py
+# Offline simplification of the region outlines drawn by the choropleth.
+#
+# ph.json holds full-precision MultiPolygons (about 1 MB), far more detail than
+# the dashboard map can show. build_region_geometry simplifies every ring
+# (Douglas-Peucker to `tolerance` degrees), rounds coordinates to `precision`
+# decimals and records the map bounds, so the figure can set its axis ranges
+# instead of fitting bounds on every draw. The result is written once as a
+# static asset that the browser fetches and caches; it is tagged with a hash
+# of the source file and the settings, and rebuilt only when either changes.
+#
+#     python -m data_engine.geometry ph.json assets/ph.simplified.json --tolerance 0.005 --precision 3
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+DEFAULT_TOLERANCE = 0.005  # degrees, about 550 m
+DEFAULT_PRECISION = 3  # decimals, about 110 m
+
+
+def simplify_ring(points, tolerance):
+    """Douglas-Peucker simplification of a closed ring (first point == last point)."""
+    points = np.asarray(points, dtype=float)
+    if len(points) <= 4:
+        return points
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    # Split the ring at its farthest point from the start, so no segment is degenerate
+    far = int(np.argmax(((points - points[0]) ** 2).sum(axis=1)))
+    keep[far] = True
+    stack = [(0, far), (far, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a, b = points[start], points[end]
+        inner = points[start + 1:end]
+        direction = b - a
+        length = np.hypot(*direction)
+        if length == 0:
+            distances = np.hypot(*(inner - a).T)
+        else:
+            distances = np.abs(direction[0] * (inner[:, 1] - a[1]) - direction[1] * (inner[:, 0] - a[0])) / length
+        i = int(np.argmax(distances))
+        if distances[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.extend([(start, split), (split, end)])
+    return points[keep]
+
+
+def _quantize(ring, precision):
+    """Round a ring's coordinates, dropping points that collapse onto their predecessor."""
+    rounded = np.round(ring, precision)
+    distinct = np.ones(len(rounded), dtype=bool)
+    distinct[1:] = (np.diff(rounded, axis=0) != 0).any(axis=1)
+    return rounded[distinct]
+
+
+def _ring_area(ring):
+    x, y = ring[:, 0], ring[:, 1]
+    return abs(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1])) / 2
+
+
+def simplify_polygons(polygons, tolerance, precision):
+    """Simplified MultiPolygon coordinates; polygons whose outline collapses are dropped.
+
+    The largest polygon is always kept, so no region disappears from the map.
+    """
+    simplified = []
+    largest, largest_area = None, -1.0
+    for polygon in polygons:
+        rings = []
+        for ring in polygon:
+            ring = _quantize(simplify_ring(ring, tolerance), precision)
+            if len(ring) >= 4:
+                rings.append(ring)
+            elif not rings:
+                break  # the outer ring collapsed: drop the polygon and its holes
+        exterior = np.asarray(polygon[0], dtype=float)
+        area = _ring_area(exterior)
+        if area > largest_area:
+            largest, largest_area = (rings if rings else [_quantize(exterior, precision)]), area
+        if rings:
+            simplified.append(rings)
+    if not simplified:
+        simplified.append(largest)
+    return [[ring.tolist() for ring in polygon] for polygon in simplified]
+
+
+def _source_hash(path, tolerance, precision):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        digest.update(f.read())
+    digest.update(f"{tolerance}:{precision}".encode())
+    return digest.hexdigest()
+
+
+def build_region_geometry(geojson, tolerance=DEFAULT_TOLERANCE, precision=DEFAULT_PRECISION):
+    """A simplified copy of a Polygon/MultiPolygon FeatureCollection with its bounds as `bbox`."""
+    features = []
+    lon_min = lat_min = np.inf
+    lon_max = lat_max = -np.inf
+    for feature in geojson['features']:
+        geometry = feature['geometry']
+        polygons = geometry['coordinates'] if geometry['type'] == 'MultiPolygon' else [geometry['coordinates']]
+        coordinates = simplify_polygons(polygons, tolerance, precision)
+        points = np.array([point for polygon in coordinates for ring in polygon for point in ring])
+        lon_min, lat_min = np.minimum([lon_min, lat_min], points.min(axis=0))
+        lon_max, lat_max = np.maximum([lon_max, lat_max], points.max(axis=0))
+        features.append({
+            'type': 'Feature',
+            'properties': feature['properties'],
+            'geometry': {'type': 'MultiPolygon', 'coordinates': coordinates},
+        })
+    return {
+        'type': 'FeatureCollection',
+        'bbox': [float(lon_min), float(lat_min), float(lon_max), float(lat_max)],
+        'features': features,
+    }
+
+
+def write_region_geometry(source_path, path, tolerance=DEFAULT_TOLERANCE, precision=DEFAULT_PRECISION):
+    """Simplify `source_path` into `path`; returns the written FeatureCollection."""
+    with open(source_path, 'r', encoding='utf-8') as f:
+        geometry = build_region_geometry(json.load(f), tolerance, precision)
+    # Foreign member: which source and settings the file was built from
+    geometry['source_hash'] = _source_hash(source_path, tolerance, precision)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(geometry, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    return geometry
+
+
+def load_region_geometry(source_path, path, tolerance=DEFAULT_TOLERANCE, precision=DEFAULT_PRECISION):
+    """The simplified geometry at `path`, rebuilt from `source_path` when missing or stale."""
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                geometry = json.load(f)
+            if geometry.get('source_hash') == _source_hash(source_path, tolerance, precision):
+                return geometry
+        except (OSError, ValueError):
+            pass
+    return write_region_geometry(source_path, path, tolerance, precision)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Simplify region outlines for the dashboard map.")
+    parser.add_argument('source', help="input GeoJSON (e.g. ph.json)")
+    parser.add_argument('output', help="output GeoJSON (e.g. assets/ph.simplified.json)")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="in degrees")
+    parser.add_argument('--precision', type=int, default=DEFAULT_PRECISION, help="coordinate decimals")
+    args = parser.parse_args()
+    result = write_region_geometry(args.source, args.output, args.tolerance, args.precision)
+    print(f"{args.output}: {len(result['features'])} regions, {os.path.getsize(args.output):,} bytes, "
+          f"bbox {result['bbox']}")
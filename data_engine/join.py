@@ -0,0 +1,44 @@
+# data_engine/join.py
+# Persistent positional join between a year's rows and schools.csv.
+#
+# data_files/store/data_{year}.join.npz holds, for each row of the year, the
+# position of its school in the SchoolRegistry (-1 when unregistered). It is
+# tagged with the signatures of both files, so rewriting either rebuilds it.
+import os
+
+import numpy as np
+
+from .storage import STORE_DIR, write_archive
+
+JOIN_FORMAT_VERSION = 1
+
+
+def join_path_for(csv_path):
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(STORE_DIR, f"{name}.join.npz")
+
+
+def write_join_index(positions, path, source_signature):
+    write_archive({
+        'format_version': np.array(JOIN_FORMAT_VERSION),
+        'source_signature': np.array(source_signature, dtype=np.int64),
+        'positions': np.asarray(positions, dtype=np.int32),
+    }, path)
+
+
+def read_join_index(path, source_signature, n_rows=None):
+    """Registry positions for a year's rows, or None when missing, unreadable or stale."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as store:
+            if int(store['format_version']) != JOIN_FORMAT_VERSION:
+                return None
+            if tuple(store['source_signature']) != tuple(source_signature):
+                return None
+            positions = store['positions']
+    except (OSError, ValueError, KeyError):
+        return None
+    if n_rows is not None and len(positions) != n_rows:
+        return None
+    return positions
@@ -0,0 +1,131 @@
+# data_engine/partitions.py
+# Region-partitioned copy of a year's columnar store.
+#
+# data_files/store/data_{year}.regions/ holds one columnar archive (see
+# storage) per region, plus one for rows whose school has no region, and a
+# manifest naming each partition with a digest of its contents. The manifest
+# is tagged with the signatures of the year's CSV and of schools.csv (which
+# assigns regions). A partition file is only rewritten when its digest
+# changes, so re-uploading one region's rows leaves the other files alone,
+# and a load reads only the partitions of the regions it asks for.
+import hashlib
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from .storage import STORE_DIR, decode_store, encode_store, write_archive
+
+PARTITION_FORMAT_VERSION = 1
+UNASSIGNED_PARTITION = '(no region)'
+
+
+def partitions_dir_for(csv_path):
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(STORE_DIR, f"{name}.regions")
+
+
+def _partition_file(directory, region):
+    return os.path.join(directory, re.sub(r'[^0-9A-Za-z]+', '_', region).strip('_') + '.npz')
+
+
+def _digest(arrays):
+    digest = hashlib.sha1()
+    for name in sorted(arrays):
+        digest.update(name.encode())
+        digest.update(str(arrays[name].dtype).encode())
+        digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+    return digest.hexdigest()
+
+
+def _read_manifest(directory):
+    """(source signature, region -> digest, columns) from a manifest, or None."""
+    path = os.path.join(directory, 'manifest.npz')
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as manifest:
+            if int(manifest['format_version']) != PARTITION_FORMAT_VERSION:
+                return None
+            digests = dict(zip(manifest['regions'].tolist(), manifest['digests'].tolist()))
+            return tuple(manifest['source_signature']), digests, manifest['columns'].tolist()
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def write_partitions(rows, missing, regions, csv_path, source_signature):
+    """Partition a year's raw rows by `regions` (one label per row, NaN = no region).
+
+    `rows` and `missing` are as from load_year_frame. Returns the regions
+    whose partition files were (re)written.
+    """
+    directory = partitions_dir_for(csv_path)
+    previous = _read_manifest(directory)
+    previous_digests = previous[1] if previous else {}
+
+    labels = pd.Series(regions, dtype=object).fillna(UNASSIGNED_PARTITION).to_numpy()
+    digests = {}
+    written = []
+    for region in pd.unique(labels):
+        selected = np.flatnonzero(labels == region)
+        part_missing = {col: mask[selected] for col, mask in missing.items()}
+        arrays = encode_store(rows.iloc[selected], part_missing)
+        digests[region] = _digest(arrays)
+        arrays['digest'] = np.array(digests[region])
+        path = _partition_file(directory, region)
+        if previous_digests.get(region) != digests[region] or not os.path.exists(path):
+            write_archive(arrays, path)
+            written.append(region)
+
+    for region in set(previous_digests) - set(digests):
+        path = _partition_file(directory, region)
+        if os.path.exists(path):
+            os.remove(path)
+
+    write_archive({
+        'format_version': np.array(PARTITION_FORMAT_VERSION),
+        'source_signature': np.array(source_signature, dtype=np.int64),
+        'regions': np.array(list(digests), dtype=str),
+        'digests': np.array(list(digests.values()), dtype=str),
+        'columns': np.array([str(col) for col in rows.columns], dtype=str),
+    }, os.path.join(directory, 'manifest.npz'))
+    return written
+
+
+def read_partitions(csv_path, source_signature, regions, columns=None):
+    """Raw rows of `regions` only, as (frame, missing), optionally projected onto `columns`.
+
+    Rows come region by region in the order of `regions`, each region in file
+    order. Returns None when the partitions are missing, unreadable or stale.
+    """
+    directory = partitions_dir_for(csv_path)
+    manifest = _read_manifest(directory)
+    if manifest is None or manifest[0] != tuple(source_signature):
+        return None
+    _, digests, stored_columns = manifest
+
+    frames, masks = [], []
+    for region in regions:
+        if region not in digests:
+            continue
+        try:
+            with np.load(_partition_file(directory, region), allow_pickle=False) as store:
+                if str(store['digest']) != digests[region]:
+                    return None
+                loaded = decode_store(store, columns)
+        except (OSError, ValueError, KeyError):
+            return None
+        if loaded is None:
+            return None
+        frames.append(loaded[0])
+        masks.append((len(loaded[0]), loaded[1]))
+
+    if not frames:
+        names = stored_columns if columns is None else [col for col in stored_columns if col in set(columns)]
+        return pd.DataFrame(columns=names), {}
+    frame = pd.concat(frames, ignore_index=True)
+    missing = {}
+    for col in {col for _, part in masks for col in part}:
+        missing[col] = np.concatenate([part.get(col, np.zeros(n, dtype=bool)) for n, part in masks])
+    return frame, missing
@@ -0,0 +1,93 @@
+# data_engine/rankings.py
+# Precomputed top-school rankings for a school year.
+#
+# For every region (and for all regions together), every grade-level group
+# (ES, JHS, SHS or all levels) and every gender, the top RANKING_DEPTH
+# (School Name, Sector) groups are ranked once when the year is loaded. The
+# top-schools chart then reads k rows instead of totalling every school;
+# selections not covered here go through EnrollmentTensor.select().
+import numpy as np
+
+from .tensor import top_n_order
+
+RANKING_DEPTH = 20
+GRADE_GROUPS = {
+    'All': None,
+    'ES': ['K', 'G1', 'G2', 'G3', 'G4', 'G5', 'G6', 'Elem NG'],
+    'JHS': ['G7', 'G8', 'G9', 'G10', 'JHS NG'],
+    'SHS': ['G11', 'G12'],
+}
+RANKED_GENDERS = ['Male', 'Female', 'All']
+
+
+class SchoolRankings:
+    """Top (School Name, Sector) groups per (region, grade group, gender) for one year."""
+
+    def __init__(self, tensor, ranked, depth):
+        self.tensor = tensor
+        self._ranked = ranked  # (region or None, grade group, gender) -> (groups, totals)
+        self.depth = depth
+
+    def _grade_group(self, grades):
+        if not grades:
+            return 'All'
+        selected = {grade for grade in grades if grade in self.tensor.levels}
+        for name, levels in GRADE_GROUPS.items():
+            if levels and selected == {grade for grade in levels if grade in self.tensor.levels}:
+                return name
+        return None
+
+    def top(self, n, regions=None, grades=None, gender='All'):
+        """Top `n` schools as from Selection.top_schools, or None if this selection was not precomputed."""
+        if n > self.depth or (regions and len(regions) > 1):
+            return None
+        group = self._grade_group(grades)
+        if group is None:
+            return None
+        key = (regions[0] if regions else None, group, gender if gender in RANKED_GENDERS else 'All')
+        if key not in self._ranked:
+            if key[0] is not None and key[0] not in self.tensor.categories['Region']:
+                return self.tensor.top_frame(np.array([], dtype=np.int64), [])
+            return None
+        groups, totals = self._ranked[key]
+        return self.tensor.top_frame(groups[:n], totals[:n])
+
+
+def build_school_rankings(tensor, depth=RANKING_DEPTH):
+    groups = tensor.name_sector_codes
+    named = groups >= 0
+    n_groups = len(tensor.name_sector_labels)
+    regions = tensor.categories['Region']
+
+    # (region, group) pairs for named schools, sorted once and reused for every selection
+    region_codes = tensor.codes['Region'][named]
+    pair_keys = region_codes.astype(np.int64) * n_groups + groups[named]
+    order = np.argsort(pair_keys, kind='stable')
+    unique_pairs, pair_starts = np.unique(pair_keys[order], return_index=True)
+    pair_regions, pair_groups = np.divmod(unique_pairs, n_groups)
+    region_bounds = np.searchsorted(pair_regions, np.arange(len(regions) + 1))
+
+    ranked = {}
+    for group_name, grades in GRADE_GROUPS.items():
+        if grades is not None and not any(grade in tensor.levels for grade in grades):
+            continue
+        for gender in RANKED_GENDERS:
+            totals = tensor.school_totals(grades, gender)[named]
+
+            sums = np.bincount(groups[named], weights=totals, minlength=n_groups)
+            present = np.flatnonzero(np.bincount(groups[named], minlength=n_groups))
+            top = top_n_order(sums, present, depth)
+            ranked[(None, group_name, gender)] = (top, sums[top].astype(np.int64))
+
+            if not len(unique_pairs):
+                continue
+            pair_sums = np.add.reduceat(totals[order], pair_starts)
+            for r, region in enumerate(regions):
+                start, end = region_bounds[r], region_bounds[r + 1]
+                if start == end:
+                    continue
+                segment = np.arange(start, end)
+                # Rank pair positions; ties fall back to group order, as pair order is group order
+                top = top_n_order(pair_sums, segment, depth)
+                ranked[(region, group_name, gender)] = (pair_groups[top], pair_sums[top].astype(np.int64))
+    return SchoolRankings(tensor, ranked, depth)
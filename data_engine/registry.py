@@ -0,0 +1,93 @@
+# data_engine/registry.py
+# In-memory index over schools.csv for the Manage Data form.
+#
+# The cascading dropdowns (region -> division -> school) and the auto-filled
+# school fields are answered from dicts built once per version of the file.
+# Yearly frames attach school metadata by row position (see join_positions
+# and take) instead of merging with the file on every load.
+import numpy as np
+import pandas as pd
+
+from .schema import CATEGORY_COLUMNS
+
+
+class SchoolRegistry:
+    """schools.csv as a region -> division -> school tree plus name/ID lookups.
+
+    `frame` is the parsed file itself; it is shared by every caller and must
+    not be modified in place.
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+
+        self._divisions = {}
+        for region, divisions in frame.dropna(subset=['Region', 'Division']).groupby('Region')['Division']:
+            self._divisions[region] = sorted(divisions.unique())
+
+        self._schools = {}
+        for division, names in frame.dropna(subset=['Division', 'School Name']).groupby('Division')['School Name']:
+            self._schools[division] = sorted(names.unique())
+
+        # First row wins, as with a positional lookup on the frame
+        records = frame.to_dict('records')
+        self._by_name = {}
+        self._by_id = {}
+        for record in records:
+            self._by_name.setdefault(record['School Name'], record)
+            self._by_id.setdefault(str(record['BEIS School ID']), record)
+
+        # ID -> position of its first row, for positional joins
+        ids = frame['BEIS School ID']
+        first = ~ids.duplicated().to_numpy()
+        self._id_index = pd.Index(ids[first])
+        self._id_positions = np.flatnonzero(first)
+
+        # Metadata held once: categorical columns as codes over shared categories
+        self._columns = {}
+        for col in frame.columns.drop('BEIS School ID'):
+            if col in CATEGORY_COLUMNS:
+                values = frame[col].astype('category')
+                self._columns[col] = (values.cat.codes.to_numpy(), values.cat.categories)
+            else:
+                self._columns[col] = (frame[col].reset_index(drop=True), None)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def join_positions(self, school_ids):
+        """Registry row for each BEIS School ID (-1 where the school is not registered)."""
+        indexer = self._id_index.get_indexer(school_ids)
+        return np.where(indexer >= 0, self._id_positions[indexer], -1).astype(np.int32)
+
+    def take(self, positions, columns=None):
+        """School metadata columns for `positions` from join_positions, NaN where -1."""
+        positions = np.asarray(positions)
+        missing = positions < 0
+        safe = np.where(missing, 0, positions)
+        taken = {}
+        for col in columns or self._columns:
+            values, categories = self._columns[col]
+            if categories is not None:
+                codes = np.where(missing, -1, values[safe])
+                taken[col] = pd.Categorical.from_codes(codes, categories=categories)
+            else:
+                column = values.take(safe).reset_index(drop=True)
+                taken[col] = column.where(~missing) if missing.any() else column
+        return taken
+
+    def divisions(self, region):
+        """Sorted division names in `region`."""
+        return self._divisions.get(region, [])
+
+    def schools(self, division):
+        """Sorted school names in `division`."""
+        return self._schools.get(division, [])
+
+    def by_name(self, school_name):
+        """schools.csv row (as a dict) for a school name; raises KeyError if unknown."""
+        return self._by_name[school_name]
+
+    def by_id(self, school_id):
+        """schools.csv row (as a dict) for a BEIS School ID; raises KeyError if unknown."""
+        return self._by_id[str(school_id)]
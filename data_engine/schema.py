@@ -0,0 +1,138 @@
+# data_engine/schema.py
+# Declared in-memory schema for the enrollment frames.
+#
+# Counts are unsigned integers with zeros where a cell was empty; which cells
+# were actually empty ("N/A" in the CSV) is kept in a separate boolean mask.
+# The "N/A" text only reappears at the export edge (to_export_frame).
+import numpy as np
+import pandas as pd
+
+MISSING_LABEL = "N/A"
+
+# Upload format of data_{year}.csv
+ENROLLMENT_COLUMNS = [
+    "School Year", "BEIS School ID", "K Male", "K Female", "G1 Male", "G1 Female",
+    "G2 Male", "G2 Female", "G3 Male", "G3 Female", "G4 Male", "G4 Female",
+    "G5 Male", "G5 Female", "G6 Male", "G6 Female", "Elem NG Male", "Elem NG Female",
+    "G7 Male", "G7 Female", "G8 Male", "G8 Female", "G9 Male", "G9 Female",
+    "G10 Male", "G10 Female", "JHS NG Male", "JHS NG Female",
+    "G11 ACAD - ABM Male", "G11 ACAD - ABM Female", "G11 ACAD - HUMSS Male", "G11 ACAD - HUMSS Female",
+    "G11 ACAD STEM Male", "G11 ACAD STEM Female", "G11 ACAD GAS Male", "G11 ACAD GAS Female",
+    "G11 ACAD PBM Male", "G11 ACAD PBM Female", "G11 TVL Male", "G11 TVL Female",
+    "G11 SPORTS Male", "G11 SPORTS Female", "G11 ARTS Male", "G11 ARTS Female",
+    "G12 ACAD - ABM Male", "G12 ACAD - ABM Female", "G12 ACAD - HUMSS Male", "G12 ACAD - HUMSS Female",
+    "G12 ACAD STEM Male", "G12 ACAD STEM Female", "G12 ACAD GAS Male", "G12 ACAD GAS Female",
+    "G12 ACAD PBM Male", "G12 ACAD PBM Female", "G12 TVL Male", "G12 TVL Female",
+    "G12 SPORTS Male", "G12 SPORTS Female", "G12 ARTS Male", "G12 ARTS Female"
+]
+
+COUNT_COLUMNS = ENROLLMENT_COLUMNS[2:]
+COUNT_DTYPE = np.uint32
+
+# Senior-high strand column codes ("G11 <code> Male") and their track labels
+SHS_TRACKS = {
+    'ACAD - ABM': 'ABM',
+    'ACAD - HUMSS': 'HUMSS',
+    'ACAD STEM': 'STEM',
+    'ACAD GAS': 'GAS',
+    'ACAD PBM': 'PBM',
+    'TVL': 'TVL',
+    'SPORTS': 'SPORTS',
+    'ARTS': 'ARTS & DESIGN',
+}
+
+# Strand columns of G11/G12; most schools enroll in few strands (or none), so
+# these may be held sparse (see apply_schema)
+SHS_STRAND_COLUMNS = [
+    f"{grade} {code} {gender}"
+    for grade in ['G11', 'G12'] for code in SHS_TRACKS for gender in ['Male', 'Female']
+]
+
+# A strand column is held sparse when at most this fraction of its cells is non-zero
+SPARSE_MAX_DENSITY = 0.25
+
+# Repeated metadata stored as pandas Categoricals
+CATEGORY_COLUMNS = [
+    'School Year', 'Region', 'Division', 'Sector', 'Modified COC', 'School Type',
+    'School Subclassification', 'Barangay'
+]
+
+
+def _count_values(series, missing=None):
+    """Return (uint32 values, missing mask) for one count column."""
+    if missing is None:
+        missing = np.zeros(len(series), dtype=bool)
+    if not pd.api.types.is_integer_dtype(series):
+        numeric = pd.to_numeric(series.mask(series == MISSING_LABEL), errors='coerce')
+        missing = missing | numeric.isna().to_numpy()
+        series = numeric.fillna(0)
+    values = np.clip(series.to_numpy(dtype=np.int64), 0, np.iinfo(COUNT_DTYPE).max)
+    return values.astype(COUNT_DTYPE), missing
+
+
+def is_sparse(values):
+    return isinstance(getattr(values, 'dtype', None), pd.SparseDtype)
+
+
+def _sparse_values(values, missing):
+    """(values, missing) as SparseArrays, or None when `values` is too dense to gain from it."""
+    if np.count_nonzero(values) > SPARSE_MAX_DENSITY * len(values):
+        return None
+    # Empty cells are usually the majority in a sparse strand column
+    mostly_missing = bool(np.count_nonzero(missing) * 2 > len(missing))
+    return (pd.arrays.SparseArray(values, fill_value=COUNT_DTYPE(0)),
+            pd.arrays.SparseArray(missing, fill_value=mostly_missing))
+
+
+def apply_schema(frame, missing=None, sparse=False):
+    """Cast a loaded frame to the declared schema.
+
+    `missing` optionally maps column -> boolean mask of empty cells already
+    known from storage. With `sparse`, strand columns that are mostly zero are
+    held as pandas SparseArrays (values and missing masks alike); sum them
+    with count_sums, as row-wise pandas reductions over sparse columns are
+    very slow. Returns (typed frame, missing-mask DataFrame over the count
+    columns present).
+    """
+    missing = missing or {}
+    columns = {}
+    masks = {}
+    for col in frame.columns:
+        if col in COUNT_COLUMNS:
+            columns[col], masks[col] = _count_values(frame[col], missing.get(col))
+            if sparse and col in SHS_STRAND_COLUMNS:
+                held = _sparse_values(columns[col], masks[col])
+                if held is not None:
+                    columns[col], masks[col] = held
+        elif col in CATEGORY_COLUMNS:
+            columns[col] = frame[col].astype('category')
+        else:
+            columns[col] = frame[col]
+    return pd.DataFrame(columns, index=frame.index), pd.DataFrame(masks, index=frame.index)
+
+
+def count_sums(frame, columns):
+    """Row sums of count `columns` as int64, reading sparse columns' non-zero cells only."""
+    sums = np.zeros(len(frame), dtype=np.int64)
+    for col in columns:
+        values = frame[col].array
+        if is_sparse(values):
+            sums[values.sp_index.indices] += values.sp_values
+        else:
+            sums += values.to_numpy(dtype=np.int64)
+    return sums
+
+
+def to_export_frame(frame, missing=None):
+    """Render count columns with the "N/A" label for empty or zero cells."""
+    export = frame.copy()
+    for col in export.columns:
+        if col not in COUNT_COLUMNS:
+            continue
+        values = pd.to_numeric(export[col].mask(export[col] == MISSING_LABEL), errors='coerce')
+        empty = values.isna() | (values == 0)
+        if missing is not None and col in missing:
+            empty |= missing[col]
+        whole = values.fillna(0).round().astype(np.int64).astype(object)
+        export[col] = whole.mask(empty, MISSING_LABEL)
+    return export
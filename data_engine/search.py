@@ -0,0 +1,125 @@
+# data_engine/search.py
+# Ranked, typo-tolerant school search over names and BEIS School IDs.
+#
+# Names are indexed by character trigrams (an inverted index from trigram to
+# school positions); IDs are kept sorted for prefix lookups. A query touches
+# only the posting lists of its own trigrams instead of scanning every name.
+import re
+from collections import defaultdict
+
+import numpy as np
+
+MIN_FUZZY_SCORE = 0.5
+
+
+def normalize(text):
+    """Lowercase with runs of non-alphanumerics collapsed to one space."""
+    return re.sub(r'[^0-9a-z]+', ' ', str(text).lower()).strip()
+
+
+def trigrams(text, pad=True):
+    """Character trigrams of `text`; padding adds word-start/end grams for indexing."""
+    if pad:
+        text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SchoolSearchIndex:
+    """Search index over (BEIS School ID, School Name) pairs, kept in their given order."""
+
+    def __init__(self, school_ids, school_names):
+        self.ids = np.asarray([str(school_id) for school_id in school_ids], dtype=object)
+        self.names = np.asarray(school_names, dtype=object)
+        self._normalized = np.array([normalize(name) for name in self.names], dtype=str)
+
+        postings = defaultdict(list)
+        for position, name in enumerate(self._normalized):
+            for gram in trigrams(name):
+                postings[gram].append(position)
+        self._postings = {gram: np.array(positions, dtype=np.int64) for gram, positions in postings.items()}
+
+        self._id_order = np.argsort(self.ids.astype(str), kind='stable')
+        self._sorted_ids = self.ids.astype(str)[self._id_order]
+        self._by_id = {}
+        for position, school_id in enumerate(self.ids):
+            self._by_id.setdefault(school_id, position)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def get(self, school_id):
+        """(id, name) for a BEIS School ID, or None."""
+        position = self._by_id.get(str(school_id))
+        return None if position is None else (self.ids[position], self.names[position])
+
+    def _id_prefix_matches(self, query):
+        start = np.searchsorted(self._sorted_ids, query, side='left')
+        end = np.searchsorted(self._sorted_ids, query + '\uffff', side='left')
+        return self._id_order[start:end]
+
+    def _name_scores(self, query):
+        """Fraction of the query's trigrams found in each name, for names sharing any.
+
+        The query is not padded, so every name containing it scores 1.
+        """
+        grams = trigrams(query, pad=False)
+        lists = [self._postings[gram] for gram in grams if gram in self._postings]
+        if not lists:
+            return np.array([], dtype=np.int64), np.array([])
+        positions, shared = np.unique(np.concatenate(lists), return_counts=True)
+        return positions, shared / len(grams)
+
+    def search(self, query, limit=20):
+        """Up to `limit` (id, name) pairs ranked by how well they match `query`.
+
+        Exact ID matches come first, then ID prefixes, then names containing
+        the query (earlier and word-start matches first), then names that
+        share most of the query's trigrams, which tolerates typos.
+        """
+        if not query or not str(query).strip():
+            return [(self.ids[i], self.names[i]) for i in range(min(limit, len(self)))]
+
+        raw = str(query).strip()
+        text = normalize(raw)
+        ranked = []
+        seen = set()
+
+        def add(positions):
+            for position in positions:
+                if len(ranked) >= limit:
+                    return
+                if position not in seen:
+                    seen.add(position)
+                    ranked.append(position)
+
+        if raw.isdigit():
+            prefixed = self._id_prefix_matches(raw)
+            add(sorted(prefixed, key=lambda i: (len(self.ids[i]) != len(raw), i)))
+            if len(ranked) < limit:
+                add(np.flatnonzero(np.char.find(self.ids.astype(str), raw) >= 0))
+
+        if text and len(ranked) < limit:
+            if len(text) < 3:
+                # Too short for trigrams to discriminate: scan names directly
+                found = np.char.find(self._normalized, text)
+                positions = np.flatnonzero(found >= 0)
+                word_start = np.char.startswith(self._normalized[positions], text) | \
+                    (np.char.find(self._normalized[positions], ' ' + text) >= 0)
+                add(positions[np.lexsort((positions, ~word_start))])
+            else:
+                positions, scores = self._name_scores(text)
+                keep = scores >= MIN_FUZZY_SCORE
+                positions, scores = positions[keep], scores[keep]
+                found = np.char.find(self._normalized[positions], text)
+                contains = found >= 0
+                # Substring matches by position, then the rest by trigram overlap
+                order = np.lexsort((positions, -scores, np.where(contains, found, 0), ~contains))
+                add(positions[order])
+
+        return [(self.ids[i], self.names[i]) for i in ranked]
+
+
+def build_school_search_index(data):
+    """Index the schools in a year's frame (rows without a name or ID are skipped)."""
+    schools = data[['BEIS School ID', 'School Name']].dropna()
+    return SchoolSearchIndex(schools['BEIS School ID'].to_numpy(), schools['School Name'].to_numpy())
@@ -0,0 +1,233 @@
+# data_engine/storage.py
+# Columnar binary storage for the yearly enrollment files.
+#
+# data_files/data_{year}.csv stays the import/export format. Next to it we keep
+# data_files/store/data_{year}.npz: one typed NumPy array per column, so a load
+# skips text parsing and the "N/A" -> number coercion entirely. Mostly-zero
+# strand columns are stored as (row positions, values) of their non-zero cells.
+import os
+
+import numpy as np
+import pandas as pd
+
+from .cache import file_signature
+from .schema import MISSING_LABEL, SHS_STRAND_COLUMNS, SPARSE_MAX_DENSITY, to_export_frame
+
+STORE_DIR = os.path.join('data_files', 'store')
+STORE_FORMAT_VERSION = 2
+
+
+def store_path_for(csv_path):
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(STORE_DIR, f"{name}.npz")
+
+
+def _integer_column(series):
+    """Return (values, missing) if `series` holds whole numbers (or "N/A"), else None."""
+    if pd.api.types.is_bool_dtype(series):
+        return None
+    if pd.api.types.is_integer_dtype(series):
+        return series.to_numpy(dtype=np.int64), np.zeros(len(series), dtype=bool)
+
+    missing = series.isna().to_numpy() | (series == MISSING_LABEL).to_numpy()
+    numeric = pd.to_numeric(series.mask(missing), errors='coerce')
+    if not np.array_equal(numeric.isna().to_numpy(), missing):
+        return None
+    values = numeric.fillna(0).to_numpy()
+    if not np.all(np.mod(values, 1) == 0):
+        return None
+    return values.astype(np.int64), missing
+
+
+def _smallest_int_dtype(values):
+    if len(values) == 0 or (values.min() >= np.iinfo(np.int32).min and values.max() <= np.iinfo(np.int32).max):
+        return np.int32
+    return np.int64
+
+
+def _encode_columns(df, missing_masks=None):
+    """Yield (column, kind, values, missing) with integer columns zero-filled.
+
+    Sparse strand columns (kind 'z') yield (positions, values) of their
+    non-zero cells instead of one value per row. `missing_masks` (as from
+    _decode_columns) marks empty cells of integer columns already zero-filled.
+    """
+    missing_masks = missing_masks or {}
+    for col in df.columns:
+        as_int = _integer_column(df[col])
+        if as_int is not None:
+            values, missing = as_int
+            if col in missing_masks:
+                missing = missing | missing_masks[col]
+            values = values.astype(_smallest_int_dtype(values))
+            nonzero = np.flatnonzero(values)
+            if col in SHS_STRAND_COLUMNS and len(nonzero) <= SPARSE_MAX_DENSITY * len(values):
+                yield str(col), 'z', (nonzero.astype(np.int32), values[nonzero]), missing
+            else:
+                yield str(col), 'i', values, missing
+        else:
+            missing = df[col].isna().to_numpy()
+            values = np.where(missing, '', df[col].astype(str).to_numpy()).astype(str)
+            yield str(col), 's', values, missing
+
+
+def _decode_columns(encoded):
+    """Build (frame, missing) from encoded columns.
+
+    Integer columns keep their zero fill and report empty cells through the
+    `missing` dict (column -> boolean mask); text columns get NaN back.
+    """
+    columns = {}
+    missing_masks = {}
+    for col, kind, values, missing in encoded:
+        if kind == 'z':
+            positions, nonzero = values
+            values = np.zeros(len(missing), dtype=nonzero.dtype)
+            values[positions] = nonzero
+            kind = 'i'
+        if kind == 'i':
+            columns[col] = values
+            if missing.any():
+                missing_masks[col] = missing
+        else:
+            columns[col] = np.where(missing, np.nan, values.astype(object)) if missing.any() else values
+    return pd.DataFrame(columns), missing_masks
+
+
+def encode_store(df, missing_masks=None):
+    """The arrays of a columnar archive for `df` (see write_store)."""
+    arrays = {'format_version': np.array(STORE_FORMAT_VERSION)}
+    columns, kinds = [], []
+    for i, (col, kind, values, missing) in enumerate(_encode_columns(df, missing_masks)):
+        columns.append(col)
+        kinds.append(kind)
+        if kind == 'z':
+            arrays[f'positions_{i}'], arrays[f'values_{i}'] = values
+        else:
+            arrays[f'values_{i}'] = values
+        if missing.any():
+            arrays[f'missing_{i}'] = np.packbits(missing)
+    arrays['columns'] = np.array(columns)
+    arrays['kinds'] = np.array(kinds)
+    arrays['n_rows'] = np.array(len(df))
+    return arrays
+
+
+def write_archive(arrays, path):
+    """Write `arrays` to an .npz file, replacing `path` in one step."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def write_store(df, path, source_signature):
+    """Write `df` as a columnar .npz archive tagged with its CSV's signature."""
+    arrays = encode_store(df)
+    arrays['source_signature'] = np.array(source_signature, dtype=np.int64)
+    write_archive(arrays, path)
+
+
+def decode_store(store, columns=None):
+    """(frame, missing) from an open columnar archive; None if it is from another format version.
+
+    With `columns`, only those columns are read from the archive (in archive
+    order; names it does not hold are skipped).
+    """
+    if int(store['format_version']) != STORE_FORMAT_VERSION:
+        return None
+    wanted = None if columns is None else set(columns)
+    n_rows = int(store['n_rows'])
+    encoded = []
+    for i, (col, kind) in enumerate(zip(store['columns'], store['kinds'])):
+        if wanted is not None and str(col) not in wanted:
+            continue
+        values = store[f'values_{i}']
+        if kind == 'z':
+            values = (store[f'positions_{i}'], values)
+        missing_key = f'missing_{i}'
+        if missing_key in store.files:
+            missing = np.unpackbits(store[missing_key], count=n_rows).astype(bool)
+        else:
+            missing = np.zeros(n_rows, dtype=bool)
+        encoded.append((str(col), str(kind), values, missing))
+    return _decode_columns(encoded)
+
+
+def read_store(path, source_signature=None, columns=None):
+    """Read a columnar archive back as (frame, missing), optionally only `columns`.
+
+    Returns None when the archive is missing, unreadable, from another format
+    version, or (if `source_signature` is given) built from a different CSV.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as store:
+            if source_signature is not None and tuple(store['source_signature']) != tuple(source_signature):
+                return None
+            return decode_store(store, columns)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def read_store_columns(path, source_signature=None):
+    """Column names held by a columnar archive, or None (as for read_store)."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as store:
+            if int(store['format_version']) != STORE_FORMAT_VERSION:
+                return None
+            if source_signature is not None and tuple(store['source_signature']) != tuple(source_signature):
+                return None
+            return [str(col) for col in store['columns']]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _rebuild_store(csv_path, path, signature):
+    df = pd.read_csv(csv_path)
+    try:
+        write_store(df, path, signature)
+    except OSError as e:
+        print(f"Could not write columnar store {path}: {e}")
+    return df
+
+
+def load_year_frame(csv_path, columns=None):
+    """Load a year's raw enrollment rows as (frame, missing), preferring the columnar store.
+
+    `columns` projects the load onto those columns; only they are read from
+    the store. A missing or stale store (the CSV was rewritten since) is
+    rebuilt from the CSV on the way through, so legacy files are converted on
+    first read.
+    """
+    signature = file_signature(csv_path)
+    path = store_path_for(csv_path)
+    loaded = read_store(path, signature, columns)
+    if loaded is None:
+        df = _rebuild_store(csv_path, path, signature)
+        if columns is not None:
+            wanted = set(columns)
+            df = df[[col for col in df.columns if col in wanted]]
+        loaded = _decode_columns(_encode_columns(df))
+    return loaded
+
+
+def year_frame_columns(csv_path):
+    """Column names of a year's raw rows, without loading the rows themselves."""
+    signature = file_signature(csv_path)
+    path = store_path_for(csv_path)
+    columns = read_store_columns(path, signature)
+    if columns is None:
+        columns = [str(col) for col in _rebuild_store(csv_path, path, signature).columns]
+    return columns
+
+
+def save_year_frame(df, csv_path):
+    """Write a year's rows to its CSV (with "N/A" for empty cells) and refresh the store."""
+    df = to_export_frame(df)
+    df.to_csv(csv_path, index=False, na_rep=MISSING_LABEL)
+    write_store(df, store_path_for(csv_path), file_signature(csv_path))
@@ -0,0 +1,89 @@
+# data_engine/tags.py
+# School classification tags computed once per year at ingest.
+#
+# Tags are boolean masks over a year's rows (SPED centers, schools offering
+# non-graded classes, ...). They are stored bit-packed next to the columnar
+# store (data_files/store/data_{year}.tags.npz), tagged with the signatures of
+# the year's CSV and schools.csv, so charts filter with a mask instead of
+# re-running string matching on every callback.
+import os
+
+import numpy as np
+
+from .storage import STORE_DIR, write_archive
+
+TAGS_FORMAT_VERSION = 1
+
+
+def _sped_center(data, columns):
+    return data['School Name'].str.contains('sped center', case=False, na=False).to_numpy(dtype=bool)
+
+
+def _non_graded(data, columns):
+    ng_columns = columns.columns(['Elem NG', 'JHS NG'])
+    if not ng_columns:
+        return np.zeros(len(data), dtype=bool)
+    return (data[ng_columns].to_numpy() > 0).any(axis=1)
+
+
+# Tag name -> function(data, GradeColumns) returning a boolean mask over rows
+TAGGERS = {
+    'sped_center': _sped_center,
+    'non_graded': _non_graded,
+}
+
+
+def tags_path_for(csv_path):
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(STORE_DIR, f"{name}.tags.npz")
+
+
+def build_tags(data, columns):
+    return {name: tagger(data, columns) for name, tagger in TAGGERS.items()}
+
+
+def write_tags(tags, path, source_signature):
+    arrays = {
+        'format_version': np.array(TAGS_FORMAT_VERSION),
+        'source_signature': np.array(source_signature, dtype=np.int64),
+        'names': np.array(list(tags), dtype=str),
+        'n_rows': np.array(len(next(iter(tags.values()), []))),
+    }
+    for i, mask in enumerate(tags.values()):
+        arrays[f'tag_{i}'] = np.packbits(mask)
+    write_archive(arrays, path)
+
+
+def read_tags(path, source_signature):
+    """Tag masks by name, or None when the file is missing, unreadable, stale or lacks a tag."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as store:
+            if int(store['format_version']) != TAGS_FORMAT_VERSION:
+                return None
+            if tuple(store['source_signature']) != tuple(source_signature):
+                return None
+            n_rows = int(store['n_rows'])
+            tags = {
+                str(name): np.unpackbits(store[f'tag_{i}'], count=n_rows).astype(bool)
+                for i, name in enumerate(store['names'])
+            }
+    except (OSError, ValueError, KeyError):
+        return None
+    return tags if set(tags) == set(TAGGERS) else None
+
+
+def top_per_region(schools, n):
+    """The `n` highest (Region, School Name) totals per region.
+
+    `schools` has Region, School Name and Total_Enrollment. Rows sharing a
+    region and school name are summed first; ties keep school name order.
+    Adds Rank (1 = top).
+    """
+    schools = schools.dropna(subset=['Region', 'School Name'])
+    grouped = schools.groupby(['Region', 'School Name'], as_index=False, observed=True)['Total_Enrollment'].sum()
+    grouped = grouped.sort_values(['Region', 'Total_Enrollment', 'School Name'],
+                                  ascending=[True, False, True], kind='stable')
+    grouped['Rank'] = grouped.groupby('Region', observed=True).cumcount() + 1
+    return grouped[grouped['Rank'] <= n].reset_index(drop=True)
@@ -0,0 +1,156 @@
+# data_engine/tensor.py
+# Dense NumPy representation of a school year for filter-and-aggregate queries.
+#
+# counts[school, grade level, gender] holds the year's enrollment as int32
+# (G11/G12 summed over their strands). Schools are stored sorted by region, and
+# region, division, sector and COC are carried as integer codes (-1 = missing),
+# so every dashboard query is a mask plus np.bincount / np.add.reduceat.
+import numpy as np
+import pandas as pd
+
+from .columns import GENDERS, grade_columns_for
+from .schema import count_sums
+
+CODED_DIMENSIONS = ['Region', 'Division', 'Sector', 'Modified COC']
+
+
+def top_n_order(sums, candidates, n):
+    """The `n` entries of `candidates` with the highest `sums`, highest first.
+
+    Ties are broken by candidate value (lowest first), including at the
+    cut-off, so the result does not depend on partition order.
+    """
+    n = min(n, len(candidates))
+    if n == 0:
+        return candidates[:0]
+    values = sums[candidates]
+    cutoff = values[np.argpartition(-values, n - 1)[n - 1]]
+    above = candidates[values > cutoff]
+    at_cutoff = np.sort(candidates[values == cutoff])[:n - len(above)]
+    chosen = np.concatenate([above, at_cutoff])
+    return chosen[np.lexsort((chosen, -sums[chosen]))]
+
+
+def gender_positions(gender):
+    """Gender axis positions for a gender filter value ('Male', 'Female' or 'All')."""
+    return [GENDERS.index(gender)] if gender in GENDERS else [0, 1]
+
+
+class Selection:
+    """Schools matching a region filter, with their totals over the selected grades and gender."""
+
+    def __init__(self, tensor, mask, totals):
+        self.tensor = tensor
+        self.mask = mask
+        self.totals = totals
+
+    def sum_by(self, dim):
+        """Selected totals per `dim` category, for categories with at least one selected school."""
+        codes = self.tensor.codes[dim]
+        keep = self.mask & (codes >= 0)
+        sums = np.bincount(codes[keep], weights=self.totals[keep], minlength=len(self.tensor.categories[dim]))
+        present = np.bincount(codes[keep], minlength=len(self.tensor.categories[dim])) > 0
+        return pd.Series(sums[present].astype(np.int64), index=self.tensor.categories[dim][present])
+
+    def top_schools(self, n):
+        """The `n` (School Name, Sector) groups with the highest selected totals."""
+        groups = self.tensor.name_sector_codes
+        keep = self.mask & (groups >= 0)
+        n_groups = len(self.tensor.name_sector_labels)
+        sums = np.bincount(groups[keep], weights=self.totals[keep], minlength=n_groups)
+        present = np.flatnonzero(np.bincount(groups[keep], minlength=n_groups))
+        # Highest total first; ties keep (School Name, Sector) order
+        order = top_n_order(sums, present, n)
+        return self.tensor.top_frame(order, sums[order])
+
+
+class EnrollmentTensor:
+    def __init__(self, counts, levels, codes, categories, region_starts, name_sector_codes, name_sector_labels):
+        self.counts = counts
+        self.levels = levels
+        self.codes = codes
+        self.categories = categories
+        self.region_starts = region_starts
+        self.name_sector_codes = name_sector_codes
+        self.name_sector_labels = name_sector_labels
+
+    def __len__(self):
+        return self.counts.shape[0]
+
+    def top_frame(self, groups, totals):
+        """School Name, Sector and 'Filtered Enrollment' rows for ranked (School Name, Sector) groups."""
+        top = self.name_sector_labels.iloc[groups].reset_index(drop=True)
+        return top.assign(**{'Filtered Enrollment': np.asarray(totals).astype(np.int64)})
+
+    def level_positions(self, grades=None):
+        """Grade-level axis positions for the selected grades (every level when empty)."""
+        if not grades:
+            return list(range(len(self.levels)))
+        return [self.levels.index(grade) for grade in grades if grade in self.levels]
+
+    def selected_cells(self, grades=None, gender='All'):
+        """Flat (level * 2 + gender) positions covered by a grade/gender selection."""
+        return [level * len(GENDERS) + g for g in gender_positions(gender) for level in self.level_positions(grades)]
+
+    def region_mask(self, regions=None):
+        if not regions:
+            return np.ones(len(self), dtype=bool)
+        wanted = self.categories['Region'].get_indexer(list(regions))
+        return np.isin(self.codes['Region'], wanted[wanted >= 0])
+
+    def school_totals(self, grades=None, gender='All'):
+        flat = self.counts.reshape(len(self), -1)
+        return flat[:, self.selected_cells(grades, gender)].sum(axis=1, dtype=np.int64)
+
+    def select(self, regions=None, grades=None, gender='All'):
+        """The one call behind the dashboard filters: region mask plus per-school selected totals."""
+        return Selection(self, self.region_mask(regions), self.school_totals(grades, gender))
+
+    def region_totals(self, grades=None, gender='All'):
+        """Selected totals per region code, using the region-sorted row layout."""
+        # Rows without a region sort after every region; keep them out of the last region's block
+        coded = np.count_nonzero(self.codes['Region'] >= 0)
+        totals = self.school_totals(grades, gender)[:coded]
+        sums = np.zeros(len(self.categories['Region']), dtype=np.int64)
+        starts = self.region_starts
+        present = np.flatnonzero(np.diff(np.append(starts, coded)) > 0)
+        if len(present):
+            sums[present] = np.add.reduceat(totals, starts[present])
+        return pd.Series(sums, index=self.categories['Region'])
+
+
+def build_enrollment_tensor(data, resolver=None):
+    resolver = resolver or grade_columns_for(data.columns)
+    levels = resolver.levels
+
+    codes, categories = {}, {}
+    for dim in CODED_DIMENSIONS:
+        column = data[dim].astype('category')
+        codes[dim] = column.cat.codes.to_numpy(dtype=np.int32)
+        categories[dim] = column.cat.categories
+
+    # Sort schools by region so each region is one contiguous block (missing region last)
+    region_key = np.where(codes['Region'] < 0, len(categories['Region']), codes['Region'])
+    order = np.argsort(region_key, kind='stable')
+    codes = {dim: code[order] for dim, code in codes.items()}
+    region_starts = np.searchsorted(region_key[order], np.arange(len(categories['Region'])))
+
+    counts = np.zeros((len(data), len(levels), len(GENDERS)), dtype=np.int32)
+    for i, grade in enumerate(levels):
+        for j, gender in enumerate(GENDERS):
+            columns = resolver.columns([grade], gender)
+            if columns:
+                counts[:, i, j] = count_sums(data, columns)[order]
+    counts.flags.writeable = False
+
+    # (School Name, Sector) groups for the top-schools ranking; -1 where either is missing
+    names = data['School Name'].to_numpy(dtype=object)[order]
+    sectors = data['Sector'].to_numpy(dtype=object)[order]
+    named = ~(pd.isna(names) | pd.isna(sectors))
+    name_sector_codes = np.full(len(data), -1, dtype=np.int64)
+    name_sector = pd.MultiIndex.from_arrays([names[named], sectors[named]], names=['School Name', 'Sector'])
+    name_sector_codes[named], labels = pd.factorize(name_sector, sort=True)
+    name_sector_labels = labels.to_frame(index=False, name=['School Name', 'Sector'])
+
+    return EnrollmentTensor(counts, levels, codes, categories, region_starts,
+                            name_sector_codes, name_sector_labels)
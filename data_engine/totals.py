@@ -0,0 +1,136 @@
+# data_engine/totals.py
+# Persistent per-year totals by division x grade level x gender, and per school.
+#
+# The trend chart needs one number per school year, and the school modal one
+# pair of totals per year. Rather than loading and merging every year for
+# that, each year keeps a small index next to its columnar store
+# (data_files/store/data_{year}.totals.npz), tagged with the signatures of the
+# files it was computed from.
+import os
+
+import numpy as np
+import pandas as pd
+
+from .columns import GENDERS
+from .storage import STORE_DIR, write_archive
+from .tensor import gender_positions
+
+TOTALS_FORMAT_VERSION = 3
+
+
+def totals_path_for(csv_path):
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(STORE_DIR, f"{name}.totals.npz")
+
+
+class TotalsIndex:
+    """Enrollment per division, grade level and gender for one school year.
+
+    counts[i] holds divisions[i] of regions[i]. Schools without a region or
+    division are kept under '' so they still count towards unfiltered totals.
+    `school_ids` (sorted) and `school_counts` (male, female) hold each
+    school's totals. `source_signature` identifies the files the index was
+    computed from.
+    """
+
+    def __init__(self, regions, divisions, levels, counts, school_ids, school_counts, source_signature=()):
+        self.regions = np.asarray(regions, dtype=str)
+        self.divisions = np.asarray(divisions, dtype=str)
+        self.levels = list(levels)
+        self.counts = counts
+        self.school_ids = school_ids
+        self.school_counts = school_counts
+        self.source_signature = tuple(int(v) for v in source_signature)
+
+    def school_totals(self, school_id):
+        """(male, female) totals for a BEIS School ID, or None if the school has no rows this year."""
+        try:
+            school_id = int(school_id)
+        except (TypeError, ValueError):
+            return None
+        offset = np.searchsorted(self.school_ids, school_id)
+        if offset == len(self.school_ids) or self.school_ids[offset] != school_id:
+            return None
+        male, female = self.school_counts[offset]
+        return int(male), int(female)
+
+    def row_mask(self, regions=None):
+        if not regions:
+            return np.ones(len(self.regions), dtype=bool)
+        return np.isin(self.regions, list(regions))
+
+    def level_positions(self, grades=None):
+        if not grades:
+            return list(range(len(self.levels)))
+        grades = [grade.split('_')[0] for grade in grades]
+        return [self.levels.index(grade) for grade in grades if grade in self.levels]
+
+    def level_totals(self, grades=None, gender='All'):
+        """Per-row totals over the selected grades and gender."""
+        selected = self.counts[:, self.level_positions(grades)][:, :, gender_positions(gender)]
+        return selected.sum(axis=(1, 2))
+
+    def total(self, regions=None, grades=None, gender='All'):
+        return int(self.level_totals(grades, gender)[self.row_mask(regions)].sum())
+
+
+def _school_totals(data):
+    """Sorted numeric BEIS School IDs with summed (male, female) totals."""
+    ids = pd.to_numeric(data['BEIS School ID'], errors='coerce').to_numpy(dtype=float)
+    valid = ~np.isnan(ids)
+    school_ids, rows = np.unique(ids[valid].astype(np.int64), return_inverse=True)
+    school_counts = np.zeros((len(school_ids), len(GENDERS)), dtype=np.int64)
+    for g, gender in enumerate(GENDERS):
+        totals = data[f'Total {gender}'].to_numpy(dtype=np.int64)[valid]
+        school_counts[:, g] = np.bincount(rows, weights=totals, minlength=len(school_ids))
+    return school_ids, school_counts
+
+
+def build_totals_index(tensor, data, source_signature=()):
+    """Sum a year's EnrollmentTensor per (region, division) and its frame per school."""
+    names = {}
+    for dim in ('Region', 'Division'):
+        categories = np.append(tensor.categories[dim].astype(str).to_numpy(), '')
+        names[dim] = categories, np.where(tensor.codes[dim] < 0, len(categories) - 1, tensor.codes[dim])
+    n_divisions = len(names['Division'][0])
+    key = names['Region'][1].astype(np.int64) * n_divisions + names['Division'][1]
+
+    order = np.argsort(key, kind='stable')
+    present, starts = np.unique(key[order], return_index=True)
+    if len(tensor):
+        counts = np.add.reduceat(tensor.counts[order], starts, axis=0, dtype=np.int64)
+    else:
+        counts = np.zeros((0, len(tensor.levels), len(GENDERS)), dtype=np.int64)
+    region_codes, division_codes = np.divmod(present, n_divisions)
+    return TotalsIndex(names['Region'][0][region_codes], names['Division'][0][division_codes],
+                       tensor.levels, counts, *_school_totals(data), source_signature)
+
+
+def write_totals_index(index, path):
+    write_archive({
+        'format_version': np.array(TOTALS_FORMAT_VERSION),
+        'source_signature': np.array(index.source_signature, dtype=np.int64),
+        'regions': index.regions,
+        'divisions': index.divisions,
+        'levels': np.array(index.levels, dtype=str),
+        'counts': index.counts,
+        'school_ids': index.school_ids,
+        'school_counts': index.school_counts,
+    }, path)
+
+
+def read_totals_index(path, source_signature):
+    """Read a totals index, or None when it is missing, unreadable or stale."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as store:
+            if int(store['format_version']) != TOTALS_FORMAT_VERSION:
+                return None
+            if tuple(store['source_signature']) != tuple(source_signature):
+                return None
+            return TotalsIndex(store['regions'], store['divisions'], store['levels'].tolist(),
+                               store['counts'], store['school_ids'], store['school_counts'],
+                               source_signature)
+    except (OSError, ValueError, KeyError):
+        return None
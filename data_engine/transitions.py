@@ -0,0 +1,110 @@
+# data_engine/transitions.py
+# Transition rates between successive school years, from the totals indexes.
+#
+# The elementary -> JHS rate for year N is G7 enrollment in N over G6
+# enrollment in N-1 (JHS -> SHS likewise uses G10 and G11). Rates are
+# computed for every division and every year whose previous year exists in
+# one pass, so any region/division breakdown is a lookup.
+import numpy as np
+import pandas as pd
+
+from .columns import GENDERS
+from .tensor import gender_positions
+
+TRANSITIONS = {
+    'elem_jhs': ('G6', 'G7'),
+    'jhs_shs': ('G10', 'G11'),
+}
+TRANSITION_LEVELS = ['G6', 'G7', 'G10', 'G11']
+
+
+def previous_school_year(school_year):
+    start, end = school_year.split('-')
+    return f"{int(start) - 1}-{int(end) - 1}"
+
+
+class TransitionRates:
+    """Numerators and denominators of each transition per division and year.
+
+    `numerators[p, k, t, g]` is the entry-grade enrollment in years[p] for
+    division k, transition t and gender g; `denominators` holds the exit
+    grade in the previous year. `in_previous[p, k]` tells whether division k
+    had schools in that previous year.
+    """
+
+    def __init__(self, years, regions, divisions, numerators, denominators, in_previous):
+        self.years = list(years)
+        self.regions = regions
+        self.divisions = divisions
+        self.numerators = numerators
+        self.denominators = denominators
+        self.in_previous = in_previous
+
+    def _select(self, school_year, transition, regions=None, gender='All'):
+        p = self.years.index(school_year)
+        t = list(TRANSITIONS).index(transition)
+        genders = gender_positions(gender)
+        rows = np.isin(self.regions, list(regions)) if regions else np.ones(len(self.regions), dtype=bool)
+        numerators = self.numerators[p, :, t][:, genders].sum(axis=1)
+        denominators = self.denominators[p, :, t][:, genders].sum(axis=1)
+        return rows, numerators, denominators
+
+    def rate(self, school_year, transition, regions=None, gender='All'):
+        """Transition rate in percent for the selected regions, or None without a previous year."""
+        if school_year not in self.years:
+            return None
+        rows, numerators, denominators = self._select(school_year, transition, regions, gender)
+        if not self.in_previous[self.years.index(school_year)][rows].any():
+            return None
+        denominator = denominators[rows].sum()
+        return numerators[rows].sum() / denominator * 100 if denominator else 0
+
+    def breakdown(self, school_year, transition, regions=None, gender='All', by=('Region', 'Division')):
+        """Transition rate per region or division (`by`) for one school year."""
+        columns = ['Entering', 'Previous', 'Rate']
+        if school_year not in self.years:
+            return pd.DataFrame(columns=list(by) + columns)
+        rows, numerators, denominators = self._select(school_year, transition, regions, gender)
+        frame = pd.DataFrame({
+            'Region': self.regions[rows],
+            'Division': self.divisions[rows],
+            'Entering': numerators[rows],
+            'Previous': denominators[rows],
+        })
+        frame = frame.groupby(list(by), as_index=False)[['Entering', 'Previous']].sum()
+        frame['Rate'] = (frame['Entering'] / frame['Previous'].where(frame['Previous'] > 0) * 100).fillna(0)
+        return frame
+
+
+def build_transition_rates(indexes):
+    """TransitionRates for every year in `indexes` (school year -> TotalsIndex) with a predecessor."""
+    years = sorted(indexes)
+    pairs = [(previous_school_year(year), year) for year in years if previous_school_year(year) in indexes]
+
+    # Align every year's divisions on one shared key list
+    keys = pd.MultiIndex.from_arrays([
+        np.concatenate([indexes[year].regions for year in years] or [np.array([], dtype=str)]),
+        np.concatenate([indexes[year].divisions for year in years] or [np.array([], dtype=str)]),
+    ]).unique()
+    grid = np.zeros((len(years), len(keys), len(TRANSITION_LEVELS), len(GENDERS)), dtype=np.int64)
+    present = np.zeros((len(years), len(keys)), dtype=bool)
+    for y, year in enumerate(years):
+        index = indexes[year]
+        rows = keys.get_indexer(pd.MultiIndex.from_arrays([index.regions, index.divisions]))
+        present[y, rows] = True
+        for i, level in enumerate(TRANSITION_LEVELS):
+            if level in index.levels:
+                grid[y, rows, i] = index.counts[:, index.levels.index(level)]
+
+    previous = [years.index(prev) for prev, _ in pairs]
+    current = [years.index(year) for _, year in pairs]
+    exits = [TRANSITION_LEVELS.index(exit_grade) for exit_grade, _ in TRANSITIONS.values()]
+    entries = [TRANSITION_LEVELS.index(entry_grade) for _, entry_grade in TRANSITIONS.values()]
+    return TransitionRates(
+        [year for _, year in pairs],
+        keys.get_level_values(0).to_numpy(dtype=str),
+        keys.get_level_values(1).to_numpy(dtype=str),
+        grid[current][:, :, entries],
+        grid[previous][:, :, exits],
+        present[previous],
+    )
@@ -0,0 +1,103 @@
+# data_engine/view.py
+# One dashboard filter state (school year, regions, grades, gender).
+#
+# Every chart on the dashboard redraws from the same four filters, so the
+# region mask and the selected-grades totals are computed once per filter
+# state and shared by all chart callbacks instead of once per chart.
+import threading
+
+from .columns import GENDERS
+from .dataset import snapshot_view
+from .schema import count_sums
+from .tags import top_per_region
+
+TOTAL_COLUMN = 'Selected Grades Total'
+
+
+def filter_key(regions=None, grades=None, gender='All'):
+    """Hashable form of a filter state; empty selections mean "all"."""
+    return tuple(regions or ()), tuple(grades or ()), gender if gender in GENDERS else 'All'
+
+
+class FilterView:
+    """A school year seen through one filter state.
+
+    Parts are computed on first use and then shared by every callback that
+    asks for the same state; frames are handed out as copy-on-write views of
+    the shared part. The view holds nothing but its parts: `sources` returns
+    the year's dataset and what was derived from it (tensor, cube, tags,
+    rankings) by name, and is called whenever they are needed, so a cached
+    view never keeps a dataset alive after the year cache has dropped it.
+    """
+
+    def __init__(self, sources, regions=None, grades=None, gender='All'):
+        self._sources = sources
+        self.regions, self.grades, self.gender = filter_key(regions, grades, gender)
+        self._parts = {}
+        self._lock = threading.RLock()
+
+    def _part(self, name, builder):
+        with self._lock:
+            if name not in self._parts:
+                self._parts[name] = builder()
+            return snapshot_view(self._parts[name])
+
+    @property
+    def dataset(self):
+        return self._sources()['dataset']
+
+    @property
+    def tensor(self):
+        return self._sources()['tensor']
+
+    @property
+    def cube(self):
+        return self._sources()['cube']
+
+    @property
+    def tags(self):
+        return self._sources()['tags']
+
+    @property
+    def rankings(self):
+        return self._sources()['rankings']
+
+    @property
+    def cells(self):
+        """Cube cells in the selected regions with the selection totalled as TOTAL_COLUMN."""
+        return self._part('cells', lambda: self.cube.scope(
+            self.regions, self.grades, self.gender, total_name=TOTAL_COLUMN))
+
+    @property
+    def selection(self):
+        """Per-school region mask and selected totals (see EnrollmentTensor.select).
+
+        Not kept as a part, as it refers to the tensor.
+        """
+        return self.tensor.select(self.regions, self.grades, self.gender)
+
+    def school_counts(self, by):
+        """Schools with enrollment in the selection, per `by` group (see EnrollmentCube.school_counts)."""
+        return self._part(('school_counts', tuple(by)), lambda: self.cube.school_counts(
+            list(by), self.regions, self.grades, self.gender))
+
+    def top_schools(self, n):
+        """Top `n` (School Name, Sector) groups: a precomputed ranking when one covers this state."""
+        def build():
+            top = self.rankings.top(n, self.regions, self.grades, self.gender)
+            return top if top is not None else self.selection.top_schools(n)
+        return self._part(('top_schools', n), build)
+
+    def top_tagged_per_region(self, tag, n):
+        """Top `n` schools per region among rows carrying `tag`, by selected total."""
+        def build():
+            sources = self._sources()
+            data = sources['dataset'].data
+            mask = sources['tags'][tag]
+            if self.regions:
+                mask = mask & data['Region'].isin(self.regions).to_numpy()
+            tagged = data.loc[mask, ['Region', 'School Name']]
+            columns = sources['dataset'].columns.columns(self.grades, self.gender)
+            tagged = tagged.assign(Total_Enrollment=count_sums(data, columns)[mask])
+            return top_per_region(tagged, n)
+        return self._part(('top_tagged_per_region', tag, n), build)
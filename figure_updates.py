@@ -0,0 +1,58 @@
+# figure_updates.py
+# Incremental figure updates for the dashboard charts.
+#
+# A chart's static part (layout, template, titles, trace styling) is built once
+# as a base figure. The first time a graph is drawn it gets that base with the
+# filter-dependent parts filled in; after that, filter changes send a
+# dash.Patch that replaces only those parts. Each graph has a "<id>-drawn"
+# store rendered next to it (so it resets whenever the page is re-rendered)
+# telling the callback which of the two to send.
+#
+# Charts with one trace per data group (sector, grade level, rank) keep a
+# styled template per group instead, and replace the whole trace list with
+# filled-in copies of the templates of the groups present.
+import copy
+
+from dash import Patch, dcc
+
+
+def drawn_store(graph_id):
+    """The store next to a graph recording that its base figure has been sent."""
+    return dcc.Store(id=f"{graph_id}-drawn")
+
+
+def base_figure(fig):
+    """A figure's plain-dict form, template included, to be filled in by figure_update."""
+    return fig.to_dict()
+
+
+def trace_templates(fig, groups):
+    """Plain-dict traces of `fig` by name, for the names in `groups`, to be filled in by group_traces."""
+    traces = {trace['name']: trace for trace in fig.to_dict()['data']}
+    return {name: traces[name] for name in groups}
+
+
+def group_traces(templates, filled):
+    """Copies of the templates for each (name, arrays) in `filled`, in that order, with `arrays` set."""
+    traces = []
+    for name, arrays in filled:
+        trace = copy.deepcopy(templates[name])
+        trace.update(arrays)
+        traces.append(trace)
+    return traces
+
+
+def figure_update(base, updates, drawn):
+    """`base` with `updates` applied, or only the updates as a Patch once the graph is drawn.
+
+    `updates` maps a path into the figure, such as ('data', 1, 'z'),
+    ('layout', 'coloraxis', 'cmin') or ('data',) for the whole trace list, to
+    its new value. Every path must already exist in `base` up to its last key.
+    """
+    target = Patch() if drawn else copy.deepcopy(base)
+    for path, value in updates.items():
+        node = target
+        for key in path[:-1]:
+            node = node[key]
+        node[path[-1]] = value
+    return target
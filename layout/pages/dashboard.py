@@ -3,6 +3,7 @@ import dash_bootstrap_components as dbc
 from dash import html
 import datetime
 from app_data import get_available_school_years
+from figure_updates import drawn_store
 available_years=get_available_school_years()
 app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
 dcc.Store(id="stored_school_years", data=get_available_school_years())  # Store available years
@@ -26,7 +27,7 @@ def get_greeting():
         html.P(f" Good {time_of_day}, Admin! Stay updated with the latest data and trends.", style={'color': '#0a4485'}),
     ])
 
-def dashboard_content(data, grade_options, region_options):
+def dashboard_content(grade_options, region_options):
     no_border_style = {
         "border": "none",
         "boxShadow": "0 4px 6px rgba(0, 0, 0, 0.1)",
@@ -136,7 +137,8 @@ def dashboard_content(data, grade_options, region_options):
                 dbc.Col(
                     dbc.Card([
                         dbc.CardBody([
-                            dcc.Loading(dcc.Graph(id='enrollment_choropleth_map', config={'displayModeBar': False}, style={'height': '100%'}))
+                            dcc.Loading(dcc.Graph(id='enrollment_choropleth_map', config={'displayModeBar': False}, style={'height': '100%'})),
+                            drawn_store('enrollment_choropleth_map')
                         ])
                     ], style={**no_border_style, "height": "600px"}),
                     width=8, className="mb-4"
@@ -146,7 +148,8 @@ def dashboard_content(data, grade_options, region_options):
                     dcc.Loading(html.Div(id='most_enrolled_division_card', className='mb-4')),
                     dbc.Card([
                         dbc.CardBody([
-                            dcc.Loading(dcc.Graph(id='gender_pie_chart', config={'displayModeBar': False}, style={'height': '100%'}))
+                            dcc.Loading(dcc.Graph(id='gender_pie_chart', config={'displayModeBar': False}, style={'height': '100%'})),
+                            drawn_store('gender_pie_chart')
                         ])
                     ], style={**no_border_style, "height": "400px"})
                 ], width=4, className="mb-4")
@@ -156,7 +159,8 @@ def dashboard_content(data, grade_options, region_options):
                 dbc.Col(
                     dbc.Card([
                         dbc.CardBody([
-                            dcc.Loading(dcc.Graph(id='enrollment_vs_schools_chart', config={'displayModeBar': False}, style={'height': '100%'}))
+                            dcc.Loading(dcc.Graph(id='enrollment_vs_schools_chart', config={'displayModeBar': False}, style={'height': '100%'})),
+                            drawn_store('enrollment_vs_schools_chart')
                         ])
                     ], style=no_border_style),
                     width=12, className="mb-4"
@@ -167,7 +171,8 @@ def dashboard_content(data, grade_options, region_options):
                 dbc.Col(
                     dbc.Card([
                         dbc.CardBody([
-                            dcc.Loading(dcc.Graph(id='top_schools_chart', config={'displayModeBar': False}, style={'height': '100%'}))
+                            dcc.Loading(dcc.Graph(id='top_schools_chart', config={'displayModeBar': False}, style={'height': '100%'})),
+                            drawn_store('top_schools_chart')
                         ])
                     ], style={**no_border_style, "height": "400px"}),
                     width=6, className="mb-4"
@@ -175,7 +180,8 @@ def dashboard_content(data, grade_options, region_options):
                 dbc.Col(
                     dbc.Card([
                         dbc.CardBody([
-                            dcc.Loading(dcc.Graph(id='shs_track_bar_chart', config={'displayModeBar': False}, style={'height': '100%'}))
+                            dcc.Loading(dcc.Graph(id='shs_track_bar_chart', config={'displayModeBar': False}, style={'height': '100%'})),
+                            drawn_store('shs_track_bar_chart')
                         ])
                     ], style={**no_border_style, "height": "400px"}),
                     width=6, className="mb-4"
@@ -186,7 +192,8 @@ def dashboard_content(data, grade_options, region_options):
                 dbc.Col(
                     dbc.Card([
                         dbc.CardBody([
-                            dcc.Loading(dcc.Graph(id='k_to_12_distribution_chart', config={'displayModeBar': False}, style={'height': '100%'}))
+                            dcc.Loading(dcc.Graph(id='k_to_12_distribution_chart', config={'displayModeBar': False}, style={'height': '100%'})),
+                            drawn_store('k_to_12_distribution_chart')
                         ])
                     ], style=no_border_style),
                     width=12
@@ -197,7 +204,8 @@ def dashboard_content(data, grade_options, region_options):
                 dbc.Col(
                     dbc.Card([
                         dbc.CardBody([
-                            dcc.Loading(dcc.Graph(id='enrollment_trend_line_chart', config={'displayModeBar': False}, style={'height': '100%'}))
+                            dcc.Loading(dcc.Graph(id='enrollment_trend_line_chart', config={'displayModeBar': False}, style={'height': '100%'})),
+                            drawn_store('enrollment_trend_line_chart')
                         ])
                     ], style={**no_border_style, "height": "400px"}),
                     width=7
@@ -205,7 +213,8 @@ def dashboard_content(data, grade_options, region_options):
                 dbc.Col(
                     dbc.Card([
                         dbc.CardBody([
-                            dcc.Loading(dcc.Graph(id='transition_rate_chart', config={'displayModeBar': False}, style={'height': '100%', 'width':'100%'}))
+                            dcc.Loading(dcc.Graph(id='transition_rate_chart', config={'displayModeBar': False}, style={'height': '100%', 'width':'100%'})),
+                            drawn_store('transition_rate_chart')
                         ])
                     ], style={**no_border_style, "height": "400px"}),
                     width=5
@@ -216,7 +225,8 @@ def dashboard_content(data, grade_options, region_options):
                 dbc.Col(
                     dbc.Card([
                         dbc.CardBody([
-                            dcc.Loading(dcc.Graph(id='coc_sector_chart', config={'displayModeBar': False}, style={'height': '100%'}))
+                            dcc.Loading(dcc.Graph(id='coc_sector_chart', config={'displayModeBar': False}, style={'height': '100%'})),
+                            drawn_store('coc_sector_chart')
                         ])
                     ], style={**no_border_style, "height": "400px"}),
                     width=6, className="mb-4"
@@ -224,7 +234,8 @@ def dashboard_content(data, grade_options, region_options):
                 dbc.Col(
                     dbc.Card([
                         dbc.CardBody([
-                            dcc.Loading(dcc.Graph(id='sned_sector_chart', config={'displayModeBar': False}, style={'height': '100%'}))
+                            dcc.Loading(dcc.Graph(id='sned_sector_chart', config={'displayModeBar': False}, style={'height': '100%'})),
+                            drawn_store('sned_sector_chart')
                         ])
                     ], style={**no_border_style, "height": "400px"}),
                     width=6, className="mb-4"
@@ -234,7 +245,8 @@ def dashboard_content(data, grade_options, region_options):
                 dbc.Col(
                     dbc.Card([
                         dbc.CardBody([
-                            dcc.Loading(dcc.Graph(id='up_sned_sector_chart', config={'displayModeBar': False}, style={'height': '100%'}))
+                            dcc.Loading(dcc.Graph(id='up_sned_sector_chart', config={'displayModeBar': False}, style={'height': '100%'})),
+                            drawn_store('up_sned_sector_chart')
                         ])
                     ], style=no_border_style),
                     width=12
@@ -19,6 +19,7 @@ def create_sidebar(is_collapsed=False, current_page=None):
     }
 
     toggle_icon = DashIconify(
+        id='sidebar-toggle-icon',
         icon="mdi:menu-open" if is_collapsed else "mdi:menu-close",
         width=24,
         style={"margin": "10px 0", "marginLeft": "5px"}
@@ -30,6 +31,10 @@ def create_sidebar(is_collapsed=False, current_page=None):
         className="sidebar-toggle-button"
     )
 
+    # The title and rule are hidden, not restyled, when collapsed, so the clientside toggle only flips display
+    title_style = {"textAlign": "left", "marginLeft": "10px", "marginBottom": "10px"}
+    rule_style = {"borderColor": "var(--primary-color)", "borderWidth": "0.5px"}
+
     # Define menu items with active state
     menu_items = html.Div([
         html.Button(
@@ -72,8 +77,8 @@ def create_sidebar(is_collapsed=False, current_page=None):
         style=sidebar_style,
         children=[
             toggle_button,
-            html.H4("Menu", className="chart-title", style={"textAlign": "left", "marginLeft": "10px", "marginBottom": "10px"} if not is_collapsed else {"display": "none"}),
-            html.Hr(style={"borderColor": "var(--primary-color)", "borderWidth": "0.5px"} if not is_collapsed else {"display": "none"}),
+            html.H4("Menu", id='sidebar-title', className="chart-title", style={**title_style, "display": "none"} if is_collapsed else title_style),
+            html.Hr(id='sidebar-rule', style={**rule_style, "display": "none"} if is_collapsed else rule_style),
             menu_items
         ]
     )
\ No newline at end of file
@@ -0,0 +1,61 @@
+# Shared fixtures: a small synthetic school year laid out like data_files/.
+import numpy as np
+import pandas as pd
+import pytest
+
+import app_data
+from data_engine import ENROLLMENT_COLUMNS
+
+SCHOOL_YEAR = '2023-2024'
+PREVIOUS_YEAR = '2022-2023'
+REGIONS = ['CAR', 'NCR', 'Region I']
+N_SCHOOLS = 24
+
+# Source signatures for index files written outside data_files/
+SIGNATURE = (1700000000000000000, 1234, 1700000000000000001, 567)
+OTHER_SIGNATURE = (1700000000000000000, 1235, 1700000000000000001, 567)
+
+
+def make_schools():
+    ids = np.arange(100000, 100000 + N_SCHOOLS)
+    regions = [REGIONS[i % len(REGIONS)] for i in range(N_SCHOOLS)]
+    return pd.DataFrame({
+        'BEIS School ID': ids,
+        'School Name': [f"School {i} Elementary School" for i in range(N_SCHOOLS)],
+        'Region': regions,
+        'Division': [f"{region} Division {i % 2}" for i, region in enumerate(regions)],
+        'Barangay': [f"Brgy {i}" for i in range(N_SCHOOLS)],
+        'Sector': ['Public' if i % 3 else 'Private' for i in range(N_SCHOOLS)],
+        'School Subclassification': 'DepED Managed',
+        'School Type': 'School with no Annexes',
+        'Modified COC': ['Purely ES' if i % 2 else 'ES and JHS' for i in range(N_SCHOOLS)],
+    })
+
+
+def make_year_rows(seed=0, school_year=SCHOOL_YEAR):
+    """data_{year}.csv rows: counts with some empty ("N/A") cells and mostly-empty strands."""
+    rng = np.random.default_rng(seed)
+    count_columns = ENROLLMENT_COLUMNS[2:]
+    counts = rng.integers(0, 200, size=(N_SCHOOLS, len(count_columns))).astype(object)
+    counts[rng.random(counts.shape) < 0.3] = 'N/A'
+    rows = pd.DataFrame(counts, columns=count_columns)
+    strands = [col for col in count_columns if col.startswith(('G11', 'G12'))]
+    rows.loc[2:, strands] = 'N/A'
+    rows.insert(0, 'BEIS School ID', make_schools()['BEIS School ID'])
+    rows.insert(0, 'School Year', school_year)
+    return rows[ENROLLMENT_COLUMNS]
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """A working directory holding schools.csv and one year, with app_data's caches cleared."""
+    (tmp_path / 'data_files').mkdir()
+    monkeypatch.chdir(tmp_path)
+    make_schools().to_csv(app_data.SCHOOLS_PATH, index=False)
+    make_year_rows().to_csv(app_data.data_path_for_year(SCHOOL_YEAR), index=False)
+    caches = [value for value in vars(app_data).values() if isinstance(value, app_data.DatasetCache)]
+    for cache in caches:
+        cache.clear()
+    yield tmp_path
+    for cache in caches:
+        cache.clear()
@@ -0,0 +1,55 @@
+import numpy as np
+
+import app_data
+from data_engine import build_enrollment_cube, build_enrollment_tensor, grade_columns_for
+from data_engine.cube import CUBE_DIMENSIONS
+
+from conftest import REGIONS, SCHOOL_YEAR
+
+
+def year_data():
+    return app_data.get_year_dataset(SCHOOL_YEAR).data
+
+
+def selected_totals(data, grades=None, gender='All'):
+    columns = grade_columns_for(data.columns).columns(grades, gender)
+    return data[columns].sum(axis=1).astype(np.int64)
+
+
+def test_cells_hold_the_totals_of_each_dimension_cell(data_dir):
+    data = year_data()
+    cube = build_enrollment_cube(build_enrollment_tensor(data))
+
+    cells = cube.cells.set_index(CUBE_DIMENSIONS)
+    grouped = data.groupby(CUBE_DIMENSIONS, observed=True)
+    assert cells['Schools'].to_dict() == grouped.size().to_dict()
+    for grade, gender in [('K', 'Male'), ('G7', 'Female'), ('G11', 'Male')]:
+        totals = selected_totals(data, [grade], gender)
+        assert cells[f"{grade} {gender}"].to_dict() == totals.groupby(
+            [data[dim] for dim in CUBE_DIMENSIONS], observed=True).sum().to_dict()
+
+
+def test_scope_totals_the_selection_within_regions(data_dir):
+    data = year_data()
+    cube = build_enrollment_cube(build_enrollment_tensor(data))
+    scoped = cube.scope(REGIONS[:2], ['K', 'G1'], 'Female', total_name='Total')
+
+    assert set(scoped['Region']) == set(REGIONS[:2])
+    in_regions = data['Region'].isin(REGIONS[:2])
+    expected = selected_totals(data, ['K', 'G1'], 'Female')[in_regions]
+    assert scoped['Total'].sum() == expected.sum()
+    by_sector = scoped.groupby('Sector', observed=True)['Total'].sum()
+    assert by_sector.to_dict() == expected.groupby(data.loc[in_regions, 'Sector'], observed=True).sum().to_dict()
+
+
+def test_school_counts_count_schools_with_selected_enrollment(data_dir):
+    data = year_data()
+    cube = build_enrollment_cube(build_enrollment_tensor(data))
+
+    for regions, grades, gender in [(None, None, 'All'), (REGIONS[1:], ['G11', 'G12'], 'Male')]:
+        enrolled = selected_totals(data, grades, gender) > 0
+        if regions:
+            enrolled &= data['Region'].isin(regions)
+        expected = data[enrolled].groupby(['Region', 'Sector'], observed=True).size()
+        counts = cube.school_counts(['Region', 'Sector'], regions, grades, gender)
+        assert counts[counts > 0].to_dict() == expected.to_dict()
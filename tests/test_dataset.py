@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+import app_data
+from data_engine import YearDataset, grade_columns_for
+
+from conftest import SCHOOL_YEAR
+
+
+def test_writes_to_a_view_never_reach_the_snapshot(data_dir):
+    dataset = app_data.get_year_dataset(SCHOOL_YEAR)
+    before = dataset.data.copy(deep=True)
+
+    view = dataset.data
+    view.loc[view.index[:3], 'Total Male'] = 0
+    view.iloc[0, view.columns.get_loc('K Female')] = 12345
+    view['Total Enrollment'] += 1
+    view['Extra'] = 1
+
+    after = app_data.get_year_dataset(SCHOOL_YEAR).data
+    assert 'Extra' not in after.columns
+    pd.testing.assert_frame_equal(after, before)
+
+
+def test_derived_frames_are_handed_out_as_views(data_dir):
+    frame = pd.DataFrame({'K Male': np.arange(5, dtype=np.uint32), 'K Female': np.ones(5, dtype=np.uint32)})
+    dataset = YearDataset(SCHOOL_YEAR, frame, frame.isna(), grade_columns_for(frame.columns), [])
+    derived = dataset.derived('doubled', lambda dataset: dataset.data * 2)
+    derived.loc[0, 'K Male'] = 99
+    missing = dataset.missing
+    missing.iloc[0, 0] = True
+
+    assert dataset.derived('doubled', lambda dataset: None).loc[0, 'K Male'] == 0
+    assert not dataset.missing.iloc[0, 0]
+    assert dataset.data['K Male'].tolist() == [0, 1, 2, 3, 4]
@@ -0,0 +1,69 @@
+import json
+
+import numpy as np
+
+from data_engine import build_region_geometry, load_region_geometry
+from data_engine.geometry import simplify_polygons, simplify_ring
+
+
+def circle(cx, cy, r, n=400):
+    angles = np.linspace(0, 2 * np.pi, n)
+    ring = np.column_stack([cx + r * np.cos(angles), cy + r * np.sin(angles)])
+    ring[-1] = ring[0]
+    return ring.tolist()
+
+
+def feature_collection():
+    return {'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'properties': {'name': 'Big'},
+         'geometry': {'type': 'Polygon', 'coordinates': [circle(121.0, 14.5, 1.0)]}},
+        {'type': 'Feature', 'properties': {'name': 'Islands'},
+         'geometry': {'type': 'MultiPolygon', 'coordinates': [
+             [circle(124.0, 10.0, 0.5)], [circle(125.0, 9.0, 0.0001, n=20)]]}},
+    ]}
+
+
+def test_simplified_rings_stay_closed_and_within_tolerance():
+    ring = np.array(circle(0, 0, 1.0))
+    simplified = simplify_ring(ring, 0.01)
+    assert 4 <= len(simplified) < len(ring) / 4
+    np.testing.assert_array_equal(simplified[0], simplified[-1])
+    # Only original points are kept, and no dropped point strays far from the outline
+    assert {tuple(point) for point in simplified} <= {tuple(point) for point in ring}
+    chord_gap = 1.0 - np.cos(np.pi / (len(simplified) - 1))
+    assert chord_gap < 0.02
+
+
+def test_tiny_polygons_collapse_but_a_region_never_disappears():
+    kept = simplify_polygons([[circle(125.0, 9.0, 0.0001, n=20)]], 0.005, 3)
+    assert len(kept) == 1
+    islands = simplify_polygons([[circle(124.0, 10.0, 0.5)], [circle(125.0, 9.0, 0.0001, n=20)]], 0.005, 3)
+    assert len(islands) == 1
+
+
+def test_built_geometry_is_quantized_with_bounds():
+    geometry = build_region_geometry(feature_collection(), tolerance=0.005, precision=3)
+    assert [feature['properties']['name'] for feature in geometry['features']] == ['Big', 'Islands']
+    points = np.array([point for feature in geometry['features']
+                       for polygon in feature['geometry']['coordinates'] for ring in polygon for point in ring])
+    np.testing.assert_array_equal(points, np.round(points, 3))
+    lon_min, lat_min, lon_max, lat_max = geometry['bbox']
+    assert (lon_min, lat_min) == tuple(points.min(axis=0)) and (lon_max, lat_max) == tuple(points.max(axis=0))
+    assert lon_min == 120.0 and lon_max == 124.5
+
+
+def test_load_rebuilds_only_when_the_source_changes(tmp_path):
+    source = tmp_path / 'ph.json'
+    output = tmp_path / 'assets' / 'ph.simplified.json'
+    source.write_text(json.dumps(feature_collection()))
+
+    first = load_region_geometry(str(source), str(output))
+    assert json.loads(output.read_text()) == first
+    output.write_text(json.dumps(dict(first, marker=True)))
+    assert load_region_geometry(str(source), str(output))['marker'] is True
+
+    changed = feature_collection()
+    changed['features'] = changed['features'][:1]
+    source.write_text(json.dumps(changed))
+    rebuilt = load_region_geometry(str(source), str(output))
+    assert 'marker' not in rebuilt and len(rebuilt['features']) == 1
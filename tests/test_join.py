@@ -0,0 +1,19 @@
+import numpy as np
+
+from data_engine import read_join_index, write_join_index
+
+from conftest import OTHER_SIGNATURE, SIGNATURE
+
+
+def test_join_index_round_trip(tmp_path):
+    positions = np.array([3, -1, 0, 2, 2, 1])
+    path = str(tmp_path / 'store' / 'data.join.npz')
+    write_join_index(positions, path, SIGNATURE)
+
+    loaded = read_join_index(path, SIGNATURE, len(positions))
+    np.testing.assert_array_equal(loaded, positions)
+    assert loaded.dtype == np.int32
+    assert read_join_index(path, SIGNATURE) is not None
+    assert read_join_index(path, SIGNATURE, len(positions) + 1) is None
+    assert read_join_index(path, OTHER_SIGNATURE) is None
+    assert read_join_index(str(tmp_path / 'missing.npz'), SIGNATURE) is None
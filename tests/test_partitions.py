@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import app_data
+from data_engine import load_year_frame, partitions_dir_for, read_partitions, write_partitions
+
+from conftest import OTHER_SIGNATURE, REGIONS, SCHOOL_YEAR, SIGNATURE, make_schools
+
+
+def year_rows():
+    csv_path = app_data.data_path_for_year(SCHOOL_YEAR)
+    rows, missing = load_year_frame(csv_path)
+    regions = rows[['BEIS School ID']].merge(make_schools(), how='left')['Region']
+    return csv_path, rows, missing, regions
+
+
+def test_partitions_read_back_only_the_requested_regions(data_dir):
+    csv_path, rows, missing, regions = year_rows()
+    assert sorted(write_partitions(rows, missing, regions, csv_path, SIGNATURE)) == sorted(REGIONS)
+
+    wanted = [REGIONS[2], REGIONS[0]]
+    frame, frame_missing = read_partitions(csv_path, SIGNATURE, wanted, ['BEIS School ID', 'K Male'])
+    keep = np.concatenate([np.flatnonzero(regions == region) for region in wanted])
+    assert list(frame.columns) == ['BEIS School ID', 'K Male']
+    np.testing.assert_array_equal(frame['BEIS School ID'], rows['BEIS School ID'].to_numpy()[keep])
+    np.testing.assert_array_equal(frame['K Male'], rows['K Male'].to_numpy()[keep])
+    np.testing.assert_array_equal(frame_missing.get('K Male', np.zeros(len(keep), dtype=bool)),
+                                  missing.get('K Male', np.zeros(len(rows), dtype=bool))[keep])
+
+
+def test_partitions_prune_unrequested_regions(data_dir):
+    csv_path, rows, missing, regions = year_rows()
+    write_partitions(rows, missing, regions, csv_path, SIGNATURE)
+    # A region that is not asked for is never opened
+    os.remove(os.path.join(partitions_dir_for(csv_path), 'NCR.npz'))
+    frame, _ = read_partitions(csv_path, SIGNATURE, ['CAR'])
+    assert len(frame) == int((regions == 'CAR').sum())
+    assert read_partitions(csv_path, SIGNATURE, ['NCR']) is None
+    assert read_partitions(csv_path, OTHER_SIGNATURE, ['CAR']) is None
+
+
+def test_only_changed_regions_are_rewritten(data_dir):
+    csv_path, rows, missing, regions = year_rows()
+    write_partitions(rows, missing, regions, csv_path, SIGNATURE)
+    rows.loc[np.flatnonzero(regions == 'NCR'), 'K Male'] += 1
+    assert write_partitions(rows, missing, regions, csv_path, OTHER_SIGNATURE) == ['NCR']
+    frame, _ = read_partitions(csv_path, OTHER_SIGNATURE, ['NCR'], ['K Male'])
+    np.testing.assert_array_equal(frame['K Male'], rows['K Male'].to_numpy()[regions == 'NCR'])
+
+
+def test_region_projection_matches_filtered_full_projection(data_dir):
+    full = app_data.load_year_columns(SCHOOL_YEAR, ['K', 'G11'], 'Male', metadata=['Region', 'School Name'])
+    pruned = app_data.load_year_columns(SCHOOL_YEAR, ['K', 'G11'], 'Male', metadata=['Region', 'School Name'],
+                                        regions=['NCR', 'CAR'])
+    path = app_data.data_path_for_year(SCHOOL_YEAR)
+    assert os.path.isdir(partitions_dir_for(path))
+
+    expected = pd.concat([full[full['Region'] == region] for region in ['CAR', 'NCR']], ignore_index=True)
+    pd.testing.assert_frame_equal(pruned.reset_index(drop=True), expected, check_categorical=False)
+
+
+def test_shs_track_table_from_partitions_matches_full_table(data_dir):
+    full = app_data.get_shs_track_df(SCHOOL_YEAR)
+    table = app_data.get_shs_track_df(SCHOOL_YEAR, ['NCR', 'CAR'])
+    expected = full[full['Region'].isin(['NCR', 'CAR'])]
+    grouped = lambda frame: frame.groupby(['Track', 'Grade Level', 'Gender'])['Total Enrollment'].sum()
+    pd.testing.assert_series_equal(grouped(table), grouped(expected))
+
+
+def test_saving_a_year_refreshes_its_partitions(data_dir):
+    rows = app_data.read_year_rows(SCHOOL_YEAR)
+    rows['K Female'] = 3
+    app_data.save_year_rows(SCHOOL_YEAR, rows)
+    path = app_data.data_path_for_year(SCHOOL_YEAR)
+    frame, _ = read_partitions(path, app_data._source_signature(path), ['Region I'], ['K Female'])
+    assert len(frame) and (frame['K Female'] == 3).all()
@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import app_data
+from data_engine import is_sparse, totals_path_for
+
+from conftest import REGIONS, SCHOOL_YEAR
+
+
+def dense(series):
+    return np.asarray(series.sparse.to_dense() if is_sparse(series.array) else series, dtype=np.int64)
+
+
+def test_projection_holds_only_the_selected_columns(data_dir):
+    projected = app_data.load_year_columns(SCHOOL_YEAR, ['K', 'G7'], 'Female', metadata=['Region', 'School Year'])
+    assert list(projected.columns) == ['Region', 'School Year', 'K Female', 'G7 Female']
+
+    full = app_data.get_year_dataset(SCHOOL_YEAR).data
+    assert projected['Region'].tolist() == full['Region'].tolist()
+    assert (projected['School Year'] == SCHOOL_YEAR).all()
+    for col in ['K Female', 'G7 Female']:
+        np.testing.assert_array_equal(dense(projected[col]), dense(full[col]))
+
+
+def test_projection_is_cached_until_the_year_changes(data_dir):
+    first = app_data.load_year_columns(SCHOOL_YEAR, ['K'], 'Male', metadata=['Region'])
+    hits = app_data._projection_cache.hits
+    app_data.load_year_columns(SCHOOL_YEAR, ['K'], 'Male', metadata=['Region'])
+    assert app_data._projection_cache.hits == hits + 1
+
+    rows = app_data.read_year_rows(SCHOOL_YEAR)
+    rows['K Male'] = 7
+    app_data.save_year_rows(SCHOOL_YEAR, rows)
+    reloaded = app_data.load_year_columns(SCHOOL_YEAR, ['K'], 'Male', metadata=['Region'])
+    assert (dense(reloaded['K Male']) == 7).all()
+    assert not (dense(first['K Male']) == 7).all()
+
+
+def test_year_enrollment_without_totals_index_loads_only_a_projection(data_dir):
+    filters = [(None, None, 'All'), (REGIONS[:2], ['K', 'G11'], 'Female'), (REGIONS[2:], ['G12'], 'Male')]
+    expected = [app_data.get_totals_index(SCHOOL_YEAR).total(*state) for state in filters]
+
+    os.remove(totals_path_for(app_data.data_path_for_year(SCHOOL_YEAR)))
+    app_data._totals_cache.clear()
+    app_data._year_cache.clear()
+    assert [app_data.get_year_enrollment(SCHOOL_YEAR, *state) for state in filters] == expected
+    assert app_data._year_cache.stats()['entries'] == 0
+
+
+def test_shs_track_table_from_projection_matches_full_year(data_dir):
+    full = app_data.build_combined_shs_track_df(app_data.get_year_dataset(SCHOOL_YEAR).data)
+    for gender in ('All', 'Male', 'Female'):
+        expected = full if gender == 'All' else full[full['Gender'] == gender]
+        table = app_data.get_shs_track_df(SCHOOL_YEAR, gender=gender)
+        pd.testing.assert_frame_equal(table.reset_index(drop=True), expected.reset_index(drop=True),
+                                      check_categorical=False)
@@ -0,0 +1,32 @@
+import itertools
+
+import pandas as pd
+
+import app_data
+from data_engine import build_enrollment_tensor, build_school_rankings
+from data_engine.rankings import GRADE_GROUPS, RANKED_GENDERS
+
+from conftest import REGIONS, SCHOOL_YEAR
+
+
+def test_rankings_match_the_selection_they_precompute(data_dir):
+    tensor = build_enrollment_tensor(app_data.get_year_dataset(SCHOOL_YEAR).data)
+    rankings = build_school_rankings(tensor, depth=6)
+
+    for region, group, gender in itertools.product([None, *REGIONS], GRADE_GROUPS, RANKED_GENDERS):
+        regions = [region] if region else None
+        grades = GRADE_GROUPS[group]
+        for n in (1, 5):
+            top = rankings.top(n, regions, grades, gender)
+            assert top is not None
+            pd.testing.assert_frame_equal(top, tensor.select(regions, grades, gender).top_schools(n))
+
+
+def test_rankings_leave_other_selections_to_the_tensor(data_dir):
+    tensor = build_enrollment_tensor(app_data.get_year_dataset(SCHOOL_YEAR).data)
+    rankings = build_school_rankings(tensor, depth=6)
+
+    assert rankings.top(7, None, None, 'All') is None
+    assert rankings.top(5, REGIONS[:2], None, 'All') is None
+    assert rankings.top(5, None, ['K', 'G7'], 'All') is None
+    assert rankings.top(5, ['Not A Region'], None, 'All').empty
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_engine import SchoolRegistry
+
+from conftest import REGIONS, make_schools
+
+
+def schools_frame():
+    schools = make_schools()
+    # A repeated ID: lookups by ID keep its first row, as a positional lookup on the frame would
+    duplicate = schools.iloc[[0]].assign(**{'School Name': 'Renamed School'})
+    return pd.concat([schools, duplicate], ignore_index=True)
+
+
+def registry():
+    return SchoolRegistry(schools_frame())
+
+
+def test_cascading_lookups_follow_schools_csv():
+    schools = schools_frame()
+    reg = registry()
+    for region in REGIONS:
+        in_region = schools[schools['Region'] == region]
+        assert reg.divisions(region) == sorted(in_region['Division'].unique())
+        for division in reg.divisions(region):
+            assert reg.schools(division) == sorted(in_region.loc[in_region['Division'] == division, 'School Name'])
+    assert reg.divisions('Not A Region') == []
+    assert reg.schools('Not A Division') == []
+
+
+def test_lookups_by_name_and_id():
+    reg = registry()
+    record = reg.by_name('School 4 Elementary School')
+    assert record['BEIS School ID'] == 100004
+    assert reg.by_id('100004') == record
+    assert reg.by_id(100000)['School Name'] == 'School 0 Elementary School'
+    assert reg.by_name('Renamed School')['BEIS School ID'] == 100000
+    with pytest.raises(KeyError):
+        reg.by_name('Unknown School')
+
+
+def test_join_positions_and_take():
+    reg = registry()
+    positions = reg.join_positions(pd.Series([100003, 999999, 100000]))
+    np.testing.assert_array_equal(positions, [3, -1, 0])
+
+    taken = reg.take(positions, ['Region', 'School Name'])
+    schools = make_schools()
+    assert list(taken['Region'][[0, 2]]) == [schools['Region'][3], schools['Region'][0]]
+    assert pd.isna(taken['Region'][1]) and pd.isna(taken['School Name'][1])
+    assert taken['School Name'][2] == 'School 0 Elementary School'
@@ -0,0 +1,61 @@
+import pandas as pd
+
+import app_data
+from data_engine import SchoolSearchIndex, build_school_search_index
+
+from conftest import SCHOOL_YEAR
+
+IDS = [100200, 100201, 100210, 200100, 100202]
+NAMES = [
+    'San Jose National High School',
+    'Rizal Elementary School',
+    'San Isidro Central School',
+    'Jose Rizal Memorial High School',
+    None,
+]
+
+
+def index():
+    return SchoolSearchIndex(IDS[:4], NAMES[:4])
+
+
+def test_exact_id_comes_before_id_prefixes():
+    results = index().search('100201')
+    assert results[0] == ('100201', 'Rizal Elementary School')
+    assert [school_id for school_id, _ in index().search('1002')] == ['100200', '100201', '100210']
+
+
+def test_names_containing_the_query_rank_by_position():
+    names = [name for _, name in index().search('rizal')]
+    assert names == ['Rizal Elementary School', 'Jose Rizal Memorial High School']
+
+
+def test_typos_still_find_names_by_shared_trigrams():
+    assert index().search('natoinal high')[0][1] == 'San Jose National High School'
+    assert index().search('xyzzy') == []
+
+
+def test_short_queries_prefer_word_starts():
+    names = [name for _, name in index().search('sa')]
+    assert names[:2] == ['San Jose National High School', 'San Isidro Central School']
+
+
+def test_empty_query_and_limit():
+    assert len(index().search('', limit=2)) == 2
+    assert len(index().search('school', limit=3)) == 3
+    assert index().get(200100) == ('200100', 'Jose Rizal Memorial High School')
+    assert index().get(1) is None
+
+
+def test_year_index_covers_the_year_schools(data_dir):
+    search = app_data.get_school_search_index(SCHOOL_YEAR)
+    registry = app_data.get_school_registry()
+    assert len(search) == len(registry)
+    school_id, name = search.search('School 7 Elementary')[0]
+    assert name == 'School 7 Elementary School'
+    assert registry.by_id(school_id)['School Name'] == name
+
+
+def test_rows_without_a_name_are_skipped():
+    frame = pd.DataFrame({'BEIS School ID': IDS, 'School Name': NAMES})
+    assert len(build_school_search_index(frame)) == 4
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from data_engine.schema import MISSING_LABEL, SHS_STRAND_COLUMNS
+from data_engine.storage import decode_store, encode_store, load_year_frame, save_year_frame, store_path_for, write_archive
+
+from conftest import make_year_rows
+
+
+def round_trip(df, tmp_path, columns=None):
+    path = str(tmp_path / 'store' / 'data.npz')
+    write_archive(encode_store(df), path)
+    with np.load(path, allow_pickle=False) as store:
+        return decode_store(store, columns)
+
+
+def test_store_round_trip_keeps_counts_and_empty_cells(tmp_path):
+    rows = make_year_rows()
+    frame, missing = round_trip(rows, tmp_path)
+
+    assert list(frame.columns) == list(rows.columns)
+    assert (frame['School Year'] == rows['School Year']).all()
+    for col in rows.columns[1:]:
+        empty = (rows[col] == MISSING_LABEL).to_numpy()
+        expected = rows[col].mask(empty, 0).astype(np.int64).to_numpy()
+        np.testing.assert_array_equal(frame[col].to_numpy(), expected)
+        np.testing.assert_array_equal(missing.get(col, np.zeros(len(rows), dtype=bool)), empty)
+
+
+def test_store_keeps_sparse_strands_as_nonzero_cells():
+    rows = make_year_rows()
+    arrays = encode_store(rows)
+    columns = arrays['columns'].tolist()
+    strand = next(col for col in SHS_STRAND_COLUMNS if col in columns)
+    i = columns.index(strand)
+    assert arrays['kinds'][i] == 'z'
+    assert len(arrays[f'values_{i}']) <= 2
+
+
+def test_store_round_trip_keeps_text_and_nan(tmp_path):
+    df = pd.DataFrame({'Name': ['a', None, 'c'], 'Count': [1, 2, 3]})
+    frame, missing = round_trip(df, tmp_path)
+    assert frame['Name'][0] == 'a' and frame['Name'][2] == 'c'
+    assert pd.isna(frame['Name'][1])
+    assert frame['Count'].tolist() == [1, 2, 3]
+    assert missing == {}
+
+
+def test_store_projection_reads_only_requested_columns(tmp_path):
+    rows = make_year_rows()
+    frame, missing = round_trip(rows, tmp_path, columns=['BEIS School ID', 'K Male', 'Not A Column'])
+    assert list(frame.columns) == ['BEIS School ID', 'K Male']
+    assert set(missing) <= {'K Male'}
+
+
+def test_saved_year_loads_back_from_store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    csv_path = str(tmp_path / 'data_2023-2024.csv')
+    rows = make_year_rows()
+    save_year_frame(rows, csv_path)
+    assert (tmp_path / store_path_for(csv_path)).exists()
+
+    frame, missing = load_year_frame(csv_path)
+    from_csv = pd.read_csv(csv_path)
+    assert frame.shape == from_csv.shape
+    np.testing.assert_array_equal(frame['K Male'].to_numpy(), from_csv['K Male'].fillna(0).to_numpy())
+    np.testing.assert_array_equal(missing.get('K Male', np.zeros(len(frame), dtype=bool)),
+                                  from_csv['K Male'].isna().to_numpy())
@@ -0,0 +1,23 @@
+import numpy as np
+
+from data_engine import TAGGERS, build_tags, grade_columns_for, read_tags, write_tags
+
+from conftest import OTHER_SIGNATURE, SIGNATURE, make_schools, make_year_rows
+
+
+def test_tags_round_trip(tmp_path):
+    data = make_year_rows().merge(make_schools(), on='BEIS School ID')
+    data.loc[[1, 5], 'School Name'] = ['North SPED Center', 'South Sped Center']
+    count_columns = [col for col in data.columns if col.endswith(('Male', 'Female'))]
+    data[count_columns] = data[count_columns].replace('N/A', 0).astype(int)
+    tags = build_tags(data, grade_columns_for(data.columns))
+    assert set(tags) == set(TAGGERS)
+    assert np.flatnonzero(tags['sped_center']).tolist() == [1, 5]
+
+    path = str(tmp_path / 'store' / 'data.tags.npz')
+    write_tags(tags, path, SIGNATURE)
+    loaded = read_tags(path, SIGNATURE)
+    assert set(loaded) == set(tags)
+    for name, mask in tags.items():
+        np.testing.assert_array_equal(loaded[name], mask)
+    assert read_tags(path, OTHER_SIGNATURE) is None
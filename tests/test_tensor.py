@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+import app_data
+from data_engine import build_enrollment_tensor, grade_columns_for
+
+from conftest import REGIONS, SCHOOL_YEAR, make_year_rows
+
+UNREGISTERED_ID = 999999
+
+
+def with_unregistered_school():
+    """The synthetic year plus a school that is missing from schools.csv (so has no region)."""
+    rows = make_year_rows()
+    extra = rows.iloc[[0]].assign(**{'BEIS School ID': UNREGISTERED_ID, 'K Male': 2729})
+    rows = pd.concat([rows, extra], ignore_index=True)
+    rows.to_csv(app_data.data_path_for_year(SCHOOL_YEAR), index=False)
+    return app_data.get_year_dataset(SCHOOL_YEAR).data
+
+
+def pandas_totals(data, grades=None, gender='All'):
+    columns = grade_columns_for(data.columns).columns(grades, gender)
+    return data[columns].sum(axis=1).astype(np.int64)
+
+
+def test_region_totals_leave_out_schools_without_a_region(data_dir):
+    data = with_unregistered_school()
+    assert data['Region'].isna().sum() == 1
+    tensor = build_enrollment_tensor(data)
+
+    for grades, gender in [(None, 'All'), (['K'], 'Male'), (['G7', 'G11'], 'Female')]:
+        totals = pandas_totals(data, grades, gender)
+        expected = totals.groupby(data['Region'], observed=True).sum()
+        region_totals = tensor.region_totals(grades, gender)
+        assert region_totals[region_totals > 0].to_dict() == expected[expected > 0].to_dict()
+        assert int(region_totals.sum()) == int(totals[data['Region'].notna()].sum())
+
+
+def test_selection_matches_pandas(data_dir):
+    data = with_unregistered_school()
+    tensor = build_enrollment_tensor(data)
+    selection = tensor.select(REGIONS[:2], ['K', 'G1'], 'Male')
+
+    totals = pandas_totals(data, ['K', 'G1'], 'Male')
+    in_regions = data['Region'].isin(REGIONS[:2])
+    assert selection.mask.sum() == in_regions.sum()
+    assert selection.totals.sum() == totals.sum()
+    expected = totals[in_regions].groupby(data.loc[in_regions, 'Division'], observed=True).sum()
+    assert selection.sum_by('Division').to_dict() == expected.to_dict()
+
+
+def test_top_schools_rank_selected_totals(data_dir):
+    data = with_unregistered_school()
+    tensor = build_enrollment_tensor(data)
+    top = tensor.select(None, ['G7'], 'All').top_schools(3)
+
+    totals = pandas_totals(data, ['G7'])
+    named = data['School Name'].notna()
+    expected = totals[named].groupby([data.loc[named, 'School Name'], data.loc[named, 'Sector']],
+                                     observed=True).sum()
+    expected = expected.sort_values(ascending=False, kind='stable').head(3)
+    assert list(zip(top['School Name'], top['Sector'])) == list(expected.index)
+    assert top['Filtered Enrollment'].tolist() == expected.tolist()
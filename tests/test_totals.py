@@ -0,0 +1,32 @@
+import numpy as np
+
+import app_data
+from data_engine import build_enrollment_tensor, build_totals_index, read_totals_index, write_totals_index
+
+from conftest import OTHER_SIGNATURE, REGIONS, SCHOOL_YEAR, SIGNATURE
+
+
+def test_totals_index_round_trip(data_dir):
+    dataset = app_data.get_year_dataset(SCHOOL_YEAR)
+    tensor = build_enrollment_tensor(dataset.data, dataset.columns)
+    index = build_totals_index(tensor, dataset.data, SIGNATURE)
+    path = str(data_dir / 'store' / 'data.totals.npz')
+    write_totals_index(index, path)
+
+    loaded = read_totals_index(path, SIGNATURE)
+    assert loaded is not None
+    np.testing.assert_array_equal(loaded.regions, index.regions)
+    np.testing.assert_array_equal(loaded.divisions, index.divisions)
+    assert loaded.levels == index.levels
+    np.testing.assert_array_equal(loaded.counts, index.counts)
+    np.testing.assert_array_equal(loaded.school_ids, index.school_ids)
+    np.testing.assert_array_equal(loaded.school_counts, index.school_counts)
+    for regions in (None, REGIONS[:1]):
+        for gender in ('All', 'Male', 'Female'):
+            assert loaded.total(regions, ['K', 'G7'], gender) == index.total(regions, ['K', 'G7'], gender)
+
+    data = dataset.data
+    school_id = int(data['BEIS School ID'].iloc[0])
+    assert loaded.school_totals(school_id) == (int(data['Total Male'].iloc[0]), int(data['Total Female'].iloc[0]))
+    assert loaded.school_totals(1) is None
+    assert read_totals_index(path, OTHER_SIGNATURE) is None
@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+import app_data
+from data_engine import TRANSITIONS, grade_columns_for, previous_school_year
+
+from conftest import PREVIOUS_YEAR, REGIONS, SCHOOL_YEAR, make_year_rows
+
+
+def grade_total(school_year, grade, regions=None, gender='All'):
+    rows = pd.read_csv(app_data.data_path_for_year(school_year))
+    data = rows.merge(pd.read_csv(app_data.SCHOOLS_PATH), on='BEIS School ID', how='left')
+    if regions:
+        data = data[data['Region'].isin(regions)]
+    return data[grade_columns_for(data.columns).columns([grade], gender)].fillna(0).to_numpy().sum()
+
+
+@pytest.fixture
+def two_years(data_dir):
+    make_year_rows(seed=1, school_year=PREVIOUS_YEAR).to_csv(app_data.data_path_for_year(PREVIOUS_YEAR), index=False)
+    return data_dir
+
+
+def test_previous_school_year():
+    assert previous_school_year(SCHOOL_YEAR) == PREVIOUS_YEAR
+
+
+@pytest.mark.parametrize('regions, gender', [(None, 'All'), (REGIONS[:2], 'Male'), (REGIONS[2:], 'Female')])
+def test_rates_divide_entry_grade_by_previous_exit_grade(two_years, regions, gender):
+    rates = app_data.get_transition_rates()
+    assert rates.years == [SCHOOL_YEAR]
+
+    for transition, (exit_grade, entry_grade) in TRANSITIONS.items():
+        expected = (grade_total(SCHOOL_YEAR, entry_grade, regions, gender)
+                    / grade_total(PREVIOUS_YEAR, exit_grade, regions, gender) * 100)
+        assert rates.rate(SCHOOL_YEAR, transition, regions, gender) == pytest.approx(expected)
+        assert rates.rate(PREVIOUS_YEAR, transition, regions, gender) is None
+
+
+def test_breakdown_per_region(two_years):
+    rates = app_data.get_transition_rates()
+    breakdown = rates.breakdown(SCHOOL_YEAR, 'elem_jhs', by=['Region']).set_index('Region')
+
+    assert list(breakdown.index) == sorted(REGIONS)
+    for region in REGIONS:
+        assert breakdown.loc[region, 'Entering'] == grade_total(SCHOOL_YEAR, 'G7', [region])
+        assert breakdown.loc[region, 'Previous'] == grade_total(PREVIOUS_YEAR, 'G6', [region])
+        assert breakdown.loc[region, 'Rate'] == pytest.approx(
+            breakdown.loc[region, 'Entering'] / breakdown.loc[region, 'Previous'] * 100)
+
+
+def test_rates_need_a_previous_year(data_dir):
+    rates = app_data.get_transition_rates()
+    assert rates.years == []
+    assert rates.rate(SCHOOL_YEAR, 'elem_jhs') is None
+    assert rates.breakdown(SCHOOL_YEAR, 'elem_jhs').empty
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import app_data
+from data_engine.view import TOTAL_COLUMN
+
+from conftest import REGIONS, SCHOOL_YEAR
+
+FILTERS = [
+    (REGIONS[:1], None, 'All'),
+    (REGIONS[1:], ['K', 'G7'], 'Male'),
+    (['NCR', 'Not A Region'], ['G1', 'G11'], 'Female'),
+    (None, ['G12'], 'All'),
+]
+
+
+def pandas_year():
+    """The year merged with schools.csv and filtered by hand, as the dashboard once did."""
+    rows = pd.read_csv(app_data.data_path_for_year(SCHOOL_YEAR))
+    schools = pd.read_csv(app_data.SCHOOLS_PATH)
+    return rows.merge(schools, on='BEIS School ID', how='left')
+
+
+def pandas_selection(regions, grades, gender):
+    data = pandas_year()
+    if regions:
+        data = data[data['Region'].isin(regions)]
+    genders = ['Male', 'Female'] if gender == 'All' else [gender]
+    columns = [
+        col for col in data.columns
+        if col.rsplit(' ', 1)[-1] in genders and (not grades or col.split(' ')[0] in grades)
+    ]
+    return data.assign(Total=data[columns].fillna(0).sum(axis=1).astype(np.int64))
+
+
+@pytest.mark.parametrize('regions, grades, gender', FILTERS)
+def test_region_filtered_view_matches_pandas(data_dir, regions, grades, gender):
+    view = app_data.get_filter_view(SCHOOL_YEAR, regions, grades, gender)
+    expected = pandas_selection(regions, grades, gender)
+    by_region = expected.groupby('Region')['Total'].sum()
+
+    sums = view.selection.sum_by('Region')
+    pd.testing.assert_series_equal(sums.rename_axis(None).sort_index(), by_region.rename_axis(None).sort_index(),
+                                   check_names=False, check_index_type=False)
+
+    cells = view.cells.groupby('Region', observed=True)[TOTAL_COLUMN].sum()
+    assert cells.to_dict() == by_region.to_dict()
+
+    enrolled = expected[expected['Total'] > 0].groupby('Region').size()
+    counts = view.school_counts(['Region'])
+    assert counts.to_dict() == enrolled.to_dict()
+
+    top = view.top_schools(5)
+    assert top['Filtered Enrollment'].tolist() == expected['Total'].nlargest(5).tolist()
+
+
+def test_view_is_shared_per_filter_state(data_dir):
+    view = app_data.get_filter_view(SCHOOL_YEAR, REGIONS[:1], ['K'], 'Male')
+    assert app_data.get_filter_view(SCHOOL_YEAR, REGIONS[:1], ['K'], 'Male') is view
+    assert app_data.get_filter_view(SCHOOL_YEAR, REGIONS[:2], ['K'], 'Male') is not view